@@ -1,15 +1,31 @@
 import logging
-from functools import lru_cache
+import weakref
+import time
+import threading
+from collections import namedtuple
 from hashlib import sha1
+from types import MappingProxyType
 import os
 import re
 
-from ..result import Result
 from ..exceptions import UnexpectedState, StateChangeError, ReadOnlyChangeError, UnknownTestConfigurationMergeMethod, LocalLogExistsError, RemoteLogError
-from ..result import Result, UNSET, STATES, RESULTS
+from ..result import Result, ResultSnapshot, UNSET, STATE_NAMES, STATE_RANKS, RESULT_NAMES, EMPTY_MAPPING, resultLock
 
 URL_RE = re.compile("[^/]+://")
 LOGGER = logging.getLogger(__name__)
+TESTPLAN_GROUPING = ('testplan',)
+
+_OBSERVE_LOCK = threading.Lock()
+"""Lock held by CaseRunConfigurationsList while it starts or stops observing"""
+_LIST_LOCK_CREATION_LOCK = threading.Lock()
+"""Lock guarding creation of CaseRunConfigurationsList locks"""
+
+Transition = namedtuple('Transition', ('state', 'monotonic', 'wall', 'workflow'))
+"""
+Record of caseRunConfiguration entering the state at given time (both
+time.monotonic and time.time values are recorded) while being handled by
+workflow of given name.
+"""
 
 class CaseRunConfiguration():
     """Representation of case-run-configuration containing logic for state and
@@ -23,52 +39,279 @@ class CaseRunConfiguration():
     :param testplans: List of testplan ids for which the case-run-configuration executed.
     :type testplans: list
     """
+    __slots__ = (
+        'testrun', 'testcase', 'configuration', '_running_for', 'workflow',
+        '_result', 'readOnly', '_logs', '_id', '_observers', '_snapshot', '_timeline', '__weakref__',
+    )
+
     def __init__(self, testcase, configuration, testplans):
         self.testrun = None
         self.testcase = testcase
         """TestCase handled by this run"""
         self.configuration = configuration
         """Configuration of the TestCase"""
+        self._observers = None
+        self._snapshot = None
         self.running_for = { testplan.id : True for testplan in testplans }
-        """Mapping of plans for which this configuration shoud be executed"""
         self.workflow = None
         """Workflow instance handling execution of this configuration"""
+        self._result = None
         self.result = Result('not started')
-        """TODO"""
         self.readOnly = False
         """If set to true, the object is meant to be used as read-only copy and some methods which have side effects are forbidden and raise exception."""
-        self.logs = dict()
-        """Paths or URLs to logs associated to the caseRunConfiguration with specific names"""
+        self._logs = None
+        self._timeline = ()
+        self._id = None
 
-    @property
-    @lru_cache(maxsize=None)
-    def id(self):
-        """ Return string ID made from hash """
-        return sha1(f'{self.testcase.id}:{sorted(self.configuration.items())}'.encode()).hexdigest()
-
-    def copy(self):
-        caserun = CaseRunConfiguration(self.testcase, self.configuration, [])
+    def _copy(self):
+        """
+        Make copy of this instance sharing the testcase, configuration and
+        identity (id) so that the id doesn't have to be computed again.
+        """
+        caserun = self.__class__.__new__(self.__class__)
         caserun.testrun = self.testrun
-        caserun.running_for = self.running_for
+        caserun.testcase = self.testcase
+        caserun.configuration = self.configuration
+        caserun._running_for = self._running_for
         caserun.workflow = self.workflow
+        caserun._observers = None
+        caserun._snapshot = None
+        caserun._result = None
         caserun.result = self.result.copy()
+        caserun.readOnly = False
         # logs are on purpose shared
-        caserun.logs = self.logs
+        caserun._logs = self._sharedLogs()
+        # the timeline is immutable tuple so it can be shared as well
+        caserun._timeline = self._timeline
+        caserun._id = self.id
         return caserun
 
+    @property
+    def id(self):
+        """
+        String ID made from hash of the testcase id and configuration, it's
+        used as identity of the caseRunConfiguration. The ID is computed once
+        it's needed for the first time and it's shared with the copies.
+        """
+        if self._id is None:
+            self._id = sha1(f'{self.testcase.id}:{sorted(self.configuration.items())}'.encode()).hexdigest()
+        return self._id
+
+    @property
+    def result(self):
+        """Result holding state and result of this caseRunConfiguration"""
+        return self._result
+
+    @result.setter
+    def result(self, result):
+        with resultLock(self):
+            oldResult = self._result
+            if oldResult is not None and oldResult._owner is self:
+                oldResult._owner = None
+            result._owner = self
+            self._result = result
+            if oldResult is not None:
+                self._resultChanged(oldResult.key, result.key)
+
+    @property
+    def running_for(self):
+        """
+        Mapping of plans for which this configuration shoud be executed. The
+        mapping is shared with copies and snapshots so it's replaced, not
+        changed in place, when the plans change.
+        """
+        return self._running_for
+
+    @running_for.setter
+    def running_for(self, running_for):
+        self._running_for = running_for
+        self._runningForChanged()
+
+    def _notifyObservers(self, methodName, *args):
+        """
+        Call method of given name on all CaseRunConfigurationsLists observing
+        this caseRunConfiguration.
+        """
+        if self._observers is None:
+            return
+        deadObservers = False
+        for observerRef in self._observerRefs():
+            observer = observerRef()
+            if observer is None:
+                deadObservers = True
+                continue
+            getattr(observer, methodName)(self, *args)
+        if deadObservers:
+            self._removeObserver(None)
+
+    def _resultChanged(self, oldKey, newKey):
+        """
+        Notify CaseRunConfigurationsLists observing this caseRunConfiguration
+        about change of its result.
+        """
+        self._snapshot = None
+        self._notifyObservers('_memberResultChanged', oldKey, newKey)
+
+    def _runningForChanged(self):
+        """
+        Notify CaseRunConfigurationsLists observing this caseRunConfiguration
+        about change of the testplans it's running for.
+        """
+        with resultLock(self):
+            self._snapshot = None
+            self._notifyObservers('_memberRunningForChanged')
+
+    @property
+    def timeline(self):
+        """
+        Tuple of Transitions of this caseRunConfiguration recorded by
+        recordTransition (in order they happened).
+        """
+        return self._timeline
+
+    @timeline.setter
+    def timeline(self, timeline):
+        self._timeline = tuple(timeline)
+        self._snapshot = None
+
+    def recordTransition(self):
+        """
+        Record that this caseRunConfiguration entered its current state now.
+        """
+        workflow = type(self.workflow).__name__ if self.workflow is not None else None
+        transition = Transition(self.result.state, time.monotonic(), time.time(), workflow)
+        with resultLock(self):
+            self._timeline += (transition,)
+            self._snapshot = None
+
+    def phaseDurations(self):
+        """
+        Time spent in the individual states based on the recorded timeline.
+        The current (last recorded) state is not included.
+
+        :return: List of (state, seconds) tuples
+        :rtype: list
+        """
+        timeline = self._timeline
+        return [
+            (transition.state, nextTransition.monotonic - transition.monotonic)
+            for transition, nextTransition in zip(timeline, timeline[1:])
+        ]
+
+    @property
+    def executionTime(self):
+        """
+        Seconds from the first recorded transition to 'started' (or any later)
+        state to the last recorded transition, 0 if the execution didn't start.
+        """
+        startedRank = STATE_RANKS['started']
+        for transition in self._timeline:
+            if STATE_RANKS[transition.state] >= startedRank:
+                return self._timeline[-1].monotonic - transition.monotonic
+        return 0
+
+    def snapshot(self, result=None):
+        """
+        Provide immutable snapshot of this caseRunConfiguration. The snapshot
+        is made only once for each change of the result (or logs, running_for
+        and timeline) and it's shared by all the callers.
+
+        :param result: Result to be used in the snapshot instead of the current one, such snapshot is not shared.
+        :type result: libpermian.result.Result, optional
+        :return: Snapshot of this caseRunConfiguration
+        :rtype: CaseRunConfigurationSnapshot
+        """
+        if result is not None:
+            return CaseRunConfigurationSnapshot(self, result)
+        with resultLock(self):
+            if self._snapshot is None:
+                self._snapshot = CaseRunConfigurationSnapshot(self, self._result)
+            return self._snapshot
+
+    def __getstate__(self):
+        """
+        Pickled caseRunConfiguration (e.g. sent to worker process with its
+        workflow) doesn't keep links to testrun, workflow and observers.
+        """
+        state = {name: getattr(self, name) for name in self.__slots__ if name != '__weakref__'}
+        state.update(testrun=None, workflow=None, _observers=None, _snapshot=None)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        self._result._owner = self
+
+    def _observerRefs(self):
+        """
+        Weak references to the observers. Single observer (the usual case) is
+        kept as bare weak reference, more of them in tuple which is replaced
+        when the observers change.
+        """
+        observers = self._observers
+        if observers is None:
+            return ()
+        if isinstance(observers, tuple):
+            return observers
+        return (observers,)
+
+    def _setObserverRefs(self, observerRefs):
+        if not observerRefs:
+            self._observers = None
+        elif len(observerRefs) == 1:
+            self._observers = observerRefs[0]
+        else:
+            self._observers = tuple(observerRefs)
+
+    def _addObserver(self, observer):
+        observerRefs = self._observerRefs()
+        if not any(observerRef() is observer for observerRef in observerRefs):
+            self._setObserverRefs(observerRefs + (weakref.ref(observer),))
+
+    def _removeObserver(self, observer):
+        if self._observers is None:
+            return
+        self._setObserverRefs(tuple(
+            observerRef for observerRef in self._observerRefs()
+            if observerRef() is not observer and observerRef() is not None
+        ))
+
+    @property
+    def logs(self):
+        """
+        Paths or URLs to logs associated to the caseRunConfiguration with
+        specific names. The dict is allocated only when first log is added
+        (or when it has to be shared with a copy), until then read-only empty
+        mapping is provided.
+        """
+        if self._logs is None:
+            return EMPTY_MAPPING
+        return self._logs
+
+    @logs.setter
+    def logs(self, logs):
+        self._logs = logs
+        self._snapshot = None
+
+    def _sharedLogs(self):
+        """
+        Provide logs dict which can be shared with copies of this instance
+        allocating it if needed.
+        """
+        if self._logs is None:
+            self._logs = dict()
+        return self._logs
+
+    def copy(self):
+        return self._copy()
+
     def readOnlyCopy(self):
         """
         Provide read-only copy of this instance. This is meant to be used when
         one copy is provided to multiple destinations and the destinations
         should not have ability to change state of the shared instance.
         """
-        caserun = CaseRunConfiguration(self.testcase, self.configuration, [])
-        caserun.testrun = self.testrun
-        caserun.running_for = self.running_for
-        caserun.workflow = self.workflow
-        caserun.result = self.result.copy()
-        # logs are on purpose shared
-        caserun.logs = self.logs
+        caserun = self._copy()
         caserun.readOnly = True
         return caserun
 
@@ -85,14 +328,20 @@ class CaseRunConfiguration():
         if self.result.final:
             return False
         self.running_for =  { plan:False for plan in self.running_for }
-        crc_copy = self.copy()
-        if self.workflow.groupTerminate([self.id]):
-            crc_copy.updateResult(Result('canceled', None, True))
+        if self.workflow.requestTermination([self.id]):
+            cancelResult = Result('canceled', None, True)
             canceled = True
         else:
-            crc_copy.updateResult(Result('canceled', 'ERROR'))
+            cancelResult = Result('canceled', 'ERROR')
             canceled = False
-        self.testrun.update(crc_copy)
+        # merge the cancel into copy of the current result so that the result
+        # already reached (e.g. FAIL) is kept
+        result = self.result.copy()
+        try:
+            result.update(cancelResult)
+        except StateChangeError as e:
+            LOGGER.error('Cannot change state of result: %s', e)
+        self.testrun.update(self.snapshot(result))
         return canceled
 
     def updateResult(self, result):
@@ -152,7 +401,8 @@ class CaseRunConfiguration():
     def addLog(self, name, logfile):
         if name in self.logs and self.logs[name] != logfile:
             raise LocalLogExistsError(self.id, name, self.logs[name], logfile)
-        self.logs[name] = logfile
+        self._sharedLogs()[name] = logfile
+        self._snapshot = None
 
     def openLogfile(self, name, mode="r", autoadd=False, filename=None):
         """
@@ -200,7 +450,7 @@ class CaseRunConfiguration():
             raise ValueError("Cannot merge different CaseRunConfigurations")
         if self.readOnly:
             raise ReadOnlyChangeError(f'Cannot change state of read-only result: {self}')
-        self.running_for.update(other.running_for)
+        self.running_for = {**self.running_for, **other.running_for}
         return self
 
     def __eq__(self, other):
@@ -208,7 +458,7 @@ class CaseRunConfiguration():
         Custom implementation of == operator.
 
         Compare with other CaseRunConfiguration and if they are of the same
-        testcase and configuration return True.
+        testcase and configuration (have the same id) return True.
 
         If the type of other is different fallback to other python methods
         allowing for other to still consider itself being the same thing.
@@ -219,30 +469,420 @@ class CaseRunConfiguration():
         """
         if not isinstance(other, CaseRunConfiguration):
             raise NotImplementedError()
-        return (self.testcase, self.configuration) == (other.testcase, other.configuration)
+        return self.id == other.id
 
     def __hash__(self):
-        """ Returns hash of the CaseRunConfiguration made from testcase and configuration """
-        return hash((self.testcase, tuple(sorted(self.configuration.items()))))
+        """ Returns hash of the CaseRunConfiguration made from its id (testcase and configuration) """
+        return hash(self.id)
 
     def __repr__(self):
         return f"<CaseRunConfiguration({self.testcase.name}:{self.configuration})>"
 
+_SnapshotFields = namedtuple('_SnapshotFields', (
+    'id', 'testrun', 'testcase', 'configuration', 'running_for', 'workflow', 'result', 'logs', 'timeline',
+))
+
+class CaseRunConfigurationSnapshot(_SnapshotFields):
+    """
+    Immutable and hashable snapshot of caseRunConfiguration taken at the
+    moment of result change. The snapshot provides the same attributes as
+    read-only caseRunConfiguration, but the result, logs and timeline are
+    frozen copies (running_for is never changed in place, so read-only view of
+    it is enough) so the snapshot can be shared by all the consumers (e.g.
+    ReportSenders) without copying it for each of them.
+
+    :param crc: CaseRunConfiguration of which the snapshot is made
+    :type crc: CaseRunConfiguration
+    :param result: Result to be frozen in the snapshot
+    :type result: libpermian.result.Result
+    """
+    __slots__ = ()
+    readOnly = True
+
+    def __new__(cls, crc, result):
+        return super().__new__(
+            cls,
+            id=crc.id,
+            testrun=crc.testrun,
+            testcase=crc.testcase,
+            configuration=crc.configuration,
+            running_for=MappingProxyType(crc.running_for),
+            workflow=crc.workflow,
+            result=ResultSnapshot(result),
+            logs=MappingProxyType(dict(crc.logs)) if crc.logs else EMPTY_MAPPING,
+            timeline=crc.timeline,
+        )
+
+    def __setattr__(self, name, value):
+        raise ReadOnlyChangeError(f'Cannot change caseRunConfiguration snapshot: {self}')
+
+    def __eq__(self, other):
+        if not isinstance(other, CaseRunConfigurationSnapshot):
+            return NotImplemented
+        return self.id == other.id and self.result == other.result
+
+    def __hash__(self):
+        return hash((self.id, self.result))
+
+    def __repr__(self):
+        return f"<CaseRunConfigurationSnapshot({self.testcase.name}:{self.configuration}, {self.result})>"
+
 class CaseRunConfigurationsList(list):
-    """ Special list object with modified behaviour of append method for use with CaseRunConfigurations """
+    """
+    Special list object with modified behaviour of append method for use with
+    CaseRunConfigurations.
+
+    The list maintains index mapping caseRunConfiguration ids (identity of
+    the caseRunConfigurations, items without id are indexed by themselves) to
+    their position in the list. This makes
+    merging of the same caseRunConfigurations during append and lookup of
+    caseRunConfiguration by its id constant time operations.
+
+    The index is built once it's needed for the first time and it's updated
+    by append and extend, all other operations changing the list content
+    just mark the index as outdated and it's rebuilt once it's needed again.
+
+    Once aggregated information about results (status, result,
+    hasDirtyResult, allResultsFinal, unfinishedCount) is requested, the list
+    starts observing its caseRunConfigurations and maintains counters of their
+    states, results, final and dirty flags (and of not final results per
+    testcase) which are updated whenever result of any of the
+    caseRunConfigurations changes. Operations other than append and extend
+    stop the observation and the counters are computed again when needed.
+    The observing list also maintains set of caseRunConfigurations with
+    dirty result, see withDirtyResult and clearDirtyResults. The counters are
+    guarded by lock of the list (created once it's needed), so result changes
+    of caseRunConfigurations in different lists don't wait for each other.
+
+    The groupings provided by by_testcase, by_workflowType, by_configuration
+    and by_testplan are cached by the list (which observes its
+    caseRunConfigurations meanwhile). The cache is dropped when the content of
+    the list changes and the by_testplan grouping is dropped as well when
+    running_for of any of the caseRunConfigurations changes. Each call provides
+    new dict, however the grouped CaseRunConfigurationsLists are shared and
+    should not be modified. The grouped lists don't observe the
+    caseRunConfigurations themselves, instead the list counts changes of the
+    results and the grouped lists recompute their counters when some of the
+    results changed since they were computed last time (the grouped lists
+    share lock of the list). Once the grouping is dropped from the cache, the
+    grouped lists start observing on their own.
+    """
+    __slots__ = (
+        '_positions', '_lock', '_observing', '_stateCounts', '_resultCounts', '_finalCount',
+        '_unfinishedByTestcase', '_dirtyCrcs', '_groupings', '_resultVersion', '_parent',
+        '_countedVersion', '__weakref__',
+    )
+
+    def __init__(self, *args):
+        super().__init__()
+        self._positions = None
+        self._lock = None
+        self._observing = False
+        self._stateCounts = None
+        self._resultCounts = None
+        self._finalCount = 0
+        self._unfinishedByTestcase = None
+        self._dirtyCrcs = None
+        self._groupings = None
+        self._resultVersion = 0
+        self._parent = None
+        self._countedVersion = None
+        if args:
+            self.extend(*args)
+
+    @classmethod
+    def _fromUnique(cls, caseRunConfigurations):
+        """
+        Make list of caseRunConfigurations which are known to be unique (e.g.
+        taken from other list) without attempting to merge them.
+        """
+        crcList = cls()
+        list.extend(crcList, caseRunConfigurations)
+        return crcList
+
+    def _reindex(self):
+        """
+        Build the index from the current content of the list if it's
+        outdated.
+        """
+        if self._positions is not None:
+            return
+        self._positions = {self._key(crc): position for position, crc in enumerate(self)}
+
+    @staticmethod
+    def _key(item):
+        """
+        Key of the item in the index, id of the caseRunConfiguration.
+        """
+        return getattr(item, 'id', item)
+
+    def _position(self, item):
+        """
+        Position of the item in the list or None if it's not present.
+        """
+        self._reindex()
+        try:
+            position = self._positions.get(self._key(item))
+        except TypeError:
+            # unhashable items cannot be present in the list
+            return None
+        if position is None or self[position] != item:
+            return None
+        return position
+
+    def _getLock(self):
+        """
+        Provide lock guarding the counters creating it if needed.
+        """
+        lock = self._lock
+        if lock is None:
+            with _LIST_LOCK_CREATION_LOCK:
+                if self._lock is None:
+                    self._lock = threading.RLock()
+                lock = self._lock
+        return lock
+
+    def _changing(self):
+        """
+        Called before the content of the list is changed by other means than
+        append or extend. Stop observing the caseRunConfigurations, mark the
+        index as outdated and drop the cached groupings.
+        """
+        self._unobserve()
+        self._positions = None
+        self._countedVersion = None
+        self._dropGroupings()
+
+    def _observe(self):
+        """
+        Start observing caseRunConfigurations in this list computing the
+        counters of their states, results, final and dirty flags.
+
+        Each caseRunConfiguration is registered and counted while holding its
+        result lock so no change of its result is missed or counted twice.
+        The lock of the list is never held while acquiring the result lock
+        (result change notification acquires them in the opposite order).
+        Lists start (and stop) observing one at a time, see _OBSERVE_LOCK.
+
+        Grouped list cached by its parent doesn't observe the
+        caseRunConfigurations, it just recounts them if any result in the
+        parent changed since the last time, see _cachedGrouping.
+        """
+        if self._observing:
+            return
+        parent = self._parent
+        if parent is not None:
+            version = parent._resultVersion
+            if self._countedVersion != version:
+                self._recount()
+                self._countedVersion = version
+            return
+        lock = self._getLock()
+        with _OBSERVE_LOCK:
+            if self._observing:
+                return
+            with lock:
+                self._resetCounters()
+            for crc in self:
+                with resultLock(crc):
+                    crc._addObserver(self)
+                    with lock:
+                        self._count(crc, crc.result.key, 1)
+            self._observing = True
+
+    def _resetCounters(self):
+        self._stateCounts = [0] * len(STATE_NAMES)
+        self._resultCounts = [0] * len(RESULT_NAMES)
+        self._finalCount = 0
+        self._unfinishedByTestcase = None
+        self._dirtyCrcs = None
+
+    def _recount(self):
+        """
+        Compute the counters from current results of the caseRunConfigurations.
+        """
+        with self._getLock():
+            self._resetCounters()
+            for crc in self:
+                self._count(crc, crc.result.key, 1)
+
+    def _unobserve(self):
+        if not self._observing:
+            return
+        with _OBSERVE_LOCK:
+            if not self._observing:
+                return
+            self._observing = False
+            for crc in self:
+                with resultLock(crc):
+                    crc._removeObserver(self)
+            with self._lock:
+                self._stateCounts = None
+                self._resultCounts = None
+                self._unfinishedByTestcase = None
+                self._dirtyCrcs = None
+
+    def _count(self, crc, key, delta):
+        """
+        Update the counters by delta for caseRunConfiguration with result of
+        given key. The mapping of unfinished caseRunConfigurations per
+        testcase and the set of dirty ones are allocated once needed and
+        they're not maintained at all by grouped lists cached by their parent
+        (the grouped lists are small and inspected when needed).
+        """
+        stateRank, resultRank, final, dirty = key
+        self._stateCounts[stateRank] += delta
+        self._resultCounts[resultRank] += delta
+        if final:
+            self._finalCount += delta
+        if self._parent is not None:
+            return
+        if not final:
+            if self._unfinishedByTestcase is None:
+                self._unfinishedByTestcase = {}
+            testcaseId = crc.testcase.id
+            unfinished = self._unfinishedByTestcase.get(testcaseId, 0) + delta
+            if unfinished:
+                self._unfinishedByTestcase[testcaseId] = unfinished
+            else:
+                del self._unfinishedByTestcase[testcaseId]
+        if dirty and delta > 0:
+            if self._dirtyCrcs is None:
+                self._dirtyCrcs = set()
+            self._dirtyCrcs.add(crc)
+        elif dirty:
+            self._dirtyCrcs.discard(crc)
+
+    def _memberResultChanged(self, crc, oldKey, newKey):
+        """
+        Called by observed caseRunConfiguration when its result is changed.
+        """
+        with self._getLock():
+            self._resultVersion += 1
+            if self._stateCounts is None:
+                return
+            self._count(crc, oldKey, -1)
+            self._count(crc, newKey, 1)
+
+    def _memberRunningForChanged(self, crc):
+        """
+        Called by observed caseRunConfiguration when its running_for is changed.
+        """
+        self._dropGroupings(TESTPLAN_GROUPING)
+
+    def _dropGroupings(self, groupingKey=None):
+        """
+        Drop grouping identified by groupingKey (all groupings if not
+        provided) from the cache. The grouped lists are detached from this
+        list so they start observing their caseRunConfigurations on their
+        own if they're still used.
+        """
+        if not self._groupings:
+            return
+        if groupingKey is None:
+            groupings = self._groupings.values()
+            self._groupings = None
+        else:
+            grouping = self._groupings.pop(groupingKey, None)
+            groupings = () if grouping is None else (grouping,)
+        for grouping in groupings:
+            for crcList in grouping.values():
+                crcList._parent = None
+
+    def _added(self, crc):
+        """
+        Start observing newly added caseRunConfiguration if the list is
+        observing its content.
+        """
+        self._countedVersion = None
+        if not self._observing:
+            return
+        with resultLock(crc):
+            crc._addObserver(self)
+            with self._getLock():
+                self._count(crc, crc.result.key, 1)
+
     def append(self, other_caserun):
+        self._reindex()
+        key = self._key(other_caserun)
+        position = self._positions.get(key)
         # If CaseRunConfiguration already created add current testplan to its running_for
-        if other_caserun in self:
-            self[self.index(other_caserun)] += other_caserun
+        if position is not None:
+            caserun = self[position]
+            merged = caserun
+            merged += other_caserun
+            if merged is not caserun:
+                # the item wasn't updated in place, replace it and its index
+                super().__setitem__(position, merged)
+                del self._positions[key]
+                self._positions[self._key(merged)] = position
         else:
             super().append(other_caserun)
+            self._positions[key] = len(self) - 1
+            self._dropGroupings()
+            self._added(other_caserun)
+
+    def extend(self, other_caseruns):
+        for other_caserun in other_caseruns:
+            self.append(other_caserun)
+
+    def __iadd__(self, other_caseruns):
+        self.extend(other_caseruns)
+        return self
+
+    def __contains__(self, item):
+        return self._position(item) is not None
+
+    def index(self, item, *args):
+        if args:
+            return super().index(item, *args)
+        position = self._position(item)
+        if position is None:
+            raise ValueError(f'{item!r} is not in list')
+        return position
+
+    def __setitem__(self, index, value):
+        self._changing()
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._changing()
+        super().__delitem__(index)
+
+    def insert(self, index, value):
+        self._changing()
+        super().insert(index, value)
+
+    def pop(self, *args):
+        self._changing()
+        return super().pop(*args)
+
+    def remove(self, value):
+        self._changing()
+        super().remove(value)
+
+    def clear(self):
+        self._changing()
+        super().clear()
+
+    def sort(self, *args, **kwargs):
+        self._changing()
+        super().sort(*args, **kwargs)
+
+    def reverse(self):
+        self._changing()
+        super().reverse()
 
     def copy(self):
         """
         Provide new CaseRunConfigurationsList containing copies of
         CaseRunConfigurations from this list.
         """
-        return CaseRunConfigurationsList([crc.copy() for crc in self])
+        return CaseRunConfigurationsList._fromUnique(crc.copy() for crc in self)
+
+    def __reduce__(self):
+        # indexes, counters and groupings are rebuilt once needed
+        return (self.__class__, (list(self),))
 
     def by_key(self, key_func):
         """
@@ -253,79 +893,227 @@ class CaseRunConfigurationsList(list):
         :return:
         :rtype dict:
         """
-        result = {}
+        groups = {}
         for crc in self:
-            key = key_func(crc)
-            try:
-                result[key].append(crc)
-            except KeyError:
-                result[key] = CaseRunConfigurationsList([crc])
-        return result
+            groups.setdefault(key_func(crc), []).append(crc)
+        return {key: CaseRunConfigurationsList._fromUnique(crcs) for key, crcs in groups.items()}
+
+    def _cachedGrouping(self, groupingKey, build):
+        """
+        Provide copy of grouping identified by groupingKey building it by
+        calling build only if it's not cached yet.
+        """
+        self._observe()
+        if self._groupings is None:
+            self._groupings = {}
+        try:
+            grouping = self._groupings[groupingKey]
+        except KeyError:
+            grouping = build()
+            lock = self._getLock()
+            for crcList in grouping.values():
+                crcList._parent = self
+                crcList._lock = lock
+            self._groupings[groupingKey] = grouping
+        return dict(grouping)
 
     def by_testcase(self):
-        return self.by_key(lambda crc: crc.testcase.id)
+        return self._cachedGrouping(
+            ('testcase',),
+            lambda: self.by_key(lambda crc: crc.testcase.id)
+        )
 
     def by_workflowType(self):
-        return self.by_key(lambda crc: crc.testcase.execution.type)
+        return self._cachedGrouping(
+            ('workflowType',),
+            lambda: self.by_key(lambda crc: crc.testcase.execution.type)
+        )
 
     def by_configuration(self, *keys):
-        return self.by_key(
-            lambda crc: tuple([crc.configuration.get(key) for key in keys])
+        return self._cachedGrouping(
+            ('configuration',) + keys,
+            lambda: self.by_key(
+                lambda crc: tuple([crc.configuration.get(key) for key in keys])
+            )
         )
 
-    def by_testplan(self):
-        result = {}
+    def _by_testplan(self):
+        groups = {}
         for crc in self:
             for testplan in crc.running_for:
-                try:
-                    result[testplan].append(crc)
-                except KeyError:
-                    result[testplan] = CaseRunConfigurationsList([crc])
-        return result
+                groups.setdefault(testplan, []).append(crc)
+        return {testplan: CaseRunConfigurationsList._fromUnique(crcs) for testplan, crcs in groups.items()}
+
+    def by_testplan(self):
+        return self._cachedGrouping(TESTPLAN_GROUPING, self._by_testplan)
 
     @property
     def status(self):
         """Return lowest state present in the caseRunConfigurations"""
-        states = { state:i for i, state in enumerate(STATES) }
-        return list(STATES)[min([states[crc.result.state] for crc in self])]
+        self._observe()
+        for stateRank, count in enumerate(self._stateCounts):
+            if count:
+                return STATE_NAMES[stateRank]
+        raise ValueError('Cannot provide status of empty CaseRunConfigurationsList')
 
     @property
     def result(self):
         """Return highest result present in the caseRunConfigurations"""
-        results = { result:i for i, result in enumerate(RESULTS) }
-        return list(RESULTS)[max([results[crc.result.result] for crc in self])]
+        self._observe()
+        for resultRank in range(len(RESULT_NAMES) - 1, -1, -1):
+            if self._resultCounts[resultRank]:
+                return RESULT_NAMES[resultRank]
+        raise ValueError('Cannot provide result of empty CaseRunConfigurationsList')
 
     @property
     def hasDirtyResult(self):
-        return any([crc.result.dirty for crc in self])
+        self._observe()
+        if self._parent is not None:
+            return any(crc.result.dirty for crc in self)
+        return bool(self._dirtyCrcs)
 
     @property
     def allResultsFinal(self):
-        return all([crc.result.final for crc in self])
+        self._observe()
+        return self._finalCount == len(self)
+
+    def unfinishedCount(self, testcase=None):
+        """
+        Number of caseRunConfigurations without final result, the number is
+        taken from the maintained counters so the list is not inspected.
+
+        :param testcase: Count only caseRunConfigurations of this testcase
+        :type testcase: tplib.TestCase, optional
+        :rtype: int
+        """
+        self._observe()
+        if testcase is None:
+            return len(self) - self._finalCount
+        if self._parent is not None:
+            return sum(1 for crc in self if crc.testcase.id == testcase.id and not crc.result.final)
+        with self._lock:
+            return (self._unfinishedByTestcase or EMPTY_MAPPING).get(testcase.id, 0)
 
     @property
     def ids(self):
         return [crc.id for crc in self]
 
+    def _dirtyCaseRunConfigurations(self):
+        """
+        CaseRunConfigurations with dirty result in order of this list taken
+        from the maintained set. Grouped list cached by its parent doesn't
+        maintain the set (see _count) and it's inspected instead.
+        """
+        self._observe()
+        if self._parent is not None:
+            return [crc for crc in self if crc.result.dirty]
+        self._reindex()
+        with self._lock:
+            dirtyCrcs = list(self._dirtyCrcs or ())
+        positions = self._positions
+        return sorted(dirtyCrcs, key=lambda crc: positions[self._key(crc)])
+
     @property
     def withDirtyResult(self):
-        try:
-            return self.by_key(lambda crc: crc.result.dirty)[True]
-        except KeyError:
-            return CaseRunConfigurationsList([])
+        """
+        CaseRunConfigurations with dirty result (in order of this list). The
+        caseRunConfigurations are taken from the maintained set of dirty
+        caseRunConfigurations so the whole list is not inspected.
+        """
+        return CaseRunConfigurationsList._fromUnique(self._dirtyCaseRunConfigurations())
+
+    def clearDirtyResults(self):
+        """
+        Mark results of all caseRunConfigurations in this list as not dirty.
+        Only caseRunConfigurations with dirty result are touched.
+        """
+        for crc in self._dirtyCaseRunConfigurations():
+            crc.result.dirty = False
+
+    def get(self, crcId, default=None):
+        """
+        Provide caseRunConfiguration of given id or default if there's no
+        such caseRunConfiguration in this list.
+        """
+        self._reindex()
+        position = self._positions.get(crcId)
+        return default if position is None else self[position]
 
     def __getitem__(self, index):
-        if isinstance(index, int):
+        if isinstance(index, (int, slice)):
             return super().__getitem__(index)
         crcId = index
-        for crc in self:
-            if crc.id == crcId:
-                return crc
-        raise KeyError(f'No caseRunConfiguration of id "{crcId}" found.')
+        self._reindex()
+        try:
+            return self[self._positions[crcId]]
+        except KeyError:
+            raise KeyError(f'No caseRunConfiguration of id "{crcId}" found.') from None
+
+
+class HybridConfigurationsIndex():
+    """ Index of ConfigurationDictHybrid configurations providing positions of
+    configurations compatible with other configuration without checking all of them.
+
+    The configurations are grouped by their set of keys and in each group
+    they are bucketed by values of the keys shared with the other
+    configuration (the buckets are built once for each set of shared keys).
+
+    :param configs: Configurations to be indexed
+    :type configs: list of ConfigurationDictHybrid
+    :raises TypeError: When some of the configuration values is not hashable
+    """
+    def __init__(self, configs):
+        self.configs = configs
+        self.groups = {}
+        for position, config in enumerate(configs):
+            hash(tuple(config.values()))
+            keys = frozenset(config)
+            try:
+                self.groups[keys][1].append(position)
+            except KeyError:
+                self.groups[keys] = (tuple(config), [position], {})
+
+    def compatible_positions(self, other):
+        """ Positions of indexed configurations compatible with other configuration
 
+        :raises TypeError: When some of the shared values in other configuration is not hashable
+        """
+        positions = []
+        for keys, positions_in_group, buckets in self.groups.values():
+            shared_keys = tuple([ key for key in keys if key in other ])
+            try:
+                bucket = buckets[shared_keys]
+            except KeyError:
+                bucket = buckets[shared_keys] = {}
+                for position in positions_in_group:
+                    config = self.configs[position]
+                    bucket.setdefault(tuple([ config[key] for key in shared_keys ]), []).append(position)
+            positions.extend(bucket.get(tuple([ other[key] for key in shared_keys ]), ()))
+        return positions
+
+class StrictConfigurationsIndex():
+    """ Index of ConfigurationDictStrict configurations providing positions of
+    configurations equal to other configuration using lookup by their items.
+
+    :param configs: Configurations to be indexed
+    :type configs: list of ConfigurationDictStrict
+    :raises TypeError: When some of the configuration values is not hashable
+    """
+    def __init__(self, configs):
+        self.positions = {}
+        for position, config in enumerate(configs):
+            self.positions.setdefault(frozenset(config.items()), []).append(position)
+
+    def compatible_positions(self, other):
+        """ Positions of indexed configurations compatible with other configuration
+
+        :raises TypeError: When some of the values in other configuration is not hashable
+        """
+        return self.positions.get(frozenset(other.items()), ())
 
 class ConfigurationDictHybrid(dict):
     """ Configuration dict that tries to combine configurations while respecting limitations """
+    index_class = HybridConfigurationsIndex
     def merge(self, other):
         """ Merges self and other dict by preserving key-values from other dict and adding unique keys from self """
         config = other.copy()
@@ -344,6 +1132,7 @@ class ConfigurationDictHybrid(dict):
 
 class ConfigurationDictStrict(dict):
     """ Configuration dict that 'merges' only exactly the same configurations """
+    index_class = StrictConfigurationsIndex
     def merge(self, other):
         """ Just returns other dict as it has to be the same in order to be 'merged' """
         return other
@@ -374,6 +1163,34 @@ class ConfigurationsList(list):
         else:
             raise UnknownTestConfigurationMergeMethod(merge_method)
         super().__init__(clist)
+        self.merge_method = merge_method
+        self._index = None
+
+    def _get_index(self):
+        """ Index of configurations in this list (see index_class of the
+        ConfigurationDict classes) built during the first merge. The list is
+        not expected to be modified afterwards.
+
+        :return: Index or None if the configurations cannot be indexed
+        """
+        if self._index is None:
+            try:
+                self._index = self[0].index_class(self)
+            except TypeError:
+                # unhashable values, the index cannot be used
+                self._index = False
+        return self._index or None
+
+    def _compatible_positions(self, other_config):
+        """ Positions of configurations in this list compatible with other_config """
+        index = self._get_index()
+        if index is not None:
+            try:
+                return index.compatible_positions(other_config)
+            except TypeError:
+                pass
+        return [ position for position, self_config in enumerate(self)
+                 if self_config.compatible_with(other_config) ]
 
     def merge(self, other):
         """ Merges self configurations and other configurations
@@ -387,20 +1204,22 @@ class ConfigurationsList(list):
         :return: Configurations
         :rtype: list of dicts
         """
-        configs = []
         # Handle no other configurations
         if other == None:
             other = [{}]
         # Handle no self configurations
         if self == []:
             return other
-        # Perform merge
-        for self_config in self:
-            for other_config in other:
-                if self_config.compatible_with(other_config):
-                    configs.append(self_config.merge(other_config))
-
-        return configs
+        # Perform merge visiting only compatible pairs of configurations and
+        # keep the order as if each self config was checked with each other config
+        other = list(other)
+        pairs = []
+        for other_position, other_config in enumerate(other):
+            for self_position in self._compatible_positions(other_config):
+                pairs.append((self_position, other_position))
+        pairs.sort()
+        return [ self[self_position].merge(other[other_position])
+                 for self_position, other_position in pairs ]
 
 def merge_testcase_configurations(caseRunConfigurations):
     """ Converts list of CaseRunConfiguration objects into a dict with testcase name as key
@@ -430,9 +1249,9 @@ def merge_testcase_configurations(caseRunConfigurations):
             testcase['result'] = caserun.result.copy()
             continue
 
-        if list(STATES).index(testcase['result'].state) > list(STATES).index(caserun.result.state):
-            testcase['result'].state = caserun.result.state
-        if list(RESULTS).index(testcase['result'].result) < list(RESULTS).index(caserun.result.result):
-            testcase['result'].result = caserun.result.result
+        if testcase['result'].stateRank > caserun.result.stateRank:
+            testcase['result'].stateRank = caserun.result.stateRank
+        if testcase['result'].resultRank < caserun.result.resultRank:
+            testcase['result'].resultRank = caserun.result.resultRank
 
     return testcases
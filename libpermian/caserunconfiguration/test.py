@@ -1,10 +1,13 @@
 import unittest
 import tempfile
 import os
+import gc
+import weakref
+import threading
 
-from . import CaseRunConfiguration, CaseRunConfigurationsList, merge_testcase_configurations
+from . import CaseRunConfiguration, CaseRunConfigurationsList, ConfigurationsList, merge_testcase_configurations
 from ..result import Result
-from ..exceptions import LocalLogExistsError, RemoteLogError
+from ..exceptions import LocalLogExistsError, RemoteLogError, ReadOnlyChangeError
 
 
 class DummyTestCase():
@@ -115,6 +118,116 @@ class TestCaseRunConfigurationLogs(unittest.TestCase):
         self.assertEqual(exception.name, 'url_log')
         self.assertEqual(exception.log_path, url)
 
+class TestCaseRunConfigurationIdentity(unittest.TestCase):
+    def setUp(self):
+        self.crc = CaseRunConfiguration(DummyTestCase('testcase1'), {'conf': 1}, [DummyTestPlan('A')])
+
+    def test_id(self):
+        self.assertEqual(self.crc.id, 'ac0ab05ef59b259ed60bae8356c816e9c4f4c88c')
+
+    def test_lazy_id(self):
+        with unittest.mock.patch('libpermian.caserunconfiguration.sha1') as mocked_sha1:
+            crc = CaseRunConfiguration(DummyTestCase('testcase1'), {'conf': 1}, [])
+        mocked_sha1.assert_not_called()
+        self.assertEqual(crc.id, self.crc.id)
+
+    def test_copy(self):
+        # the id is computed once and shared with copies
+        self.crc.id
+        with unittest.mock.patch('libpermian.caserunconfiguration.sha1') as mocked_sha1:
+            crc_copy = self.crc.copy()
+            readonly_copy = self.crc.readOnlyCopy()
+        mocked_sha1.assert_not_called()
+        self.assertIs(crc_copy.id, self.crc.id)
+        self.assertIs(readonly_copy.id, self.crc.id)
+        self.assertEqual(crc_copy, self.crc)
+        self.assertEqual(hash(readonly_copy), hash(self.crc))
+
+    def test_equality(self):
+        same = CaseRunConfiguration(DummyTestCase('testcase1'), {'conf': 1}, [])
+        other = CaseRunConfiguration(DummyTestCase('testcase1'), {'conf': 2}, [])
+        self.assertEqual(same, self.crc)
+        self.assertEqual(hash(same), hash(self.crc))
+        self.assertNotEqual(other, self.crc)
+
+    def test_lazy_logs(self):
+        self.assertIsNone(self.crc._logs)
+        self.assertEqual(self.crc.logs, {})
+        crc_copy = self.crc.copy()
+        crc_copy.addLog('foo', 'bar')
+        # logs are shared with copies
+        self.assertEqual(self.crc.logs, {'foo': 'bar'})
+
+    def test_lazy_extra_fields(self):
+        self.assertIsNone(self.crc.result._extra_fields)
+        self.assertEqual(self.crc.result.extra_fields, {})
+        self.crc.updateResult(Result('running', current_results='foo'))
+        self.assertEqual(self.crc.result.extra_fields, {'current_results': 'foo'})
+        self.assertEqual(self.crc.result.copy().extra_fields, {'current_results': 'foo'})
+
+    def test_snapshot(self):
+        snapshot = self.crc.snapshot()
+        self.assertIs(self.crc.snapshot(), snapshot)
+        self.assertEqual(snapshot.id, self.crc.id)
+        self.assertEqual(snapshot.result, Result('not started'))
+        self.assertEqual(hash(snapshot), hash(self.crc.snapshot(Result('not started'))))
+        with self.assertRaises(ReadOnlyChangeError):
+            snapshot.result = Result('running')
+        with self.assertRaises(ReadOnlyChangeError):
+            snapshot.result.state = 'running'
+        # new snapshot is made once the result changes
+        self.crc.updateResult(Result('running'))
+        self.assertIsNot(self.crc.snapshot(), snapshot)
+        self.assertEqual(snapshot.result, Result('not started'))
+        self.assertEqual(self.crc.snapshot().result, Result('running'))
+        snapshot = self.crc.snapshot()
+        self.crc.addLog('foo', 'bar')
+        self.assertEqual(snapshot.logs, {})
+        self.assertEqual(self.crc.snapshot().logs, {'foo': 'bar'})
+
+    def test_timeline(self):
+        self.assertEqual(self.crc.timeline, ())
+        self.assertEqual(self.crc.executionTime, 0)
+        self.crc.workflow = unittest.mock.MagicMock()
+        with unittest.mock.patch('libpermian.caserunconfiguration.time') as mocked_time:
+            for monotonic, state in enumerate(['not started', 'queued', 'started', 'running', 'complete'], 10):
+                mocked_time.monotonic.return_value = monotonic
+                mocked_time.time.return_value = 1000 + monotonic
+                self.crc.updateResult(Result(state))
+                self.crc.recordTransition()
+        self.assertEqual(
+            [(transition.state, transition.monotonic, transition.wall) for transition in self.crc.timeline],
+            [('not started', 10, 1010), ('queued', 11, 1011), ('started', 12, 1012), ('running', 13, 1013), ('complete', 14, 1014)],
+        )
+        self.assertEqual(self.crc.timeline[0].workflow, 'MagicMock')
+        self.assertEqual(
+            self.crc.phaseDurations(),
+            [('not started', 1), ('queued', 1), ('started', 1), ('running', 1)],
+        )
+        self.assertEqual(self.crc.executionTime, 2)
+        # the timeline is shared with copies and snapshots
+        self.assertIs(self.crc.copy().timeline, self.crc.timeline)
+        self.assertIs(self.crc.snapshot().timeline, self.crc.timeline)
+
+    def test_cancel_keeps_result(self):
+        self.crc.workflow = unittest.mock.MagicMock()
+        self.crc.testrun = unittest.mock.MagicMock()
+        self.crc.updateResult(Result('running', 'FAIL'))
+        self.crc.workflow.requestTermination.return_value = True
+        self.assertTrue(self.crc.cancel('test'))
+        snapshot = self.crc.testrun.update.call_args[0][0]
+        self.assertEqual(snapshot.result, Result('canceled', 'FAIL', True))
+        # the caseRunConfiguration itself is updated by the testrun
+        self.assertEqual(self.crc.result, Result('running', 'FAIL'))
+
+    def test_copies_not_kept_alive(self):
+        crc_copy = self.crc.readOnlyCopy()
+        crc_copy.id # access the id
+        copy_ref = weakref.ref(crc_copy)
+        del crc_copy
+        gc.collect()
+        self.assertIsNone(copy_ref())
+
 class TestCaseRunConfigurationsList(unittest.TestCase):
     def setUp(self):
         planA = DummyTestPlan('A')
@@ -146,6 +259,41 @@ class TestCaseRunConfigurationsList(unittest.TestCase):
         caserun_configurations.append(3)
         self.assertListEqual(caserun_configurations, [2, 3])
 
+    def test_append_merge(self):
+        planA = DummyTestPlan('A')
+        planC = DummyTestPlan('C')
+        testcase = self.crc11.testcase
+        self.crcList.append(CaseRunConfiguration(testcase, {'conf': 1, 'a': 0}, [planC]))
+        self.assertEqual(len(self.crcList), 4)
+        self.assertEqual(self.crc11.running_for, {'A': True, 'C': True})
+        crc = CaseRunConfiguration(testcase, {'conf': 4, 'a': 0}, [planA])
+        self.crcList.append(crc)
+        self.assertEqual(len(self.crcList), 5)
+        self.assertIs(self.crcList[crc.id], crc)
+        self.assertEqual(self.crcList.index(crc), 4)
+
+    def test_get(self):
+        self.assertIs(self.crcList.get(self.crc21.id), self.crc21)
+        self.assertIsNone(self.crcList.get('nonexisting'))
+        self.assertIn(self.crcList.get(self.crc11.snapshot().id), self.crcList)
+
+    def test_getitem_id(self):
+        for crc in self.crcList:
+            self.assertIs(self.crcList[crc.id], crc)
+        with self.assertRaises(KeyError):
+            self.crcList['nonexisting']
+
+    def test_index_after_change(self):
+        self.crcList.remove(self.crc12)
+        self.assertNotIn(self.crc12, self.crcList)
+        with self.assertRaises(KeyError):
+            self.crcList[self.crc12.id]
+        self.crcList.insert(0, self.crc12)
+        self.assertIn(self.crc12, self.crcList)
+        self.assertEqual(self.crcList.index(self.crc12), 0)
+        self.assertEqual(self.crcList.index(self.crc11), 1)
+        self.assertIs(self.crcList[self.crc12.id], self.crc12)
+
     def test_by_testcase(self):
         self.assertEqual(
             self.crcList.by_testcase(),
@@ -198,6 +346,48 @@ class TestCaseRunConfigurationsList(unittest.TestCase):
             },
         )
 
+    def test_grouping_cached(self):
+        by_testcase = self.crcList.by_testcase()
+        with unittest.mock.patch.object(CaseRunConfigurationsList, 'by_key') as mocked_by_key:
+            self.assertEqual(self.crcList.by_testcase(), by_testcase)
+        mocked_by_key.assert_not_called()
+        # the returned dict can be modified without affecting the cache
+        by_testcase.clear()
+        self.assertEqual(len(self.crcList.by_testcase()), 2)
+        self.assertIs(
+            self.crcList.by_configuration('conf')[(1,)],
+            self.crcList.by_configuration('conf')[(1,)],
+        )
+        self.assertIsNot(
+            self.crcList.by_configuration('conf')[(1,)],
+            self.crcList.by_configuration('a')[(0,)],
+        )
+
+    def test_grouping_membership(self):
+        self.assertEqual(len(self.crcList.by_testcase()), 2)
+        self.assertEqual(len(self.crcList.by_workflowType()['test']), 4)
+        crc = CaseRunConfiguration(DummyTestCase('testcase3'), {'conf': 1, 'a': 2}, [DummyTestPlan('A')])
+        self.crcList.append(crc)
+        self.assertEqual(len(self.crcList.by_testcase()), 3)
+        self.assertEqual(len(self.crcList.by_workflowType()['test']), 5)
+        self.crcList.remove(crc)
+        self.assertEqual(len(self.crcList.by_testcase()), 2)
+        self.assertEqual(len(self.crcList.by_workflowType()['test']), 4)
+
+    def test_grouping_running_for(self):
+        self.assertNotIn('C', self.crcList.by_testplan())
+        self.crcList.append(CaseRunConfiguration(self.crc21.testcase, {'conf': 1, 'a': 1}, [DummyTestPlan('C')]))
+        self.assertEqual(
+            self.crcList.by_testplan()['C'],
+            CaseRunConfigurationsList([self.crc21]),
+        )
+        self.crc21.running_for = {'A': True}
+        self.assertNotIn('C', self.crcList.by_testplan())
+        self.assertEqual(
+            self.crcList.by_testplan()['A'],
+            CaseRunConfigurationsList([self.crc11, self.crc12, self.crc21]),
+        )
+
     def test_combined(self):
         self.assertEqual(
             {
@@ -256,6 +446,83 @@ class TestCaseRunConfigurationsList(unittest.TestCase):
             crc.result.final = True
         self.assertTrue(self.crcList.allResultsFinal)
 
+    def test_unfinishedCount(self):
+        testcase1 = self.crc11.testcase
+        self.assertEqual(self.crcList.unfinishedCount(), len(self.crcList))
+        unfinished = self.crcList.unfinishedCount(testcase1)
+        self.assertEqual(unfinished, len(self.crcList.by_testcase()['testcase1']))
+        self.crc11.updateResult(Result('complete', 'PASS', True))
+        self.assertEqual(self.crcList.unfinishedCount(testcase1), unfinished - 1)
+        self.assertEqual(self.crcList.unfinishedCount(), len(self.crcList) - 1)
+        for crc in self.crcList:
+            crc.result.final = True
+        self.assertEqual(self.crcList.unfinishedCount(testcase1), 0)
+        self.assertEqual(self.crcList.unfinishedCount(), 0)
+        self.assertEqual(self.crcList.unfinishedCount(DummyTestCase('testcase3')), 0)
+
+    def test_counters_update(self):
+        byTestcase = self.crcList.by_testcase()
+        self.assertEqual(self.crcList.status, 'running')
+        self.assertEqual(byTestcase['testcase1'].result, 'FAIL')
+        self.crc11.updateResult(Result('complete', 'ERROR'))
+        self.assertEqual(self.crcList.status, 'complete')
+        self.assertEqual(byTestcase['testcase1'].result, 'ERROR')
+        self.assertEqual(byTestcase['testcase1'].status, 'complete')
+        self.assertFalse(self.crcList.allResultsFinal)
+        for crc in self.crcList:
+            crc.updateResult(Result('DNF', None, True))
+        self.assertTrue(self.crcList.allResultsFinal)
+        self.assertEqual(self.crcList.status, 'DNF')
+        self.assertTrue(byTestcase['testcase2'].allResultsFinal)
+
+    def test_grouping_not_observing(self):
+        byTestcase = self.crcList.by_testcase()
+        self.assertEqual(byTestcase['testcase1'].result, 'FAIL')
+        # only the list itself observes the caseRunConfiguration
+        self.assertEqual(len(self.crc11._observerRefs()), 1)
+        self.crc11.updateResult(Result('complete', 'ERROR'))
+        self.assertEqual(byTestcase['testcase1'].result, 'ERROR')
+        # dropped grouping keeps working on its own
+        self.crcList.remove(self.crc23)
+        self.crc12.updateResult(Result('complete', 'PASS', True))
+        self.crc11.updateResult(Result('complete', 'PASS', True))
+        self.assertTrue(byTestcase['testcase1'].allResultsFinal)
+        self.assertEqual(byTestcase['testcase1'].result, 'ERROR')
+        self.assertEqual(byTestcase['testcase2'].status, 'DNF')
+
+    def test_counters_result_replaced(self):
+        self.assertEqual(self.crcList.result, 'ERROR')
+        self.crc23.result = Result('complete', 'PASS')
+        self.crc21.result = Result('complete', 'PASS')
+        self.assertEqual(self.crcList.result, 'FAIL')
+        self.assertEqual(self.crcList.status, 'running')
+
+    def test_counters_lists_independent(self):
+        otherList = CaseRunConfigurationsList([self.crc21])
+        self.assertEqual(otherList.status, 'DNF')
+        self.assertEqual(self.crcList.status, 'running')
+        # result change of caseRunConfiguration not in otherList doesn't wait for its lock
+        with otherList._lock:
+            thread = threading.Thread(target=self.crc11.updateResult, args=(Result('complete', 'PASS'),))
+            thread.start()
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(self.crcList.status, 'complete')
+
+    def test_counters_membership(self):
+        self.assertEqual(self.crcList.result, 'ERROR')
+        self.crcList.remove(self.crc23)
+        self.assertEqual(self.crcList.result, 'FAIL')
+        # removed crc is not observed anymore
+        self.crc23.updateResult(Result('DNF', 'ERROR', True))
+        self.assertEqual(self.crcList.result, 'FAIL')
+        crc = CaseRunConfiguration(DummyTestCase('testcase3'), {}, [])
+        self.crcList.append(crc)
+        self.assertEqual(self.crcList.status, 'not started')
+        self.assertFalse(self.crcList.allResultsFinal)
+        crc.updateResult(Result('complete', 'PASS', True))
+        self.assertEqual(self.crcList.status, 'running')
+
     def test_ids(self):
         self.assertEqual(
             self.crcList.ids,
@@ -306,6 +573,77 @@ class TestCaseRunConfigurationsList(unittest.TestCase):
             ]),
         )
 
+    def test_clearDirtyResults(self):
+        self.crcList.clearDirtyResults()
+        self.assertFalse(self.crcList.hasDirtyResult)
+        self.assertEqual(self.crcList.withDirtyResult, CaseRunConfigurationsList())
+        self.crc23.updateResult(Result('DNF', 'ERROR', True))
+        self.crc11.updateResult(Result('complete', 'PASS', True))
+        self.assertTrue(self.crcList.hasDirtyResult)
+        self.assertEqual(
+            self.crcList.withDirtyResult,
+            CaseRunConfigurationsList([self.crc11, self.crc23]),
+        )
+        self.crcList.clearDirtyResults()
+        self.assertFalse(self.crc11.result.dirty)
+        self.assertFalse(self.crc23.result.dirty)
+        self.assertFalse(self.crcList.hasDirtyResult)
+
+class TestConfigurationsList(unittest.TestCase):
+    def setUp(self):
+        self.testplan_configs = [
+            {'arch': arch, 'variant': variant}
+            for arch in ['x86_64', 'aarch64', 's390x']
+            for variant in ['Server', 'Workstation']
+        ] + [{'arch': 'x86_64'}, {'variant': 'Server', 'compose': 'nightly'}, {}]
+        self.testcase_configs = [
+            {'arch': 'x86_64'},
+            {'arch': 's390x', 'variant': 'Server'},
+            {'variant': 'Workstation', 'extra': True},
+            {'arch': 'ppc64le'},
+            {'arch': 'x86_64', 'variant': 'Server'},
+            {},
+        ]
+
+    def naive_merge(self, configs, other):
+        return [
+            self_config.merge(other_config)
+            for self_config in configs
+            for other_config in other
+            if self_config.compatible_with(other_config)
+        ]
+
+    def test_merge_extension(self):
+        configs = ConfigurationsList(self.testplan_configs, 'extension')
+        expected = self.naive_merge(configs, self.testcase_configs)
+        self.assertEqual(configs.merge(self.testcase_configs), expected)
+        self.assertIn({'arch': 'x86_64', 'variant': 'Server', 'compose': 'nightly'}, expected)
+        # the cached index provides the same result
+        self.assertEqual(configs.merge(self.testcase_configs), expected)
+        self.assertEqual(configs.merge([{'arch': 'x86_64'}]), self.naive_merge(configs, [{'arch': 'x86_64'}]))
+
+    def test_merge_intersection(self):
+        configs = ConfigurationsList(self.testplan_configs, 'intersection')
+        self.assertEqual(
+            configs.merge(self.testcase_configs),
+            [{'arch': 'x86_64', 'variant': 'Server'}, {'arch': 's390x', 'variant': 'Server'}, {'arch': 'x86_64'}, {}],
+        )
+
+    def test_merge_empty(self):
+        configs = ConfigurationsList(None, 'extension')
+        self.assertEqual(configs.merge(self.testcase_configs), self.testcase_configs)
+        configs = ConfigurationsList(self.testplan_configs, 'intersection')
+        self.assertEqual(configs.merge(None), [{}])
+
+    def test_merge_unhashable(self):
+        testplan_configs = self.testplan_configs + [{'arch': 'x86_64', 'packages': ['foo']}]
+        testcase_configs = self.testcase_configs + [{'arch': 'x86_64', 'packages': ['foo']}]
+        for merge_method in ('extension', 'intersection'):
+            configs = ConfigurationsList(testplan_configs, merge_method)
+            self.assertEqual(configs.merge(testcase_configs), self.naive_merge(configs, testcase_configs))
+            configs = ConfigurationsList(self.testplan_configs, merge_method)
+            self.assertEqual(configs.merge(testcase_configs), self.naive_merge(configs, testcase_configs))
+
 class TestMerge_testcase_configurations(unittest.TestCase):
     def setUp(self):
         self.caseRunConfigurations = [CaseRunConfiguration(DummyTestCase('testcase1'), {'conf': 1}, []),
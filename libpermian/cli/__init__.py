@@ -14,7 +14,7 @@ import os
 import logging
 
 from .. import plugins
-from ..pipeline import run_pipeline, get_caserunconfigurations
+from ..pipeline import run_pipeline, get_caserunconfigurations, resume_reporting
 from .factory import CliFactory
 from . import builtin
 
@@ -78,5 +78,8 @@ def main(*raw_args):
             "\n ".join(crcList.by_testplan().keys()),
         )
         sys.exit(0 if crcList else 1)
+    if options.resume_reporting:
+        result = resume_reporting(options.resume_reporting, options.settings, options.override)
+        sys.exit(result)
     result = run_pipeline(event_spec, options.settings, options.override)
     sys.exit(result)
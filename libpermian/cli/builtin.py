@@ -1,6 +1,7 @@
 import sys
 
 from .factory import CliFactory
+from ..reportsenders.outbox import OutboxState
 
 @CliFactory.register_command('run_event')
 def direct_event(base_parser, args):
@@ -15,6 +16,18 @@ def direct_event(base_parser, args):
     options = base_parser.parse_args(args)
     return options, options.event
 
+@CliFactory.register_command('resume-reporting')
+def resume_reporting_command(base_parser, args):
+    """
+    Resume reporting of pipeline which died using its outbox (see outbox
+    option in reportSenders section). No workflow is executed, only the
+    results which were not delivered yet are reported. The event is taken
+    from the outbox.
+    """
+    base_parser.add_argument('resume_reporting', metavar='outbox')
+    options = base_parser.parse_args(args)
+    return options, OutboxState(options.resume_reporting).header['event']
+
 @CliFactory.register_command('pipeline')
 def pipeline_command(base_parser, args):
     """
@@ -30,6 +30,8 @@ def base_argparser():
         type=argparse.FileType('w'),
         help="Name of file where debug logs should be stored.",
     )
+    # set by resume-reporting command
+    parser.set_defaults(resume_reporting=None)
     verbosity = parser.add_mutually_exclusive_group()
     verbosity.add_argument(
         '--debug', '-d',
@@ -46,7 +46,24 @@ class Event():
         """
         caseruns = CaseRunConfigurationsList()
 
+        for testplan_caseruns in self.iter_caseRunConfigurations(library):
+            caseruns.extend(testplan_caseruns)
+
+        return caseruns
+
+    def iter_caseRunConfigurations(self, library):
+        """ Generates caseRunConfigurations for testcases in library relevant to this event
+        one testplan at a time. The same caseRunConfiguration (testcase and
+        configuration) may be provided for multiple testplans, it's up to the
+        consumer to merge them.
+
+        :param library: Library
+        :type library: tplib.Library
+        :return: Iterator of caseRunConfigurations of individual testplans
+        :rtype: Iterator[CaseRunConfigurationsList]
+        """
         for testplan in self.filter_testPlans(library):
+            caseruns = CaseRunConfigurationsList()
             # Init testplan configurations as ConfigurationsList
             testplan_configurations = ConfigurationsList(testplan.configurations,
                                                          merge_method=self.settings.get('library', 'defaultCaseConfigMergeMethod'))
@@ -56,8 +73,7 @@ class Event():
                 for configuration in caserun_configurations:
                     # Create CaseRunConfiguration
                     caseruns.append(CaseRunConfiguration(testcase, configuration, [testplan]))
-
-        return caseruns
+            yield caseruns
 
     def handles_testplan_artifact_type(self, artifact_type):
         """
@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+LOGGER = logging.getLogger(__name__)
+
+class HostStats():
+    """
+    Statistics of requests made to one host.
+    """
+    __slots__ = ('requests', 'errors', 'totalLatency', 'maxLatency')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        """Number of requests which failed or ended with 5xx status code"""
+        self.totalLatency = 0.0
+        self.maxLatency = 0.0
+
+    @property
+    def meanLatency(self):
+        return self.totalLatency / self.requests if self.requests else 0.0
+
+    def asDict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'mean_latency': self.meanLatency,
+            'max_latency': self.maxLatency,
+        }
+
+class HttpClient():
+    """
+    HTTP client keeping pool of keep-alive connections per host so that
+    repeated requests to the same host don't pay the TCP and TLS setup again.
+    The client is meant to be shared by the whole pipeline, see client
+    function.
+
+    requests.Session is not guaranteed to be thread-safe (e.g. its cookie
+    jar), so each thread gets its own session (see session property). All
+    the sessions share one transport adapter and so one (thread-safe)
+    connection pool. Cookies are therefore not shared among threads, callers
+    needing cookies should pass them explicitly.
+
+    Timeouts are applied to all the requests unless the request provides its
+    own timeout. Failed connections and 502/503/504 responses of idempotent
+    requests are retried with exponential backoff.
+
+    :param settings: Pipeline settings, the http section is used
+    :type settings: libpermian.settings.Settings, optional
+    """
+    def __init__(self, settings=None):
+        if settings is not None:
+            self.timeout = (
+                settings.getfloat('http', 'connect_timeout') or None,
+                settings.getfloat('http', 'timeout') or None,
+            )
+            retries = settings.getint('http', 'retries')
+            backoff = settings.getfloat('http', 'retry_backoff')
+            poolSize = settings.getint('http', 'pool_maxsize')
+        else:
+            self.timeout = (10, 60)
+            retries, backoff, poolSize = 3, 0.5, 10
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(pool_connections=poolSize, pool_maxsize=poolSize, max_retries=retry)
+        """Transport adapter holding the connection pools shared by all the sessions"""
+        self._local = threading.local()
+        self._stats = {}
+        self._statsLock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        Session of the current thread using the shared adapter.
+
+        :rtype: requests.Session
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self._local.session = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        """
+        Make HTTP request using the pooled connections, the arguments are the
+        same as for requests.request.
+
+        :rtype: requests.Response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = urllib.parse.urlsplit(url).netloc
+        start = time.monotonic()
+        failed = True
+        try:
+            response = self.session.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self._record(host, time.monotonic() - start, failed)
+
+    def _record(self, host, latency, failed):
+        with self._statsLock:
+            stats = self._stats.setdefault(host, HostStats())
+            stats.requests += 1
+            stats.errors += failed
+            stats.totalLatency += latency
+            stats.maxLatency = max(stats.maxLatency, latency)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def stats(self):
+        """
+        :return: Statistics of requests made by this client per host
+        :rtype: dict
+        """
+        with self._statsLock:
+            return {host: stats.asDict() for host, stats in self._stats.items()}
+
+    def logStats(self):
+        for host, stats in sorted(self.stats().items()):
+            LOGGER.info('HTTP requests to %s: %d (%d failed), mean latency %.3fs, max %.3fs',
+                        host, stats['requests'], stats['errors'], stats['mean_latency'], stats['max_latency'])
+
+    def close(self):
+        """
+        Close all the pooled connections. Sessions of the threads don't hold
+        any other resources so they don't need to be closed.
+        """
+        self.adapter.close()
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+def configure(settings):
+    """
+    Create the pipeline-wide HTTP client using provided settings replacing
+    the previous one.
+
+    :rtype: HttpClient
+    """
+    global _CLIENT
+    newClient = HttpClient(settings)
+    with _CLIENT_LOCK:
+        oldClient, _CLIENT = _CLIENT, newClient
+    if oldClient is not None:
+        oldClient.close()
+    return newClient
+
+def client():
+    """
+    Provide the pipeline-wide HTTP client, if it was not configured yet,
+    client with default settings is created.
+
+    :rtype: HttpClient
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = HttpClient()
+        return _CLIENT
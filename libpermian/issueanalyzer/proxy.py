@@ -1,13 +1,31 @@
 import threading
 import contextlib
+from collections.abc import Mapping, Set
 
 from .issueset import IssueSet
 from ..exception_dump import dump_exception
 
+def _freeze(value):
+    """
+    Provide hashable (and immutable) view of value made of nested mappings,
+    lists and sets, other values are provided as they are.
+    """
+    if isinstance(value, Mapping):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, Set):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
 class IssueAnalyzerProxy():
     """
     Issues are cached in issue_cache with key being unique issue identifier
-    defined by implementation of BaseAnalyzer
+    defined by implementation of BaseAnalyzer.
+
+    Issue sets found for caseRunConfigurations are cached as well so that the
+    registered analyzers are run for each caseRunConfiguration only when its
+    result or logs change, see analyze_one.
     """
     issue_analyzers = set()
 
@@ -27,6 +45,9 @@ class IssueAnalyzerProxy():
         self.settings = settings
         self._issue_cache = {}
         self._issue_cache_lock = threading.Lock()
+        self._analysis_cache = {}
+        """Latest analysis of each caseRunConfiguration (crc id -> (result version, IssueSet))"""
+        self._analysis_cache_lock = threading.Lock()
 
     @property
     @contextlib.contextmanager
@@ -43,24 +64,70 @@ class IssueAnalyzerProxy():
             yield cache_copy
             self._issue_cache.update(cache_copy)
 
+    @staticmethod
+    def _result_version(caseRunConfiguration):
+        """
+        Identify the version of caseRunConfiguration result which the
+        analysis depends on - the result itself including its extra fields
+        (e.g. beaker links) and the logs.
+        """
+        result = caseRunConfiguration.result
+        return (
+            result.state,
+            result.result,
+            result.final,
+            _freeze(result.extra_fields),
+            tuple(caseRunConfiguration.logs.items()),
+        )
+
+    def _analyze_one(self, caseRunConfiguration):
+        """
+        Run the registered analyzers for the caseRunConfiguration.
+
+        :return: Tuple of the issue set and flag whether all the analyzers succeeded
+        :rtype: tuple
+        """
+        succeeded = True
+        # consider crcs with final result as complete, if it's not complete
+        # the analysis cannot be reliable
+        issueSet = IssueSet(complete=caseRunConfiguration.result.final)
+        for IssueAnalyzer in self.issue_analyzers:
+            try:
+                issueSet.extend(IssueAnalyzer.analyze(self, caseRunConfiguration))
+            except Exception as e:
+                dump_exception(e, IssueAnalyzer)
+                issueSet.extend(IssueSet(complete=False))
+                succeeded = False
+        if not issueSet and caseRunConfiguration.result.result != "PASS":
+            # No issue was found and the result is not PASS, so there
+            # seems to be something missing, mark it as incomplete to
+            # require review.
+            return IssueSet(complete=False), succeeded
+        return issueSet, succeeded
+
+    def analyze_one(self, caseRunConfiguration):
+        """
+        Provide issue set of single caseRunConfiguration. The analysis is
+        done only once for each version of the caseRunConfiguration result
+        (see _result_version), the issue set is then cached under the
+        caseRunConfiguration id and it's shared so it must not be modified.
+        Analysis in which some of the analyzers failed is not cached.
+
+        :rtype: IssueSet
+        """
+        version = self._result_version(caseRunConfiguration)
+        with self._analysis_cache_lock:
+            cached = self._analysis_cache.get(caseRunConfiguration.id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        issueSet, succeeded = self._analyze_one(caseRunConfiguration)
+        if succeeded:
+            with self._analysis_cache_lock:
+                self._analysis_cache[caseRunConfiguration.id] = (version, issueSet)
+        return issueSet
+
     def analyze(self, caseRunConfigurations):
         superIssueSet = IssueSet()
-
         for caseRunConfiguration in caseRunConfigurations:
-            # consider crcs with final result as complete, if it's not complete
-            # the analysis cannot be reliable
-            issueSet = IssueSet(complete=caseRunConfiguration.result.final)
-            for IssueAnalyzer in self.issue_analyzers:
-                try:
-                    issueSet.extend(IssueAnalyzer.analyze(self, caseRunConfiguration))
-                except Exception as e:
-                    dump_exception(e, IssueAnalyzer)
-                    issueSet.extend(IssueSet(complete=False))
-            if not issueSet and caseRunConfiguration.result.result != "PASS":
-                # No issue was found and the result is not PASS, so there
-                # seems to be something missing, mark it as incomplete to
-                # require review.
-                superIssueSet.extend(IssueSet(complete=False))
-            else:
-                superIssueSet.extend(issueSet)
+            superIssueSet.extend(self.analyze_one(caseRunConfiguration))
         return superIssueSet
@@ -4,6 +4,7 @@ from .proxy import IssueAnalyzerProxy
 from .base import BaseAnalyzer, BaseIssue
 from .issueset import IssueSet
 from libpermian.caserunconfiguration import CaseRunConfiguration
+from libpermian.result import Result
 from libpermian.pipeline import Pipeline
 
 # share common setUp and tearDown between test cases, but not tests
@@ -19,7 +20,7 @@ class TestIssueAnalyzerProxyCommon(unittest.TestCase):
         # cannot be used as the IssueAnalyzerProxy accesses the result
         # attribute so instance of CaseRunConfiguration is needed as it has
         # attributes set by __init__
-        fake_crc = CaseRunConfiguration(None, None, [])
+        fake_crc = CaseRunConfiguration(unittest.mock.MagicMock(), {}, [])
         self.crc1 = unittest.mock.create_autospec(fake_crc, spec_set=True)
         self.crc2 = unittest.mock.create_autospec(fake_crc, spec_set=True)
         self.crc3 = unittest.mock.create_autospec(fake_crc, spec_set=True)
@@ -166,3 +167,41 @@ class TestIssueAnalyzerProxyCache(TestIssueAnalyzerProxyCommon):
         with self.analyzerProxy.issue_cache as issue_cache:
             self.assertTrue(self.analyzerProxy._issue_cache_lock.locked())
             self.assertEqual(issue_cache, {"foo": "bar"})
+
+class TestIssueAnalyzerProxyAnalysisCache(TestIssueAnalyzerProxyCommon):
+    def setUp(self):
+        super().setUp()
+        IssueAnalyzerProxy.register(self.AnalyzerClass1)
+
+    def test_cached_analysis(self):
+        issue = unittest.mock.create_autospec(BaseIssue, instance=True)
+        self.AnalyzerClass1.analyze.return_value = [issue]
+        result = self.analyzerProxy.analyze(self.caseRunConfigurations)
+        self.assertCountEqual(result.all, [issue])
+        self.analyzerProxy.analyze(self.caseRunConfigurations)
+        for crc in self.caseRunConfigurations:
+            self.analyzerProxy.analyze([crc])
+        self.assertEqual(self.AnalyzerClass1.analyze.call_count, 3)
+
+    def test_result_change(self):
+        self.analyzerProxy.analyze(self.caseRunConfigurations)
+        self.crc1.result.result = "FAIL"
+        result = self.analyzerProxy.analyze(self.caseRunConfigurations)
+        self.assertEqual(self.AnalyzerClass1.analyze.call_count, 4)
+        self.AnalyzerClass1.analyze.assert_called_with(self.analyzerProxy, self.crc1)
+        self.assertFalse(result.isComplete)
+
+    def test_extra_fields_change(self):
+        crc = CaseRunConfiguration(unittest.mock.MagicMock(), {}, [])
+        crc.updateResult(Result('complete', 'FAIL', True, beaker_links=['http://example.com/1']))
+        self.analyzerProxy.analyze([crc])
+        self.analyzerProxy.analyze([crc])
+        self.assertEqual(self.AnalyzerClass1.analyze.call_count, 1)
+        # the links are changed in place
+        crc.result.extra_fields['beaker_links'].append('http://example.com/2')
+        self.analyzerProxy.analyze([crc])
+        self.assertEqual(self.AnalyzerClass1.analyze.call_count, 2)
+        self.assertEqual(
+            hash(IssueAnalyzerProxy._result_version(crc)),
+            hash(IssueAnalyzerProxy._result_version(crc)),
+        )
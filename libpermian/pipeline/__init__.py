@@ -1,14 +1,17 @@
 import copy
 import os
 import threading
+import time
 import logging
 from tplib.library import Library
 
 from ..settings import Settings
 from ..events.factory import EventFactory
 from ..testruns import TestRuns
+from ..reportsenders.outbox import OutboxState
 from ..webui import WebUI
 from .. import hooks
+from .. import httpclient
 from . import library_repo
 
 LOGGER = logging.getLogger(__name__)
@@ -43,6 +46,38 @@ def get_caserunconfigurations(event, settings_paths, overrides, env=None):
     pipeline._cloneLibrary()
     return pipeline.event.generate_caseRunConfigurations(pipeline.library)
 
+def resume_reporting(outbox_path, settings_paths, overrides, env=None):
+    """
+    Resume reporting of pipeline which died using the outbox it recorded (see
+    outbox option in reportSenders section). No workflow is executed, only
+    the results recorded in the outbox which were not delivered yet are
+    provided to the ReportSenders.
+
+    The event, settings paths and overrides recorded in the outbox are used,
+    settings_paths and overrides are applied on top of them. Overrides which
+    look like secrets are not recorded in the outbox, they have to be provided
+    again in overrides (or by settings files or environment).
+
+    :param outbox_path: Path to the outbox of the pipeline
+    :type outbox_path: str
+    :return: Return code of the pipeline
+    :rtype: int
+    """
+    outboxState = OutboxState(outbox_path)
+    header = outboxState.header
+    mergedOverrides = copy.deepcopy(header['overrides'])
+    for section, options in overrides.items():
+        mergedOverrides.setdefault(section, {}).update(options)
+    for section, option in header.get('redacted', ()):
+        if option not in overrides.get(section, {}):
+            LOGGER.warning("Override of '%s' option in '%s' section was not recorded in the outbox, "
+                           "value from settings is used", option, section)
+    # streaming of caseRunConfigurations would start the workflows
+    mergedOverrides.setdefault('library', {})['streamCaseRunConfigurations'] = 'False'
+    pipeline = Pipeline(header['event'], header['settings'] + list(settings_paths), mergedOverrides, env)
+    pipeline.resumeReporting(outbox_path, outboxState)
+    return pipeline.return_code
+
 class Pipeline():
     """
     Create pipeline object providing all essential information required for the
@@ -65,6 +100,10 @@ class Pipeline():
         if env is None:
             env = copy.copy(os.environ)
         self.settings = Settings(overrides, env, settings_paths)
+        self.eventSpec = event
+        self.settingsPaths = settings_paths
+        self.overrides = overrides
+        httpclient.configure(self.settings)
         self.event = EventFactory.make(self.settings, event)
         self.library = None
         self.testRuns = None
@@ -108,6 +147,7 @@ class Pipeline():
         self._runWorkflows()
         LOGGER.debug('Waiting for workflows to finish')
         self._set_return_code(self._waitForWorkflows(), 1)
+        self._logTimelineSummary()
         LOGGER.debug('Waiting for other threads to finish')
         self._waitForThreads()
         LOGGER.info('All execution and reporting is done. Performing other post-reporting and shutdown activities.')
@@ -115,6 +155,22 @@ class Pipeline():
         hooks.builtin.pipeline_ended(self)
         LOGGER.debug('Waiting for other (post) threads to finish')
         self._waitForThreads() # wait for any possible threads started by the final hook
+        httpclient.client().logStats()
+
+    def resumeReporting(self, outbox_path, outboxState):
+        """
+        Alternative to run method which only resumes reporting recorded in
+        the outbox, see resume_reporting.
+        """
+        LOGGER.debug('Resuming reporting')
+        if self.executed:
+            raise Exception('The pipeline can be executed only once')
+        self.executed = True
+        self._cloneLibrary()
+        self._makeTestRuns()
+        self.testRuns.openOutbox(outbox_path, append=True)
+        self._set_return_code(self.testRuns.resumeReporting(outboxState), 1)
+        self._waitForThreads()
 
     def _set_return_code(self, succeeded, rc):
         if not succeeded:
@@ -157,8 +213,14 @@ class Pipeline():
         """
         Create ResultRouter instance and have all the ResultSender instances
         ready for the workflows to send results.
+
+        If outbox is set in reportSenders section, the reporting progress is
+        recorded there so that it can be resumed, see resume_reporting.
         """
-        pass
+        outbox_path = self.settings.get('reportSenders', 'outbox')
+        if outbox_path:
+            outbox = self.testRuns.openOutbox(outbox_path)
+            outbox.recordHeader(self.eventSpec, self.settingsPaths, self.overrides)
 
     def _prepareWorkflows(self):
         """
@@ -184,6 +246,23 @@ class Pipeline():
         """
         return self.testRuns.wait()
 
+    def _logTimelineSummary(self):
+        """
+        Log how much time the caseRunConfigurations spent in individual
+        states and how long the reporting took after the last state change.
+        """
+        for state, (count, total, maximum) in self.testRuns.timelineSummary().items():
+            LOGGER.info('Time spent in state "%s" by %d caseRunConfigurations: mean %.1fs, max %.1fs',
+                        state, count, total / count, maximum)
+        lastTransitions = [
+            caserun.timeline[-1].monotonic
+            for caserun in self.testRuns.caseRunConfigurations
+            if caserun.timeline
+        ]
+        if lastTransitions:
+            LOGGER.info('Reporting finished %.1fs after the last state change',
+                        time.monotonic() - max(lastTransitions))
+
     def _waitForThreads(self):
         current_thread = threading.current_thread()
         for thread in threading.enumerate():
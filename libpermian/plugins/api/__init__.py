@@ -21,6 +21,9 @@ Web UI:
 
 Hooks:
 
+HTTP:
+Use api.http functions for HTTP requests to share pooled connections.
+
 """
 
 # expose all subpackages directly in api
@@ -28,6 +31,7 @@ from . import (
     cli,
     events,
     hooks,
+    http,
     issueanalyzer,
     reportsenders,
     webui,
@@ -0,0 +1,35 @@
+from ...httpclient import HttpClient, client
+
+def request(method, url, **kwargs):
+    """
+    Redirects to httpclient.HttpClient.request of the pipeline-wide client
+
+    Plugins should make HTTP requests using these functions so that the
+    connections to the same host are reused and the timeouts and retries
+    configured in the http section of settings are applied.
+    """
+    return client().request(method, url, **kwargs)
+
+def get(url, **kwargs):
+    """ See request """
+    return client().get(url, **kwargs)
+
+def head(url, **kwargs):
+    """ See request """
+    return client().head(url, **kwargs)
+
+def post(url, **kwargs):
+    """ See request """
+    return client().post(url, **kwargs)
+
+def put(url, **kwargs):
+    """ See request """
+    return client().put(url, **kwargs)
+
+def patch(url, **kwargs):
+    """ See request """
+    return client().patch(url, **kwargs)
+
+def delete(url, **kwargs):
+    """ See request """
+    return client().delete(url, **kwargs)
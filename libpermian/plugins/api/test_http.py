@@ -0,0 +1,58 @@
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+
+from libpermian.settings import Settings
+from libpermian import httpclient
+from libpermian.plugins import api
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.settings = Settings(cmdline_overrides={'http': {'timeout': '5', 'connect_timeout': '0'}},
+                                 environment={},
+                                 settings_locations=[])
+
+    @patch('requests.Session.request')
+    def test_request(self, session_request):
+        session_request.return_value = MagicMock(status_code=200)
+        client = httpclient.HttpClient(self.settings)
+        client.get('https://example.com/one')
+        session_request.assert_called_with('GET', 'https://example.com/one', timeout=(None, 5))
+        client.post('https://example.com/two', data='x', timeout=1)
+        session_request.assert_called_with('POST', 'https://example.com/two', data='x', timeout=1)
+        session_request.return_value = MagicMock(status_code=503)
+        client.get('https://other.example.com/')
+        session_request.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            client.get('https://other.example.com/')
+        stats = client.stats()
+        self.assertEqual(set(stats), {'example.com', 'other.example.com'})
+        self.assertEqual((stats['example.com']['requests'], stats['example.com']['errors']), (2, 0))
+        self.assertEqual((stats['other.example.com']['requests'], stats['other.example.com']['errors']), (2, 2))
+
+    def test_shared_session(self):
+        client = httpclient.configure(self.settings)
+        self.assertIs(httpclient.client(), client)
+        adapter = client.session.get_adapter('https://example.com/')
+        self.assertIs(adapter, client.session.get_adapter('http://example.com/'))
+        self.assertEqual(adapter.max_retries.total, 3)
+
+    def test_session_per_thread(self):
+        client = httpclient.HttpClient(self.settings)
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(client.session))
+        thread.start()
+        thread.join()
+        self.assertIs(client.session, client.session)
+        self.assertIsNot(sessions[0], client.session)
+        # the connection pool is shared
+        self.assertIs(sessions[0].get_adapter('https://example.com/'), client.adapter)
+        self.assertIs(client.session.get_adapter('https://example.com/'), client.adapter)
+
+    @patch('requests.Session.request')
+    def test_api(self, session_request):
+        session_request.return_value = MagicMock(status_code=200)
+        httpclient.configure(self.settings)
+        api.http.patch('https://example.com/', data='x')
+        session_request.assert_called_with('PATCH', 'https://example.com/', data='x', timeout=(None, 5))
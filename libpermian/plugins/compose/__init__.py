@@ -2,8 +2,6 @@ import json
 import logging
 import time
 import re
-import urllib.request
-import urllib.error
 import json
 
 from .. import api
@@ -65,11 +63,12 @@ class ComposeStructure(BaseStructure):
     def location(self):
         if self._location:
             return self._location
-        try:
-            with urllib.request.urlopen(self.settings.get('compose', 'location') % self.id) as response:
-                return response.geturl()
-        except urllib.error.HTTPError as excp:
-            raise ComposeNotAvailable('Could not find compose with ID %s via %s, error %s' % (self.id, self.settings.get('compose', 'location'), excp.code))
+        # only the final URL (after redirects) is needed, don't download the content
+        response = api.http.get(self.settings.get('compose', 'location') % self.id, stream=True)
+        response.close()
+        if not response.ok:
+            raise ComposeNotAvailable('Could not find compose with ID %s via %s, error %s' % (self.id, self.settings.get('compose', 'location'), response.status_code))
+        return response.url
 
     @property
     def type(self):
@@ -52,16 +52,16 @@ def MockProductmdComposeImagesMultipleBoot(location):
     instance.images.images['Other']['x86_64'].add(DummyImage('boot', 'Other/isos/x86_64/boot.iso'))
     return instance
 
-class MockUrlopen():
-    def __init__(self, url):
-        self.url = url
-    def __enter__(self):
-        return MockComposeResponse(self.url)
-    def __exit__(self, type, value, traceback):
+class MockHttpGet():
+    ok = True
+    status_code = 200
+    def __init__(self, url, **kwargs):
+        self.url = MockComposeResponse(url).geturl()
+    def close(self):
         pass
 
 @patch('productmd.compose.Compose', new=MockProductmdCompose)
-@patch('urllib.request.urlopen', new=MockUrlopen)
+@patch('libpermian.plugins.api.http.get', new=MockHttpGet)
 class TestEventCompose(unittest.TestCase):
     def setUp(self):
         self.settings = Settings(cmdline_overrides={'compose': {'location': 'http://example.com/compose/%s'}},
@@ -251,7 +251,7 @@ class TestComposeDiff(unittest.TestCase):
         self.assertTrue(cm.output[0].startswith('WARNING:libpermian.plugins.compose.compose_diff:'))
 
 @patch('productmd.compose.Compose', new=MockProductmdComposeImages)
-@patch('urllib.request.urlopen', new=MockUrlopen)
+@patch('libpermian.plugins.api.http.get', new=MockHttpGet)
 class TestComposeToBootIso(unittest.TestCase):
     def setUp(self):
         self.settings = Settings(cmdline_overrides={'compose': {'location': 'http://example.com/compose/%s/'}},
@@ -266,7 +266,7 @@ class TestComposeToBootIso(unittest.TestCase):
                                                  'aarch64': 'http://example.com/here/OS-1.0.2-20220221.1/Main/isos/aarch64/boot.iso'})
 
 @patch('productmd.compose.Compose', new=MockProductmdComposeImagesMultipleBoot)
-@patch('urllib.request.urlopen', new=MockUrlopen)
+@patch('libpermian.plugins.api.http.get', new=MockHttpGet)
 class TestComposeToBootIsoFail(unittest.TestCase):
     def setUp(self):
         self.settings = Settings(cmdline_overrides={'compose': {'location': 'http://example.com/compose/%s/'}},
@@ -73,7 +73,7 @@ class ExampleWorkflow(IsolatedWorkflow):
         methods are running in different thread. It can be invoked only if
         final result was not provided.
         This method should contain code that would stop the execution of
-        setup/execute/teardown methods of this (Threading) instance. It's up
+        setup/execute/teardown methods of this workflow instance. It's up
         to the workflow how this is achieved.
         Note that no result should be reported as "cancelled" final state is
         set as part of the terminate invocation.
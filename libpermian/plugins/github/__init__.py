@@ -1,4 +1,3 @@
-import requests
 import jinja2
 import logging
 import json
@@ -54,6 +53,11 @@ class GitHubPullRequestReportSender(BaseReportSender):
             jinja_pkg_env = jinja2.Environment(loader=jinja2.PackageLoader('libpermian.plugins.github', 'templates'))
             self.template = jinja_pkg_env.get_template('output_text.j2')
 
+    @property
+    def rateLimitEndpoint(self):
+        """ All GitHub reportSenders share the rate limit of the API """
+        return self.api_url
+
     def make_payload(self, status="in_progress", conclusion=None, head_sha=None):
         """ Makes json payload for GH check-runs API, https://docs.github.com/en/rest/checks/runs
 
@@ -92,7 +96,8 @@ class GitHubPullRequestReportSender(BaseReportSender):
             return
 
         # Get head SHA from pull request
-        pr_response = requests.get(
+        pr_response = self.rateLimitedRequest(
+            api.http.get,
             f'{self.api_url}/repos/{self.repository}/pulls/{self.pr_id}',
             headers=self.headers)
 
@@ -102,7 +107,8 @@ class GitHubPullRequestReportSender(BaseReportSender):
         head_sha = pr_response.json()['head']['sha']
 
         # Create new check run
-        cr_response = requests.post(
+        cr_response = self.rateLimitedRequest(
+            api.http.post,
             f'{self.api_url}/repos/{self.repository}/check-runs',
             data=self.make_payload('queued', head_sha=head_sha),
             headers=self.headers)
@@ -122,7 +128,8 @@ class GitHubPullRequestReportSender(BaseReportSender):
             LOGGER.info(f'Dry run reporting: {payload}')
             return
 
-        cru_response = requests.patch(
+        cru_response = self.rateLimitedRequest(
+            api.http.patch,
             f'{self.api_url}/repos/{self.repository}/check-runs/{self.check_run_id}',
             data=payload,
             headers=self.headers)
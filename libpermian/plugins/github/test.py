@@ -58,16 +58,16 @@ class TestGitHubPullRequestReportSender(unittest.TestCase):
         self.settings = Settings(cmdline_overrides={'github': {'pull-request': '42',
                                                                'repository': 'user/test',
                                                                'token': '1234'},
-                                                    'github-pr': {'throttleInterval': '0'}},
+                                                    'github-pr': {'throttleInterval': '0', 'startupSpread': '0'}},
                                  environment={},
                                  settings_locations=[])
         self.library = library.Library('tests/test_library')
         self.crc = CaseRunConfiguration(DummyTestCase(), {'test': '1'}, [self.library.testplans['GitHub testplan 1']])
         self.caseRunConfigurations = CaseRunConfigurationsList([self.crc])
 
-    @patch('requests.get')
-    @patch('requests.post')
-    @patch('requests.patch')
+    @patch('libpermian.plugins.api.http.get')
+    @patch('libpermian.plugins.api.http.post')
+    @patch('libpermian.plugins.api.http.patch')
     def test_reporting_default(self, requests_patch, requests_post, requests_get):
         requests_get.return_value = ResultMock200()
         requests_patch.return_value = ResultMock200()
@@ -96,9 +96,9 @@ class TestGitHubPullRequestReportSender(unittest.TestCase):
             data='{"name": "GitHub testplan 1", "status": "completed", "output": {"title": "GitHub testplan 1", "summary": "Testplan for testing github-pr report sender", "text": "| Test case | Configuration | Status | Result |\\n| --------- | ------------- | ------ | ------ |\\n| Dummy test case |test: 1, | complete | PASS |"}, "conclusion": "success"}',
             headers={'Accept': 'application/vnd.github.v3+json', 'Authorization': 'token 1234'})
 
-    @patch('requests.get')
-    @patch('requests.post')
-    @patch('requests.patch')
+    @patch('libpermian.plugins.api.http.get')
+    @patch('libpermian.plugins.api.http.post')
+    @patch('libpermian.plugins.api.http.patch')
     def test_reporting_custom(self, requests_patch, requests_post, requests_get):
         requests_get.return_value = ResultMock200()
         requests_patch.return_value = ResultMock200()
@@ -133,16 +133,16 @@ class TestGitHubPullRequestReportSenderThrottled(unittest.TestCase):
         self.settings = Settings(cmdline_overrides={'github': {'pull-request': '42',
                                                                'repository': 'user/test',
                                                                'token': '1234'},
-                                                    'github-pr': {'throttleInterval': '120'}},
+                                                    'github-pr': {'throttleInterval': '120', 'startupSpread': '0'}},
                                  environment={},
                                  settings_locations=[])
         self.library = library.Library('tests/test_library')
         self.crc = CaseRunConfiguration(DummyTestCase(), {'test': '1'}, [self.library.testplans['GitHub testplan 1']])
         self.caseRunConfigurations = CaseRunConfigurationsList([self.crc])
 
-    @patch('requests.get')
-    @patch('requests.post')
-    @patch('requests.patch')
+    @patch('libpermian.plugins.api.http.get')
+    @patch('libpermian.plugins.api.http.post')
+    @patch('libpermian.plugins.api.http.patch')
     def test_reporting_throttled(self, requests_patch, requests_post, requests_get):
         requests_get.return_value = ResultMock200()
         requests_patch.return_value = ResultMock200()
@@ -1,7 +1,7 @@
 import logging
-import requests
 import json
 
+from .. import api
 from ..api.hooks import threaded_callback_on
 from ...webui.hooks import WebUI_started, static_WebUI_rendered
 
@@ -45,7 +45,7 @@ def set_webui_link_description(settings, event, URL, is_artifact=False):
     }
 
     LOGGER.debug(f'Setting jenkins build info: {submit_url}; {str(payload)}')
-    response = requests.post(submit_url, data={'Submit': 'save', 'json': json.dumps(payload)},
+    response = api.http.post(submit_url, data={'Submit': 'save', 'json': json.dumps(payload)},
                              auth=(settings.get('jenkins', 'username'), settings.get('jenkins', 'password')))
     if response.status_code != 200:
         LOGGER.error(f'Can\'t set jenkins build name and description: {response.status_code}: {response.text}')
@@ -23,7 +23,7 @@ class TestJenkins(unittest.TestCase):
         cls.webui.pipeline.event = 'TestEvent'
         cls.webui.baseurl = 'http://example.com:1234/webui'
 
-    @patch('requests.post')
+    @patch('libpermian.plugins.api.http.post')
     def test_set_build_info(self, requests_post):
         requests_post.return_value = ResultMock()
         self.webui.pipeline.settings = Settings(environment={}, settings_locations=[],
@@ -38,7 +38,7 @@ class TestJenkins(unittest.TestCase):
                   'json': '{"displayName": "#1: TestEvent", "description": "<a href=\\"http://example.com:1234/webui\\">WebUI</a>"}'},
             auth=('user', 'pass'))
 
-    @patch('requests.post')
+    @patch('libpermian.plugins.api.http.post')
     def test_not_set_build_info(self, requests_post):
         requests_post.return_value = ResultMock()
         self.webui.pipeline.settings = Settings(environment={}, settings_locations=[],
@@ -50,7 +50,7 @@ class TestJenkins(unittest.TestCase):
         set_jenkins_build_info(self.webui)
         requests_post.assert_not_called()
 
-    @patch('requests.post')
+    @patch('libpermian.plugins.api.http.post')
     def test_set_static_webui_build_info(self, requests_post):
         requests_post.return_value = ResultMock()
         self.webui.pipeline.settings = Settings(environment={}, settings_locations=[],
@@ -65,7 +65,7 @@ class TestJenkins(unittest.TestCase):
                   'json': '{"displayName": "#1: TestEvent", "description": "<a href=\\"https://jenkins.example.com/job/pipeline/1/artifact/./some/path/file.suffix\\">WebUI</a>"}'},
             auth=('user', 'pass'))
 
-    @patch('requests.post')
+    @patch('libpermian.plugins.api.http.post')
     def test_not_set_static_webui_build_info(self, requests_post):
         self.webui.pipeline.settings = Settings(environment={}, settings_locations=[],
             cmdline_overrides={'jenkins': {'url': 'https://jenkins.example.com',
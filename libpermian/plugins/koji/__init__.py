@@ -3,7 +3,6 @@ import re
 import json
 import xmlrpc.client
 import productmd
-import requests
 import time
 import datetime
 
@@ -88,7 +87,7 @@ class KojiBuild(BaseStructure):
         entrypoint_dir = os.path.dirname(entrypoint)
         # try to locate the compose until timeout is reached
         while wait_until is None or datetime.datetime.now() < wait_until:
-            response = requests.get(entrypoint)
+            response = api.http.get(entrypoint)
             if response.ok:
                 compose_relpaths = response.text.strip()
                 compose_relpath = compose_relpaths.split('\n')[-1]
@@ -128,7 +128,7 @@ class TestKojiEventStructure(unittest.TestCase):
         koji_proxy_class.assert_not_called()
         koji_proxy_class.return_value.getBuild.assert_not_called()
 
-    @patch('requests.get')
+    @patch('libpermian.plugins.api.http.get')
     @patch('productmd.compose.Compose')
     def test_convert_compose(self, Compose, requests_get, koji_proxy_class):
         compose_id = 'FooBar-1.23-123456.t.98'
@@ -152,7 +152,7 @@ class TestKojiEventStructure(unittest.TestCase):
             f'{self.composes_baseurl}/{compose_relpath}'
         )
 
-    @patch('requests.get')
+    @patch('libpermian.plugins.api.http.get')
     @patch('productmd.compose.Compose')
     def test_convert_compose_multiple(self, Compose, requests_get, koji_proxy_class):
         compose_id = 'FooBar-1.23-123456.t.98'
@@ -177,7 +177,7 @@ class TestKojiEventStructure(unittest.TestCase):
             f'{self.composes_baseurl}/{desired_compose_relpath}'
         )
 
-    @patch('requests.get')
+    @patch('libpermian.plugins.api.http.get')
     @patch('productmd.compose.Compose')
     def test_convert_compose_fail(self, Compose, requests_get, koji_proxy_class):
         compose_id = 'FooBar-1.23-123456.t.98'
@@ -47,75 +47,89 @@ class RunSubsetEvent(Event):
         crcList = CaseRunConfigurationsList()
         original_crcList = self.original_event.generate_caseRunConfigurations(library)
         for crc in original_crcList:
-            if self.run_subset.testplans is not None:
-                crc.running_for = {
-                    testplan_id: True
-                    for testplan_id
-                    in crc.running_for
-                    if testplan_id in self.run_subset.testplans
-                }
-
-            if self.run_subset.testplans_queries is not None:
-                # consider only those testplans which comply with at least one
-                # of the testplans_queries
-                crc.running_for = {
-                    testplan_id: True
-                    for testplan_id
-                    in crc.running_for
-                    if any(
-                        eval_bool(
-                            testplans_query,
-                            tp=library.testplans[testplan_id],
-                        )
-                        for testplans_query
-                        in self.run_subset.testplans_queries
-                    )
-                }
-
-            # ignore the crc if it's not executed for any testplan
-            if not crc.running_for:
-                continue
-
-            if self.run_subset.testcases is not None:
-                if crc.testcase.id not in self.run_subset.testcases:
-                    continue
+            if self._selected(crc, library):
+                crcList.append(crc)
+        return crcList
 
-            if self.run_subset.testcases_queries is not None:
-                if not any(
+    def iter_caseRunConfigurations(self, library):
+        for original_crcList in self.original_event.iter_caseRunConfigurations(library):
+            yield CaseRunConfigurationsList([
+                crc for crc in original_crcList if self._selected(crc, library)
+            ])
+
+    def _selected(self, crc, library):
+        """
+        Decide if the crc passes all the provided filters. Testplans which
+        are not selected are removed from running_for of the crc.
+        """
+        if self.run_subset.testplans is not None:
+            crc.running_for = {
+                testplan_id: True
+                for testplan_id
+                in crc.running_for
+                if testplan_id in self.run_subset.testplans
+            }
+
+        if self.run_subset.testplans_queries is not None:
+            # consider only those testplans which comply with at least one
+            # of the testplans_queries
+            crc.running_for = {
+                testplan_id: True
+                for testplan_id
+                in crc.running_for
+                if any(
                     eval_bool(
-                        testcases_query,
-                        tc=crc.testcase,
+                        testplans_query,
+                        tp=library.testplans[testplan_id],
                     )
-                    for testcases_query
-                    in self.run_subset.testcases_queries
-                ):
-                    continue
-
-            if self.run_subset.configurations is not None:
-                # check if any of provided configuration combination
-                # (self.run_subset.configurations) is compatible with
-                # crc.configuration (meaning it contains all the required keys
-                # with required values => is subset)
-                if not any(
-                    set(subset_configuration.items()).issubset(set(crc.configuration.items()))
-                    for subset_configuration in self.run_subset.configurations
-                ):
-                    continue
-
-            if self.run_subset.crc_queries is not None:
-                if not any(
-                    eval_bool(
-                        crc_query,
-                        crc=crc,
-                    )
-                    for crc_query
-                    in self.run_subset.crc_queries
-                ):
-                    continue
-
-            # the crc passed all the provided filters, add it to the list
-            crcList.append(crc)
-        return crcList
+                    for testplans_query
+                    in self.run_subset.testplans_queries
+                )
+            }
+
+        # ignore the crc if it's not executed for any testplan
+        if not crc.running_for:
+            return False
+
+        if self.run_subset.testcases is not None:
+            if crc.testcase.id not in self.run_subset.testcases:
+                return False
+
+        if self.run_subset.testcases_queries is not None:
+            if not any(
+                eval_bool(
+                    testcases_query,
+                    tc=crc.testcase,
+                )
+                for testcases_query
+                in self.run_subset.testcases_queries
+            ):
+                return False
+
+        if self.run_subset.configurations is not None:
+            # check if any of provided configuration combination
+            # (self.run_subset.configurations) is compatible with
+            # crc.configuration (meaning it contains all the required keys
+            # with required values => is subset)
+            if not any(
+                set(subset_configuration.items()).issubset(set(crc.configuration.items()))
+                for subset_configuration in self.run_subset.configurations
+            ):
+                return False
+
+        if self.run_subset.crc_queries is not None:
+            if not any(
+                eval_bool(
+                    crc_query,
+                    crc=crc,
+                )
+                for crc_query
+                in self.run_subset.crc_queries
+            ):
+                return False
+
+        # the crc passed all the provided filters
+        return True
 
     # If attribute/structure is not provided by this event, try getting it from
     # the original event
@@ -34,3 +34,7 @@ class BaseXunitReportSender(BaseReportSender):
 
     def xunitResultOf(self, caseRunConfigurations):
         return self.results_map.get(self.resultOf(caseRunConfigurations))
+
+    def xunitTimeOf(self, caseRunConfigurations):
+        """ Total execution time of caseRunConfigurations in seconds based on their timelines """
+        return sum(crc.executionTime for crc in caseRunConfigurations)
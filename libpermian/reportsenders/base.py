@@ -2,16 +2,29 @@ import threading
 import queue
 import abc
 import logging
+import random
 import time
 
-from ..caserunconfiguration import CaseRunConfiguration, CaseRunConfigurationsList
+from ..caserunconfiguration import CaseRunConfiguration, CaseRunConfigurationSnapshot, CaseRunConfigurationsList
 from ..exceptions import UnexpectedState
 from ..exception_dump import dump_exception
+from .coalescing import CoalescingQueue
+from . import ratelimit
+from .dispatcher import ReportSenderDispatcher, defaultDispatcher
 
 
 LOGGER = logging.getLogger(__name__)
 
-class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
+DISPATCH_BATCH = 100
+"""Maximal number of queue items processed by one ReportSender dispatch"""
+
+class ResultBatch(tuple):
+    """
+    Updates of multiple caseRunConfigurations delivered to ReportSender as
+    one item of its results queue, see BaseReportSender.resultBatchUpdate.
+    """
+
+class BaseReportSender(metaclass=abc.ABCMeta):
     """
     Base class for case-run-configuration report sender.
 
@@ -23,6 +36,20 @@ class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
     on the content of reporting structure and settings, each class should
     deliver the desired reporting.
 
+    ReportSenders don't have their own threads, they are driven by
+    ReportSenderDispatcher which calls the process methods of one
+    ReportSender sequentially from its pool of worker threads, so the
+    process methods should not block for long. ReportSenders which make
+    requests through rateLimitedRequest (see rateLimited) may wait for the
+    rate limit of the remote system, they are driven by separate dispatcher.
+
+    Note that ReportSenders used to be threading.Thread subclasses, they
+    still provide start, join and is_alive with the same meaning and run
+    which processes the reporting in the calling thread, but other Thread
+    attributes are not available anymore. Exception raised while processing
+    the reporting is recorded (see exception attribute) and it's raised
+    again by join.
+
     :param testplan: TestPlan instance for which the reporting should be done.
     :type testplan: tplib.structures.testplan.TestPlan
     :param reporting_structure: Test Plan reporting item containing data for this instance.
@@ -37,7 +64,6 @@ class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
     description_format = "Configuration: %s - Result: %s, %s - Beaker links: %s - Issues: %s ; "
     issue_format = "%s"
     def __init__(self, testplan, reporting_structure, caseRunConfigurations, event, settings, issueAnalyzerProxy, group=None):
-        super().__init__()
         self.testplan = testplan
         self.reporting = reporting_structure
         # Create local copy of caseRunConfiguration, to prevent unwanted interaction between different ReportSenders
@@ -48,17 +74,97 @@ class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
         self.dry_run = self.fallbackSettings.getboolean('dry_run')
         self.issueAnalyzerProxy = issueAnalyzerProxy
         self.group=group
-        self.resultsQueue = queue.Queue()
+        if self.fallbackSettings.getboolean('coalesceUpdates'):
+            self.resultsQueue = CoalescingQueue(ResultBatch)
+        else:
+            self.resultsQueue = queue.Queue()
         self.exception = None
+        self._failure = None
 
         # Get throttleInterval from settings.reportSender{type} or settings.reportSenders
         self.throttleInterval = self.fallbackSettings.getfloat('throttleInterval')
         self._nextFlush = None
+        self._rateLimiter = None
+        self._dispatcher = None
+        self._dispatchLock = threading.Lock()
+        self._dispatchScheduled = False
+        self._pausedUntil = None
+        self._setUpDone = False
+        self._notifyFlushAt = None
+        self._finished = threading.Event()
+        self.outbox = None
+        """Outbox where the delivered results are recorded, see libpermian.reportsenders.outbox"""
+        self.outboxKey = None
+        """Identifier of this ReportSender in the outbox"""
 
     @property
     def fallbackSettingsSections(self):
         return [self.reporting.type, 'reportSenders']
 
+    @property
+    def rateLimitEndpoint(self):
+        """
+        Identifier of the remote endpoint (e.g. API base URL) used to share
+        the rate limiter among all the ReportSenders reporting to the same
+        endpoint. None means the rate limiter is used only by this
+        ReportSender.
+        """
+        return None
+
+    @property
+    def rateLimited(self):
+        """
+        True if the ReportSender makes requests through rateLimitedRequest,
+        i.e. it reports to rateLimitEndpoint or rateLimit is set. Such
+        ReportSender may wait for the rate limit so it should not share the
+        dispatcher with the other ReportSenders.
+        """
+        return self.rateLimitEndpoint is not None or bool(self.fallbackSettings.getfloat('rateLimit'))
+
+    @property
+    def rateLimiter(self):
+        """
+        Rate limiter used by rateLimitedRequest, see rateLimit and rateBurst
+        settings.
+
+        :rtype: libpermian.reportsenders.ratelimit.TokenBucket
+        """
+        if self._rateLimiter is None:
+            self._rateLimiter = ratelimit.getRateLimiter(
+                self.rateLimitEndpoint,
+                self.fallbackSettings.getfloat('rateLimit'),
+                self.fallbackSettings.getint('rateBurst'),
+            )
+        return self._rateLimiter
+
+    def rateLimitedRequest(self, request, *args, **kwargs):
+        """
+        Make HTTP request respecting the rate limit of the remote endpoint.
+        When the response signals that the rate limit was hit (403/429 with
+        Retry-After or rate limit headers), all the ReportSenders sharing the
+        rate limiter back off and the request is retried up to rateRetries
+        times. The waiting for the rate limit blocks the calling thread, the
+        dispatcher doesn't dispatch rate limited ReportSender (see
+        rateLimited) while its rate limiter is paused though.
+
+        :param request: Function making the request, e.g. requests.patch
+        :param args: Arguments passed to the request function
+        :param kwargs: Keyword arguments passed to the request function
+        :return: Response of the last attempt
+        """
+        retries = self.fallbackSettings.getint('rateRetries')
+        for attempt in range(retries + 1):
+            self.rateLimiter.acquire()
+            response = request(*args, **kwargs)
+            retryAfter = ratelimit.retryAfter(response)
+            if retryAfter is None:
+                self.rateLimiter.succeeded()
+                return response
+            delay = self.rateLimiter.backoff(retryAfter)
+            LOGGER.warning("'%s' hit rate limit (%s), backing off for %.1f seconds (attempt %d of %d)",
+                           self, response.status_code, delay, attempt + 1, retries + 1)
+        return response
+
     def setUp(self):
         """ Executed just before the ReportSender starts """
         pass
@@ -67,37 +173,187 @@ class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
         """ Executed after the ReportSender has finished """
         pass
 
-    def run(self):
+    def start(self, dispatcher=None):
+        """
+        Start processing of the results by the dispatcher. The ReportSender
+        is set up and processTestRunStarted is called by the dispatcher
+        (possibly delayed by startupSpread setting), then the results are
+        processed as they arrive until the testrun is finished.
+
+        :param dispatcher: Dispatcher driving this ReportSender, shared default dispatcher is used if not provided
+        :type dispatcher: libpermian.reportsenders.dispatcher.ReportSenderDispatcher, optional
+        :raises RuntimeError: When the ReportSender was already started
+        """
+        if self._dispatcher is not None:
+            raise RuntimeError(f"ReportSender '{self}' was already started")
+        self._dispatcher = dispatcher if dispatcher is not None else defaultDispatcher()
         LOGGER.debug("ReportSender started: '%s'", self)
+        # spread the start of ReportSenders so that they don't hit remote
+        # systems all at the same moment
+        startupSpread = self.fallbackSettings.getfloat('startupSpread')
+        if startupSpread and not self.dry_run:
+            self._pausedUntil = time.time() + random.uniform(0, startupSpread)
+            self._dispatcher.notifyAt(self, self._pausedUntil)
+        else:
+            self._dispatcher.notify(self)
+
+    @property
+    def started(self):
+        return self._dispatcher is not None
+
+    @property
+    def finished(self):
+        return self._finished.is_set()
+
+    def is_alive(self):
+        """
+        :return: True if the ReportSender was started and didn't finish yet
+        :rtype: bool
+        """
+        return self.started and not self.finished
+
+    def join(self, timeout=None):
+        """
+        Wait until the ReportSender finishes (the testrun is finished and all
+        reporting is done) or fails.
+
+        :raises RuntimeError: When the ReportSender was not started
+        :raises Exception: Exception which caused failure of the ReportSender
+        """
+        if not self.started:
+            raise RuntimeError(f"ReportSender '{self}' was not started")
+        self._finished.wait(timeout)
+        if self._failure is not None:
+            raise self._failure
+
+    def run(self):
+        """
+        Process the reporting in the calling thread until the ReportSender
+        finishes, kept for compatibility with ReportSenders based on
+        threading.Thread.
+        """
+        dispatcher = ReportSenderDispatcher(1)
         try:
-            self.setUp()
-            self.processTestRunStarted()
-            for crc in self.caseRunConfigurations.withDirtyResult:
-                crc.result.dirty = False
+            self.start(dispatcher)
+            self.join()
+        finally:
+            dispatcher.shutdown()
 
-            while True:
+    def hasPendingWork(self):
+        """
+        :return: True if the ReportSender should be dispatched
+        :rtype: bool
+        """
+        if self.finished:
+            return False
+        now = time.time()
+        if self._pausedUntil is not None and now < self._pausedUntil:
+            # the dispatcher is notified once the pause (delayed start or
+            # rate limit) is over
+            return False
+        if not self._setUpDone or not self.resultsQueue.empty():
+            return True
+        return self.throttleInterval and self._nextFlush is not None and self._nextFlush <= now
+
+    def dispatch(self):
+        """
+        Do the pending work of the ReportSender, this is called by the
+        dispatcher and it's never called concurrently for one ReportSender.
+        At most DISPATCH_BATCH items of the queue are processed at once so
+        that other ReportSenders are not starved, the dispatcher calls this
+        method again if there's more work to do.
+        """
+        if not self.hasPendingWork():
+            return
+        try:
+            if self.rateLimited:
+                delay = self.rateLimiter.delay()
+                if delay > 0:
+                    # don't take any work until the rate limit allows it, the
+                    # queued items are left for the next dispatch
+                    self._pausedUntil = time.time() + delay
+                    self._dispatcher.notifyAt(self, self._pausedUntil)
+                    return
+            if not self._setUpDone:
+                self.setUp()
+                self.processTestRunStarted()
+                self.caseRunConfigurations.clearDirtyResults()
+                self._setUpDone = True
+                self.setNextFlush()
+
+            for _ in range(DISPATCH_BATCH):
                 try:
-                    item = self.resultsQueue.get(timeout = self.nextFlush)
-                    LOGGER.debug("'%s' processing: '%s'", self, item)
-                    if isinstance(item, CaseRunConfiguration):
-                        if self.processResult(item):
-                            self.resultsQueue.task_done()
-                            break
-                        self.resultsQueue.task_done()
+                    item = self.resultsQueue.get_nowait()
                 except queue.Empty:
-                    self.setNextFlush()
-                    if self.caseRunConfigurations.withDirtyResult:
-                        if self.flush():
-                            for crc in self.caseRunConfigurations.withDirtyResult:
-                                crc.result.dirty = False
-
-            self.tearDown()
-            LOGGER.debug("'%s' finished processing items (test run should be complete)", self)
-            self.checkEmptyQueue()
+                    break
+                LOGGER.debug("'%s' processing: '%s'", self, item)
+                testRunFinished = False
+                if isinstance(item, (CaseRunConfiguration, CaseRunConfigurationSnapshot)):
+                    testRunFinished = self.processResult(item)
+                    self._recordDelivered([item])
+                elif isinstance(item, ResultBatch):
+                    testRunFinished = self.processResultBatch(item)
+                    self._recordDelivered(item)
+                self.resultsQueue.task_done()
+                if testRunFinished:
+                    self._finish()
+                    return
+
+            if self.throttleInterval and self.nextFlush == 0:
+                self.setNextFlush()
+                # only the results changed since the last flush are
+                # dirty, if nothing has changed, there's nothing to flush
+                if self.caseRunConfigurations.hasDirtyResult:
+                    dirtyCrcs = self.caseRunConfigurations.withDirtyResult
+                    if self.flush():
+                        self.caseRunConfigurations.clearDirtyResults()
+                        self._recordDelivered(dirtyCrcs, flushed=True)
+            if self.throttleInterval and self._nextFlush != self._notifyFlushAt:
+                self._notifyFlushAt = self._nextFlush
+                self._dispatcher.notifyAt(self, self._nextFlush)
         except Exception as e:
             self.exception = dump_exception(e, self)
-            # reraise the exception so that it's exposed for unit tests
-            raise
+            # the exception is raised again by join so that it's exposed e.g. for unit tests
+            self._failure = e
+            LOGGER.error("ReportSender '%s' failed: %s", self, e)
+            self._ended()
+
+    def _finish(self):
+        self.tearDown()
+        LOGGER.debug("'%s' finished processing items (test run should be complete)", self)
+        if isinstance(self.resultsQueue, CoalescingQueue):
+            LOGGER.debug("'%s' merged %d of %d received updates", self,
+                         self.resultsQueue.merged, self.resultsQueue.received)
+        self.checkEmptyQueue()
+        if self.outbox is not None:
+            self.outbox.recordFinished(self.outboxKey)
+        self._ended()
+
+    def _recordDelivered(self, crcs, flushed=False):
+        """
+        Record the results as delivered in the outbox. Results processed by
+        throttled ReportSender are delivered only once they are flushed.
+        """
+        if self.outbox is None or (self.throttleInterval and not flushed):
+            return
+        for crc in crcs:
+            self.outbox.recordDelivered(self.outboxKey, self.caseRunConfigurations[crc.id])
+
+    def restoreResult(self, crcUpdate):
+        """
+        Update local copy of caseRunConfiguration with result which was
+        already delivered (e.g. before the pipeline died) without processing
+        it again, see TestRuns.resumeReporting.
+        """
+        localCaseRunConfiguration = self.caseRunConfigurations[crcUpdate.id]
+        localCaseRunConfiguration.updateResult(crcUpdate.result)
+        localCaseRunConfiguration.logs = crcUpdate.logs.copy()
+        localCaseRunConfiguration.result.dirty = False
+
+    def _ended(self):
+        if self._rateLimiter is not None:
+            self._rateLimiter.release()
+        self._finished.set()
 
     @property
     def nextFlush(self):
@@ -121,7 +377,8 @@ class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
 
     def setNextFlush(self, flush_time=None):
         """
-        Set time for next flush.
+        Set time for next flush. The interval is prolonged if the rate
+        limiter of this ReportSender doesn't allow flushing so often.
         :param flush_time: Set next flush time to the value directly provided instead of computing it from current time and throttle interval.
         :type flush_time: float (optional)
         """
@@ -130,7 +387,11 @@ class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
         if flush_time is not None:
             self._nextFlush = flush_time
         else:
-            self._nextFlush = time.time() + self.throttleInterval
+            # don't flush more often than the (shared) rate limit allows
+            interval = self.throttleInterval
+            if self._rateLimiter is not None:
+                interval = max(interval, self._rateLimiter.userInterval())
+            self._nextFlush = time.time() + interval
 
     def resultUpdate(self, crc):
         """
@@ -139,16 +400,41 @@ class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
         of the result itself.
 
         Default implementation just puts the relevant result to a queue which
-        is later processed by the ReportSender in its thread.
+        is later processed by the ReportSender when it's dispatched.
 
         :param result:
         :typer result: libpermian.testrun.result.Result
         :return: True if the result was relevant to the ReportSender instance. False otherwise.
         :rtype: bool
         """
-        if crc not in self.caseRunConfigurations:
+        if self.caseRunConfigurations.get(crc.id) is None:
             return False
         self.resultsQueue.put(crc)
+        if self._dispatcher is not None:
+            self._dispatcher.notify(self)
+        return True
+
+    def resultBatchUpdate(self, crcs):
+        """
+        Notify ReportSender about new results of multiple
+        caseRunConfigurations at once. The relevant results are put to the
+        queue as one ResultBatch item which is processed by
+        processResultBatch.
+
+        :param crcs: Updated caseRunConfigurations
+        :type crcs: iterable of CaseRunConfigurationSnapshot
+        :return: True if any of the results was relevant to the ReportSender instance. False otherwise.
+        :rtype: bool
+        """
+        batch = ResultBatch(
+            crc for crc in crcs
+            if self.caseRunConfigurations.get(crc.id) is not None
+        )
+        if not batch:
+            return False
+        self.resultsQueue.put(batch)
+        if self._dispatcher is not None:
+            self._dispatcher.notify(self)
         return True
 
     def processResult(self, crcUpdate):
@@ -161,10 +447,36 @@ class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
         :return: True if the processed result is expected to be the last one. False otherwise.
         :rtype: bool
         """
+        self._processUpdate(crcUpdate)
+        return self._checkTestRunFinished()
+
+    def processResultBatch(self, batch):
+        """
+        Batch counterpart of processResult, the results are processed one by
+        one (the same way as by processResult) and the end of the testrun is
+        checked only once for the whole batch. ReportSenders which can handle
+        the batch at once (e.g. single request to the remote system) should
+        override this method.
+
+        :param batch: Updated caseRunConfigurations
+        :type batch: ResultBatch
+        :return: True if the processed batch is expected to be the last one. False otherwise.
+        :rtype: bool
+        """
+        for crcUpdate in batch:
+            self._processUpdate(crcUpdate)
+        return self._checkTestRunFinished()
+
+    def _processUpdate(self, crcUpdate):
+        """
+        Update local copy of caseRunConfiguration and call the process
+        methods relevant for the update.
+        """
         localCaseRunConfiguration = self.caseRunConfigurations[crcUpdate.id]
         # Update result of local copy of caseRunConfiguration
         localCaseRunConfiguration.updateResult(crcUpdate.result)
         localCaseRunConfiguration.logs = crcUpdate.logs.copy()
+        localCaseRunConfiguration.timeline = crcUpdate.timeline
 
         if crcUpdate.result.final and (self.reporting.submit_issues is None or self.reporting.submit_issues):
                 for issue in self.issuesFor([crcUpdate]):
@@ -174,16 +486,23 @@ class BaseReportSender(threading.Thread, metaclass=abc.ABCMeta):
             if crcUpdate.result.final:
                 self.processFinalResult(crcUpdate)
                 # Catch end of test case
-                if all([crc.result.final for crc in self.caseRunConfigurations if crcUpdate.testcase == crc.testcase]):
+                if not self.caseRunConfigurations.unfinishedCount(crcUpdate.testcase):
                     self.processCaseRunFinished(crcUpdate.testcase.name)
             else:
                 self.processPartialResult(crcUpdate)
 
-        if all([crc.result.final for crc in self.caseRunConfigurations]):
+    def _checkTestRunFinished(self):
+        """
+        Call processTestRunFinished if all the caseRunConfigurations have
+        final result.
+
+        :return: True if the testrun is finished
+        :rtype: bool
+        """
+        if self.caseRunConfigurations.allResultsFinal:
             # Catch end of testun
             self.processTestRunFinished()
             return True
-
         return False
 
     def checkEmptyQueue(self):
@@ -0,0 +1,88 @@
+import queue
+from collections import deque
+
+class _Entry():
+    """
+    Item of the CoalescingQueue holding one caseRunConfiguration update or
+    multiple updates (batch). The updates can be replaced by newer ones
+    while the entry is waiting in the queue.
+    """
+    __slots__ = ('updates', 'batch')
+
+    def __init__(self, updates, batch):
+        self.updates = updates
+        self.batch = batch
+
+class CoalescingQueue(queue.Queue):
+    """
+    Queue of caseRunConfiguration updates which keeps only the latest pending
+    (not yet taken from the queue) update of each caseRunConfiguration. When
+    a newer update of caseRunConfiguration arrives, it replaces the pending
+    one (keeping its position in the queue) unless the pending update is
+    final, final updates are never replaced.
+
+    Both single updates (caseRunConfigurations or their snapshots) and
+    batches of updates (see ResultBatch) can be put to the queue, each update
+    in batch is coalesced separately and batch which updates are all merged
+    to already pending updates is not added to the queue at all.
+
+    :param batchClass: Class of the batch items, items of this class are handled as batches
+    :type batchClass: type
+    """
+    def __init__(self, batchClass, maxsize=0):
+        self.batchClass = batchClass
+        self.received = 0
+        """Number of updates put to the queue"""
+        self.merged = 0
+        """Number of updates which replaced already pending update"""
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self.queue = deque()
+        self._pending = {}
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _merge(self, update):
+        """
+        Replace pending update of the same caseRunConfiguration if there's
+        such non-final update.
+
+        :return: True if the update was merged
+        :rtype: bool
+        """
+        self.received += 1
+        try:
+            entry, index = self._pending[update.id]
+        except KeyError:
+            return False
+        if entry.updates[index].result.final:
+            return False
+        entry.updates[index] = update
+        self.merged += 1
+        return True
+
+    def _put(self, item):
+        if isinstance(item, self.batchClass):
+            updates = [update for update in item if not self._merge(update)]
+            entry = _Entry(updates, True)
+        else:
+            updates = [item] if not self._merge(item) else []
+            entry = _Entry(updates, False)
+        if not updates:
+            # nothing new was added, the put doesn't need task_done
+            self.unfinished_tasks -= 1
+            return
+        for index, update in enumerate(updates):
+            self._pending[update.id] = (entry, index)
+        self.queue.append(entry)
+
+    def _get(self):
+        entry = self.queue.popleft()
+        for update in entry.updates:
+            if self._pending.get(update.id, (None,))[0] is entry:
+                del self._pending[update.id]
+        if entry.batch:
+            return self.batchClass(entry.updates)
+        return entry.updates[0]
@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8
+"""Number of dispatcher worker threads used when not set in settings"""
+
+class ReportSenderDispatcher():
+    """
+    Drive ReportSenders using bounded pool of worker threads instead of
+    running each ReportSender in its own thread.
+
+    ReportSender which has some work to do (results in its queue, pending
+    start or flush) is put to the ready queue and one of the workers then
+    calls its dispatch method. Each ReportSender is in the ready queue at most
+    once and is handled by at most one worker at a time, so the items of one
+    ReportSender are processed in order and its process methods are never
+    called concurrently.
+
+    Flush and delayed start times of all the ReportSenders are kept in one
+    heap handled by single timer thread which puts the ReportSender to the
+    ready queue once its time comes.
+
+    :param workers: Number of worker threads, 0 means DEFAULT_WORKERS
+    :type workers: int
+    """
+    def __init__(self, workers=0):
+        self.workers = workers or DEFAULT_WORKERS
+        self._ready = queue.Queue()
+        self._timers = []
+        self._timersCondition = threading.Condition()
+        self._sequence = itertools.count()
+        self._threads = []
+        self._threadsLock = threading.Lock()
+        self._shutdown = False
+
+    def _ensureThreads(self):
+        with self._threadsLock:
+            if self._threads or self._shutdown:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f'reportsender-dispatcher-{index}',
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._time, name='reportsender-timer', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self, reportSender):
+        """
+        Signal that the reportSender has some work to do. The reportSender is
+        put to the ready queue unless it's already there or it's being
+        handled by a worker (the worker then checks for more work itself).
+        """
+        with reportSender._dispatchLock:
+            if reportSender._dispatchScheduled:
+                return
+            reportSender._dispatchScheduled = True
+        self._ensureThreads()
+        self._ready.put(reportSender)
+
+    def notifyAt(self, reportSender, when):
+        """
+        Notify the reportSender at the given time.
+
+        :param when: Time as returned by time.time()
+        :type when: float
+        """
+        self._ensureThreads()
+        with self._timersCondition:
+            heapq.heappush(self._timers, (when, next(self._sequence), reportSender))
+            self._timersCondition.notify()
+
+    def _work(self):
+        while True:
+            reportSender = self._ready.get()
+            if reportSender is None:
+                return
+            reportSender.dispatch()
+            with reportSender._dispatchLock:
+                requeue = reportSender.hasPendingWork()
+                if not requeue:
+                    reportSender._dispatchScheduled = False
+            if requeue:
+                # let other ReportSenders take their turn first
+                self._ready.put(reportSender)
+
+    def _time(self):
+        with self._timersCondition:
+            while not self._shutdown:
+                if not self._timers:
+                    self._timersCondition.wait()
+                    continue
+                delay = self._timers[0][0] - time.time()
+                if delay > 0:
+                    self._timersCondition.wait(delay)
+                    continue
+                _, _, reportSender = heapq.heappop(self._timers)
+                if not reportSender.finished:
+                    self.notify(reportSender)
+
+    def shutdown(self):
+        """
+        Stop the worker threads once they finish the ReportSenders already
+        in the ready queue.
+        """
+        with self._threadsLock:
+            self._shutdown = True
+            threads, self._threads = self._threads, []
+        with self._timersCondition:
+            self._timers.clear()
+            self._timersCondition.notify()
+        for _ in range(len(threads) - 1):
+            self._ready.put(None)
+        for thread in threads:
+            thread.join()
+
+_DEFAULT_DISPATCHER = None
+_DEFAULT_DISPATCHER_LOCK = threading.Lock()
+
+def defaultDispatcher():
+    """
+    Provide dispatcher used by ReportSenders started without explicit
+    dispatcher.
+
+    :rtype: ReportSenderDispatcher
+    """
+    global _DEFAULT_DISPATCHER
+    with _DEFAULT_DISPATCHER_LOCK:
+        if _DEFAULT_DISPATCHER is None:
+            _DEFAULT_DISPATCHER = ReportSenderDispatcher()
+        return _DEFAULT_DISPATCHER
@@ -0,0 +1,214 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from ..result import Result
+
+LOGGER = logging.getLogger(__name__)
+
+SECRET_OPTION_RE = re.compile(r'token|pass|secret|key', re.IGNORECASE)
+"""Settings options matching this pattern are not written to the outbox"""
+
+def resultData(result):
+    """
+    :return: JSON serializable representation of the result
+    :rtype: dict
+    """
+    return {
+        'state': result.state,
+        'result': result.result,
+        'final': result.final,
+        'extra_fields': dict(result.extra_fields),
+    }
+
+def redactOverrides(overrides):
+    """
+    Split settings overrides to options which can be written to the outbox
+    and names of options which look like secrets (tokens, passwords, keys).
+
+    :return: Overrides without the secrets and list of (section, option) pairs of the secrets
+    :rtype: tuple
+    """
+    redacted = []
+    kept = {}
+    for section, options in overrides.items():
+        kept[section] = {}
+        for option, value in options.items():
+            if SECRET_OPTION_RE.search(option):
+                redacted.append((section, option))
+            else:
+                kept[section][option] = value
+    return kept, redacted
+
+def resultFromData(data):
+    """
+    Inverse of resultData.
+
+    :rtype: libpermian.result.Result
+    """
+    return Result(data['state'], data['result'], data['final'], **data['extra_fields'])
+
+class Outbox():
+    """
+    Append-only on-disk journal of the reporting. It records the result
+    updates accepted by TestRuns (in the order they were accepted), updates
+    delivered by individual ReportSenders and the ReportSenders which
+    finished the reporting. If the pipeline dies, the reporting can be
+    resumed from the outbox, see OutboxState and resume-reporting command.
+
+    Each record is one line of JSON. The records are written immediately but
+    they are synced to disk in batches, at most syncInterval seconds after
+    they were written, so only the records written during the last
+    syncInterval may be lost when the whole system crashes.
+
+    :param path: Path to the outbox file
+    :type path: str
+    :param syncInterval: Maximal number of seconds between write and fsync of a record
+    :type syncInterval: float
+    :param append: Append to existing outbox file instead of overwriting it
+    :type append: bool
+    """
+    def __init__(self, path, syncInterval=1, append=False):
+        self.path = path
+        self.syncInterval = syncInterval
+        self._file = open(path, 'a' if append else 'w')
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._closed = threading.Event()
+        self._syncThread = threading.Thread(target=self._syncPeriodically, name='outbox-sync', daemon=True)
+        self._syncThread.start()
+
+    def _write(self, record):
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            if self._file.closed:
+                LOGGER.error("Outbox '%s' is already closed, record was not written: %s", self.path, line)
+                return
+            self._file.write(line)
+            self._unsynced += 1
+
+    def sync(self):
+        """
+        Flush the written records and sync them to disk.
+        """
+        with self._lock:
+            if not self._unsynced or self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def _syncPeriodically(self):
+        while not self._closed.wait(self.syncInterval):
+            self.sync()
+
+    def close(self):
+        self._closed.set()
+        self._syncThread.join()
+        self.sync()
+        with self._lock:
+            self._file.close()
+
+    def recordHeader(self, event, settingsPaths, overrides):
+        """
+        Record information needed to recreate the same ReportSenders when the
+        reporting is resumed. Overrides which look like secrets are not
+        recorded, only their names are, see redactOverrides.
+
+        :param event: Event specification (json) the pipeline was executed with
+        :type event: str
+        """
+        overrides, redacted = redactOverrides(overrides)
+        self._write({
+            'type': 'header',
+            'time': time.time(),
+            'event': event,
+            'settings': list(settingsPaths),
+            'overrides': overrides,
+            'redacted': redacted,
+        })
+        self.sync()
+
+    def recordUpdate(self, crcUpdate):
+        """
+        Record update of caseRunConfiguration accepted by TestRuns.
+        """
+        self._write({
+            'type': 'update',
+            'crc': crcUpdate.id,
+            'result': resultData(crcUpdate.result),
+            'logs': dict(crcUpdate.logs),
+        })
+
+    def recordDelivered(self, reportSenderKey, crc):
+        """
+        Record that the ReportSender has delivered the current result of the
+        caseRunConfiguration.
+        """
+        self._write({
+            'type': 'delivered',
+            'sender': reportSenderKey,
+            'crc': crc.id,
+            'result': resultData(crc.result),
+        })
+
+    def recordFinished(self, reportSenderKey):
+        """
+        Record that the ReportSender has finished the reporting.
+        """
+        self._write({'type': 'finished', 'sender': reportSenderKey})
+        self.sync()
+
+class OutboxState():
+    """
+    State of the reporting reconstructed from the outbox file. Incomplete
+    last record (written when the pipeline died) is ignored.
+
+    :param path: Path to the outbox file
+    :type path: str
+    :raises ValueError: When the outbox doesn't start with header record
+    """
+    def __init__(self, path):
+        self.header = None
+        self.updates = {}
+        """Latest update of each caseRunConfiguration (crc id -> record)"""
+        self.delivered = {}
+        """Latest delivered results (sender key -> crc id -> result data)"""
+        self.finished = set()
+        """Keys of the ReportSenders which finished the reporting"""
+        with open(path) as fo:
+            for lineno, line in enumerate(fo, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    LOGGER.warning("Ignoring incomplete record on line %d of outbox '%s'", lineno, path)
+                    continue
+                self._apply(record)
+        if self.header is None:
+            raise ValueError(f"Outbox '{path}' doesn't contain header record")
+
+    def _apply(self, record):
+        recordType = record['type']
+        if recordType == 'header':
+            if self.header is None:
+                self.header = record
+        elif recordType == 'update':
+            # keep the order of the first update of each caseRunConfiguration
+            self.updates[record['crc']] = record
+        elif recordType == 'delivered':
+            self.delivered.setdefault(record['sender'], {})[record['crc']] = record['result']
+        elif recordType == 'finished':
+            self.finished.add(record['sender'])
+
+    def isDelivered(self, reportSenderKey, crcId):
+        """
+        :return: True if the ReportSender has delivered the latest result of the caseRunConfiguration
+        :rtype: bool
+        """
+        update = self.updates.get(crcId)
+        if update is None:
+            return True
+        return self.delivered.get(reportSenderKey, {}).get(crcId) == update['result']
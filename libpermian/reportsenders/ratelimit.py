@@ -0,0 +1,190 @@
+import email.utils
+import threading
+import time
+
+MIN_BACKOFF = 1
+"""Seconds to back off when rate limit is hit and the remote doesn't say how long to wait"""
+MAX_BACKOFF = 600
+"""Maximal number of seconds to back off"""
+RECOVERY_INTERVAL = 60
+"""Seconds without hitting the rate limit after which the reduced rate is doubled"""
+MIN_RATE = 1 / 60
+"""Minimal requests per second the rate can be reduced to by backing off"""
+
+class TokenBucket():
+    """
+    Thread-safe token bucket rate limiter. Each request takes one token,
+    tokens are refilled with given rate up to the burst size. When the
+    remote system signals that the rate limit was hit (see backoff), all the
+    requests are paused and the rate is halved, the original rate is then
+    restored gradually while the rate limit is not hit again. The rate is
+    never reduced below MIN_RATE (unless the configured rate is lower).
+
+    :param rate: Number of requests per second, 0 means unlimited
+    :type rate: float
+    :param burst: Maximal number of requests which can be made at once
+    :type burst: int
+    """
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        """Configured rate (requests per second)"""
+        self.effectiveRate = rate
+        """Current rate which may be reduced after hitting the rate limit"""
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._pausedUntil = 0
+        self._backoff = 0
+        self._lastBackoff = 0
+        self._lock = threading.Lock()
+        self.users = 0
+        """Number of users sharing the limiter, see getRateLimiter"""
+
+    def _refill(self, now):
+        if self.effectiveRate < self.rate and now - self._lastBackoff > RECOVERY_INTERVAL:
+            self.effectiveRate = min(self.effectiveRate * 2, self.rate)
+            self._lastBackoff = now
+        if self.effectiveRate:
+            self._tokens = min(self._tokens + (now - self._updated) * self.effectiveRate, self.burst)
+        self._updated = now
+
+    def delay(self):
+        """
+        :return: Seconds until a token is available (without taking it)
+        :rtype: float
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return self._delay(now)
+
+    def _delay(self, now):
+        delay = max(self._pausedUntil - now, 0)
+        if self.effectiveRate and self._tokens < 1:
+            delay = max(delay, (1 - self._tokens) / self.effectiveRate)
+        return delay
+
+    def userInterval(self):
+        """
+        Minimal interval between requests of one user so that requests of all
+        the users fit into the effective rate, including the pause after
+        hitting the rate limit.
+
+        :return: Seconds, 0 if the rate is not limited and requests are not paused
+        :rtype: float
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            interval = max(self._pausedUntil - now, 0)
+            if self.effectiveRate:
+                interval = max(interval, max(self.users, 1) / self.effectiveRate)
+            return interval
+
+    def acquire(self):
+        """
+        Take one token, block until it's available.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._delay(now)
+                if delay <= 0:
+                    if self.effectiveRate:
+                        self._tokens -= 1
+                    return
+            time.sleep(delay)
+
+    def backoff(self, retryAfter=None):
+        """
+        Pause all the requests after the remote system signaled that the rate
+        limit was hit. Without retryAfter (None or 0) the pause grows
+        exponentially with each consecutive backoff.
+
+        :param retryAfter: Seconds to wait as requested by the remote system
+        :type retryAfter: float, optional
+        :return: Seconds the requests are paused for
+        :rtype: float
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not retryAfter:
+                self._backoff = min(max(self._backoff * 2, MIN_BACKOFF), MAX_BACKOFF)
+                retryAfter = self._backoff
+            self._pausedUntil = max(self._pausedUntil, now + retryAfter)
+            if self.rate:
+                self.effectiveRate = max(self.effectiveRate / 2, min(self.rate, MIN_RATE))
+            self._tokens = min(self._tokens, 0)
+            self._lastBackoff = now
+            return retryAfter
+
+    def succeeded(self):
+        """
+        Reset the exponential backoff after successful request.
+        """
+        with self._lock:
+            self._backoff = 0
+
+    def release(self):
+        """
+        Signal that one of the users no longer uses the limiter.
+        """
+        with self._lock:
+            self.users = max(self.users - 1, 0)
+
+_LIMITERS = {}
+_LIMITERS_LOCK = threading.Lock()
+
+def getRateLimiter(endpoint, rate, burst=1):
+    """
+    Provide rate limiter shared by all the users of the same remote
+    endpoint. The rate and burst are used only when the limiter is created.
+    Each call registers new user of the limiter, the user should call
+    release once it no longer uses the limiter.
+
+    :param endpoint: Identifier of the remote endpoint, e.g. API base URL, None for limiter which is not shared
+    :type endpoint: str or None
+    :rtype: TokenBucket
+    """
+    with _LIMITERS_LOCK:
+        if endpoint is None:
+            limiter = TokenBucket(rate, burst)
+        else:
+            try:
+                limiter = _LIMITERS[endpoint]
+            except KeyError:
+                limiter = _LIMITERS[endpoint] = TokenBucket(rate, burst)
+    with limiter._lock:
+        limiter.users += 1
+    return limiter
+
+def retryAfter(response):
+    """
+    Find out if the HTTP response signals that the rate limit was hit.
+
+    :param response: Response of the requests library
+    :return: None if the rate limit wasn't hit, otherwise seconds to wait (0 if not provided by the remote)
+    :rtype: None or float
+    """
+    if response.status_code not in (403, 429):
+        return None
+    headers = response.headers
+    value = headers.get('Retry-After')
+    if value is not None:
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            try:
+                return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0)
+            except (TypeError, ValueError):
+                return 0
+    if headers.get('X-RateLimit-Remaining') == '0':
+        try:
+            return max(float(headers.get('X-RateLimit-Reset')) - time.time(), 0)
+        except (TypeError, ValueError):
+            return 0
+    if response.status_code == 429 or 'rate limit' in response.text.lower():
+        return 0
+    # regular 403, e.g. insufficient permissions
+    return None
@@ -0,0 +1,57 @@
+import unittest
+from collections import namedtuple
+
+from ..result import Result
+from .base import ResultBatch
+from .coalescing import CoalescingQueue
+
+Update = namedtuple('Update', ['id', 'result'])
+
+
+class TestCoalescingQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = CoalescingQueue(ResultBatch)
+
+    def test_latest_update_kept(self):
+        self.queue.put(Update('a', Result('started')))
+        self.queue.put(Update('b', Result('started')))
+        self.queue.put(Update('a', Result('running')))
+        self.assertEqual(self.queue.qsize(), 2)
+        self.assertEqual(self.queue.get(), Update('a', Result('running')))
+        self.assertEqual(self.queue.get(), Update('b', Result('started')))
+        self.assertEqual((self.queue.received, self.queue.merged), (3, 1))
+
+    def test_final_kept(self):
+        self.queue.put(Update('a', Result('complete', 'PASS', True)))
+        self.queue.put(Update('a', Result('canceled', None, True)))
+        self.assertEqual(self.queue.qsize(), 2)
+        self.assertEqual(self.queue.merged, 0)
+        self.queue.put(Update('a', Result('running')))
+        self.assertEqual(self.queue.get(), Update('a', Result('complete', 'PASS', True)))
+
+    def test_taken_update_not_replaced(self):
+        self.queue.put(Update('a', Result('started')))
+        self.queue.get()
+        self.queue.task_done()
+        self.queue.put(Update('a', Result('running')))
+        self.assertEqual(self.queue.get(), Update('a', Result('running')))
+        self.queue.task_done()
+        self.assertEqual(self.queue.merged, 0)
+        self.assertEqual(self.queue.unfinished_tasks, 0)
+
+    def test_batch(self):
+        self.queue.put(ResultBatch([Update('a', Result('started')), Update('b', Result('started'))]))
+        self.queue.put(Update('c', Result('started')))
+        self.queue.put(ResultBatch([Update('b', Result('running')), Update('c', Result('running'))]))
+        # fully merged batch is not added
+        self.assertEqual(self.queue.qsize(), 2)
+        self.assertEqual(self.queue.unfinished_tasks, 2)
+        self.queue.put(ResultBatch([Update('a', Result('complete', 'PASS', True)), Update('d', Result('started'))]))
+        self.assertEqual(self.queue.qsize(), 3)
+        self.assertEqual(
+            self.queue.get(),
+            ResultBatch([Update('a', Result('complete', 'PASS', True)), Update('b', Result('running'))]),
+        )
+        self.assertEqual(self.queue.get(), Update('c', Result('running')))
+        self.assertEqual(self.queue.get(), ResultBatch([Update('d', Result('started'))]))
+        self.assertEqual((self.queue.received, self.queue.merged), (7, 3))
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from ..result import Result
+from .outbox import Outbox, OutboxState, resultData, resultFromData, redactOverrides
+
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def crc(self, crcId, result, logs={}):
+        crc = MagicMock()
+        crc.id = crcId
+        crc.result = result
+        crc.logs = logs
+        return crc
+
+    def test_result_data(self):
+        result = Result('complete', 'PASS', True, beaker_links=['http://example.com'])
+        self.assertEqual(resultFromData(resultData(result)), result)
+        self.assertEqual(resultFromData(resultData(result)).extra_fields, result.extra_fields)
+
+    def test_state(self):
+        outbox = Outbox(self.path, syncInterval=0.01)
+        outbox.recordHeader('{"type": "test"}', ['settings.ini'], {'section': {'option': 'value'}})
+        outbox.recordUpdate(self.crc('a', Result('running')))
+        outbox.recordUpdate(self.crc('b', Result('running')))
+        outbox.recordDelivered('sender1', self.crc('a', Result('running')))
+        outbox.recordDelivered('sender2', self.crc('a', Result('running')))
+        outbox.recordUpdate(self.crc('a', Result('complete', 'PASS', True), {'log': 'a.log'}))
+        outbox.recordDelivered('sender1', self.crc('a', Result('complete', 'PASS', True)))
+        outbox.recordFinished('sender3')
+        outbox.close()
+        # simulate record cut off by crash
+        with open(self.path, 'a') as fo:
+            fo.write('{"type": "upd')
+
+        state = OutboxState(self.path)
+        self.assertEqual(state.header['event'], '{"type": "test"}')
+        self.assertEqual(state.header['overrides'], {'section': {'option': 'value'}})
+        self.assertEqual(list(state.updates), ['a', 'b'])
+        self.assertEqual(state.updates['a']['logs'], {'log': 'a.log'})
+        self.assertTrue(state.isDelivered('sender1', 'a'))
+        self.assertFalse(state.isDelivered('sender2', 'a'))
+        self.assertFalse(state.isDelivered('sender1', 'b'))
+        self.assertTrue(state.isDelivered('sender1', 'c'))
+        self.assertEqual(state.finished, {'sender3'})
+
+    def test_redacted_overrides(self):
+        overrides = {
+            'github': {'token': 'secret1', 'repository': 'permian'},
+            'jenkins': {'password': 'secret2', 'ApiKey': 'secret3'},
+        }
+        self.assertEqual(
+            redactOverrides(overrides),
+            (
+                {'github': {'repository': 'permian'}, 'jenkins': {}},
+                [('github', 'token'), ('jenkins', 'password'), ('jenkins', 'ApiKey')],
+            )
+        )
+        outbox = Outbox(self.path)
+        outbox.recordHeader('event', [], overrides)
+        outbox.close()
+        with open(self.path) as fo:
+            content = fo.read()
+        for secret in ('secret1', 'secret2', 'secret3'):
+            self.assertNotIn(secret, content)
+        header = OutboxState(self.path).header
+        self.assertEqual(header['overrides'], {'github': {'repository': 'permian'}, 'jenkins': {}})
+        self.assertEqual(header['redacted'], [['github', 'token'], ['jenkins', 'password'], ['jenkins', 'ApiKey']])
+
+    def test_append(self):
+        outbox = Outbox(self.path)
+        outbox.recordHeader('first', [], {})
+        outbox.close()
+        outbox = Outbox(self.path, append=True)
+        outbox.recordHeader('second', [], {})
+        outbox.recordFinished('sender')
+        outbox.close()
+        state = OutboxState(self.path)
+        self.assertEqual(state.header['event'], 'first')
+        self.assertEqual(state.finished, {'sender'})
+        outbox = Outbox(self.path)
+        outbox.close()
+        with self.assertRaises(ValueError):
+            OutboxState(self.path)
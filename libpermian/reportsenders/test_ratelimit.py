@@ -0,0 +1,81 @@
+import time
+import unittest
+
+from .ratelimit import MIN_RATE, TokenBucket, getRateLimiter, retryAfter
+
+
+class ResponseMock():
+    def __init__(self, status_code, headers=None, text=''):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst(self):
+        limiter = TokenBucket(10, 3)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertGreater(limiter.delay(), 0)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreater(time.monotonic() - start, 0.05)
+
+    def test_unlimited(self):
+        limiter = TokenBucket(0)
+        for _ in range(100):
+            limiter.acquire()
+        self.assertEqual(limiter.delay(), 0)
+
+    def test_backoff(self):
+        limiter = TokenBucket(10, 10)
+        self.assertEqual(limiter.backoff(0.2), 0.2)
+        self.assertEqual(limiter.effectiveRate, 5)
+        self.assertGreater(limiter.delay(), 0.1)
+        start = time.monotonic()
+        limiter.acquire()
+        self.assertGreater(time.monotonic() - start, 0.1)
+
+    def test_exponential_backoff(self):
+        limiter = TokenBucket(0)
+        self.assertEqual([limiter.backoff() for _ in range(3)], [1, 2, 4])
+        limiter.succeeded()
+        self.assertEqual(limiter.backoff(), 1)
+
+    def test_repeated_backoff(self):
+        limiter = TokenBucket(1, 1)
+        for _ in range(50):
+            limiter.backoff(0.01)
+        self.assertEqual(limiter.effectiveRate, MIN_RATE)
+        time.sleep(0.02)
+        self.assertLessEqual(limiter.delay(), 1 / MIN_RATE)
+        slowLimiter = TokenBucket(MIN_RATE / 2)
+        slowLimiter.backoff(0.01)
+        self.assertEqual(slowLimiter.effectiveRate, MIN_RATE / 2)
+
+    def test_shared(self):
+        first = getRateLimiter('https://example.com/shared', 2)
+        second = getRateLimiter('https://example.com/shared', 5)
+        self.assertIs(first, second)
+        self.assertEqual(first.rate, 2)
+        self.assertEqual(first.users, 2)
+        self.assertEqual(first.userInterval(), 1)
+        second.release()
+        self.assertEqual(first.userInterval(), 0.5)
+        self.assertIsNot(getRateLimiter(None, 2), getRateLimiter(None, 2))
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_not_limited(self):
+        self.assertIsNone(retryAfter(ResponseMock(200)))
+        self.assertIsNone(retryAfter(ResponseMock(403, text='Resource not accessible by integration')))
+
+    def test_retry_after(self):
+        self.assertEqual(retryAfter(ResponseMock(403, {'Retry-After': '30'})), 30)
+        self.assertEqual(retryAfter(ResponseMock(429)), 0)
+        self.assertEqual(retryAfter(ResponseMock(403, text='You have exceeded a secondary rate limit')), 0)
+
+    def test_reset(self):
+        reset = str(int(time.time()) + 60)
+        delay = retryAfter(ResponseMock(403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}))
+        self.assertTrue(55 < delay <= 60)
@@ -1,7 +1,14 @@
+import threading
+import time
 import unittest
+from unittest.mock import MagicMock
 from tplib import library
 from libpermian.settings import Settings
+from libpermian.reportsenders.base import BaseReportSender
+from libpermian.caserunconfiguration import CaseRunConfiguration, CaseRunConfigurationsList
+from libpermian.result import Result
 from libpermian.reportsenders.factory import ReportSenderFactory
+from libpermian.reportsenders.dispatcher import ReportSenderDispatcher
 from libpermian.testruns import TestRuns
 from libpermian.events.base import Event
 
@@ -19,3 +26,171 @@ class TestDefaultReportSenders(unittest.TestCase):
                     ('testplan 2', 'test', {'test': 'from-defaults'})]
 
         self.assertCountEqual(expected, [ (rs.testplan.name, rs.reporting.type, rs.reporting.data) for rs in testruns.reportSenders ])
+
+
+class DummyTestCase():
+    def __init__(self, name):
+        self.name = name
+        self.id = name
+
+
+class RecordingReportSender(BaseReportSender):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.processed = []
+        self.threads = set()
+
+    def processPartialResult(self, crc):
+        self.threads.add(threading.current_thread())
+        self.processed.append(('partial', crc.id))
+
+    def processFinalResult(self, crc):
+        self.processed.append(('final', crc.id))
+
+    def processTestRunStarted(self):
+        self.processed.append(('started',))
+
+    def processTestRunFinished(self):
+        self.processed.append(('finished',))
+
+    def processCaseRunFinished(self, testCaseID):
+        self.processed.append(('caserun finished', testCaseID))
+
+    def flush(self):
+        self.processed.append(('flush',))
+        return True
+
+
+class TestResultBatch(unittest.TestCase):
+    def setUp(self):
+        settings = Settings(cmdline_overrides={'reportSenders': {'coalesceUpdates': 'False'}}, environment={}, settings_locations=[])
+        reporting = MagicMock()
+        reporting.type = 'test'
+        reporting.submit_issues = False
+        testcase = DummyTestCase('tc1')
+        self.crcs = [
+            CaseRunConfiguration(testcase, {'arch': 'x86_64'}, []),
+            CaseRunConfiguration(testcase, {'arch': 'aarch64'}, []),
+            CaseRunConfiguration(DummyTestCase('tc2'), {}, []),
+        ]
+        self.reportSender = RecordingReportSender(
+            MagicMock(), reporting, CaseRunConfigurationsList(self.crcs).copy(),
+            None, settings, MagicMock(),
+        )
+
+    def test_batch(self):
+        other = CaseRunConfiguration(DummyTestCase('other'), {}, [])
+        self.assertFalse(self.reportSender.resultBatchUpdate([other.snapshot()]))
+        self.assertTrue(self.reportSender.resultBatchUpdate(
+            [crc.snapshot(Result('running')) for crc in self.crcs[:2]] + [other.snapshot()]
+        ))
+        self.assertTrue(self.reportSender.resultBatchUpdate(
+            [crc.snapshot(Result('complete', 'PASS', True)) for crc in self.crcs]
+        ))
+        self.assertEqual(self.reportSender.resultsQueue.qsize(), 2)
+        self.reportSender.start()
+        self.reportSender.join()
+        self.assertIsNone(self.reportSender.exception)
+        self.assertEqual(self.reportSender.processed, [
+            ('started',),
+            ('partial', self.crcs[0].id),
+            ('partial', self.crcs[1].id),
+            ('final', self.crcs[0].id),
+            ('final', self.crcs[1].id),
+            ('caserun finished', 'tc1'),
+            ('final', self.crcs[2].id),
+            ('caserun finished', 'tc2'),
+            ('finished',),
+        ])
+
+
+class TestDispatcher(unittest.TestCase):
+    def makeReportSender(self, name, overrides={}):
+        settings = Settings(cmdline_overrides={'reportSenders': overrides}, environment={}, settings_locations=[])
+        reporting = MagicMock()
+        reporting.type = 'test'
+        reporting.submit_issues = False
+        crc = CaseRunConfiguration(DummyTestCase(name), {}, [])
+        reportSender = RecordingReportSender(
+            MagicMock(), reporting, CaseRunConfigurationsList([crc]).copy(),
+            None, settings, MagicMock(),
+        )
+        return reportSender, crc
+
+    def test_ordering(self):
+        dispatcher = ReportSenderDispatcher(2)
+        reportSenders = [self.makeReportSender(f'tc{i}', {'coalesceUpdates': 'False'}) for i in range(20)]
+        for reportSender, _ in reportSenders:
+            reportSender.start(dispatcher)
+        for state in ('started', 'running', 'cleaning'):
+            for reportSender, crc in reportSenders:
+                reportSender.resultUpdate(crc.snapshot(Result(state)))
+        for reportSender, crc in reportSenders:
+            reportSender.resultUpdate(crc.snapshot(Result('complete', 'PASS', True)))
+        threads = set()
+        for reportSender, crc in reportSenders:
+            reportSender.join(5)
+            self.assertFalse(reportSender.is_alive())
+            self.assertIsNone(reportSender.exception)
+            self.assertEqual(reportSender.processed, [('started',)] + [('partial', crc.id)] * 3 + [
+                ('final', crc.id),
+                ('caserun finished', crc.testcase.name),
+                ('finished',),
+            ])
+            threads.update(reportSender.threads)
+        self.assertLessEqual(len(threads), 2)
+        dispatcher.shutdown()
+
+    def test_flush(self):
+        dispatcher = ReportSenderDispatcher(1)
+        reportSender, crc = self.makeReportSender('tc', {'throttleInterval': '0.1'})
+        reportSender.start(dispatcher)
+        reportSender.resultUpdate(crc.snapshot(Result('running')))
+        deadline = time.time() + 5
+        while ('flush',) not in reportSender.processed and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertIn(('flush',), reportSender.processed)
+        reportSender.resultUpdate(crc.snapshot(Result('complete', 'PASS', True)))
+        reportSender.join(5)
+        self.assertFalse(reportSender.is_alive())
+        self.assertEqual(reportSender.processed, [('started',), ('flush',), ('finished',)])
+        with self.assertRaises(RuntimeError):
+            reportSender.start(dispatcher)
+        dispatcher.shutdown()
+
+    def test_rate_limit_pause(self):
+        dispatcher = ReportSenderDispatcher(1)
+        reportSender, crc = self.makeReportSender('tc', {'rateLimit': '10', 'coalesceUpdates': 'False'})
+        self.assertTrue(reportSender.rateLimited)
+        self.assertFalse(self.makeReportSender('other')[0].rateLimited)
+        reportSender.rateLimiter.backoff(0.3)
+        reportSender.start(dispatcher)
+        reportSender.resultUpdate(crc.snapshot(Result('running')))
+        time.sleep(0.1)
+        # the paused ReportSender doesn't take any work
+        self.assertEqual(reportSender.processed, [])
+        self.assertEqual(reportSender.resultsQueue.qsize(), 1)
+        reportSender.resultUpdate(crc.snapshot(Result('complete', 'PASS', True)))
+        reportSender.join(5)
+        self.assertFalse(reportSender.is_alive())
+        self.assertEqual(reportSender.processed[:2], [('started',), ('partial', crc.id)])
+        dispatcher.shutdown()
+
+    def test_failure_raised_by_join(self):
+        dispatcher = ReportSenderDispatcher(1)
+        reportSender, crc = self.makeReportSender('tc', {'coalesceUpdates': 'False'})
+        reportSender.processTestRunStarted = MagicMock(side_effect=ValueError('failed'))
+        reportSender.start(dispatcher)
+        with self.assertRaisesRegex(ValueError, 'failed'):
+            reportSender.join(5)
+        self.assertIsNotNone(reportSender.exception)
+        self.assertFalse(reportSender.is_alive())
+        dispatcher.shutdown()
+
+    def test_run(self):
+        reportSender, crc = self.makeReportSender('tc', {'coalesceUpdates': 'False'})
+        reportSender.resultUpdate(crc.snapshot(Result('complete', 'PASS', True)))
+        reportSender.run()
+        self.assertFalse(reportSender.is_alive())
+        self.assertEqual(reportSender.processed[0], ('started',))
+        self.assertEqual(reportSender.processed[-1], ('finished',))
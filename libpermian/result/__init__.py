@@ -1,6 +1,9 @@
+import contextlib
+import threading
 from collections import OrderedDict
+from types import MappingProxyType
 
-from ..exceptions import StateChangeError
+from ..exceptions import StateChangeError, ReadOnlyChangeError
 
 UNSET = object()
 
@@ -22,43 +25,235 @@ RESULTS = OrderedDict((
     ('ERROR', 'There was an error during the execution.'),
 ))
 
+STATE_NAMES = tuple(STATES)
+"""State names indexed by their rank"""
+STATE_RANKS = {state: rank for rank, state in enumerate(STATE_NAMES)}
+"""Mapping of state names to their rank (order in STATES)"""
+
+RESULT_NAMES = tuple(RESULTS)
+"""Result names indexed by their rank"""
+RESULT_RANKS = {result: rank for rank, result in enumerate(RESULT_NAMES)}
+"""Mapping of result names to their rank (order in RESULTS)"""
+
+RESULT_LOCKS = tuple(threading.RLock() for _ in range(64))
+"""
+Striped locks guarding results owned by caseRunConfigurations, the lock is
+held while the result is changed and its observers are notified, see
+resultLock and CaseRunConfigurationsList.
+"""
+
+_NO_LOCK = contextlib.nullcontext()
+
+def resultLock(owner):
+    """
+    Provide lock guarding result of given owner (caseRunConfiguration). The
+    owners are spread over RESULT_LOCKS so that changes of results owned by
+    different caseRunConfigurations don't wait for each other. Results
+    without owner have no observers and don't need any locking.
+
+    :param owner: Owner of the result or None
+    :return: Lock (context manager) for the result
+    """
+    if owner is None:
+        return _NO_LOCK
+    return RESULT_LOCKS[(id(owner) >> 4) % len(RESULT_LOCKS)]
+
+EMPTY_MAPPING = MappingProxyType({})
+"""Shared read-only empty mapping provided instead of allocating empty dicts"""
+
+def rankOfState(state):
+    try:
+        return STATE_RANKS[state]
+    except (KeyError, TypeError):
+        raise ValueError('Unknown state: "%s"' % state) from None
+
+def rankOfResult(result):
+    try:
+        return RESULT_RANKS[result]
+    except (KeyError, TypeError):
+        raise ValueError('Unknown result: "%s"' % result) from None
+
 class Result():
+    """
+    State and result of an execution. The state and result are stored as
+    integer ranks (position in STATES and RESULTS) so that they can be
+    compared and aggregated cheaply, the names are still provided by the
+    state and result properties.
+
+    The Result may be owned by a caseRunConfiguration which is notified about
+    every change of the state, result, final or dirty flags so that the
+    aggregated information about the caseRunConfigurations can be maintained
+    incrementally.
+    """
+    __slots__ = ('_stateRank', '_resultRank', '_final', '_dirty', '_extra_fields', '_owner')
+
     def __init__(self, state=None, result=None, final=False, dirty=True, **kwargs):
-        if state not in STATES:
-            raise ValueError('Unknown state: "%s"' % state)
-        if result not in RESULTS:
-            raise ValueError('Unknown result: "%s"' % result)
-        self.state = state
-        self.result = result
-        self.final = final
-        self.extra_fields = kwargs
-        self.dirty = dirty
+        self._stateRank = rankOfState(state)
+        self._resultRank = rankOfResult(result)
+        self._final = final
+        # The dict is allocated only when there are some extra fields
+        self._extra_fields = kwargs or None
+        self._dirty = dirty
+        self._owner = None
+
+    @property
+    def key(self):
+        """
+        Tuple of the stateRank, resultRank, final and dirty values which
+        are aggregated by CaseRunConfigurationsList.
+        """
+        return (self._stateRank, self._resultRank, self._final, self._dirty)
+
+    def _changed(self, oldKey):
+        """
+        Notify owner (if any) about change of the values provided by key.
+        """
+        if self._owner is not None:
+            self._owner._resultChanged(oldKey, self.key)
+
+    @property
+    def stateRank(self):
+        """Rank of the state, see STATE_NAMES"""
+        return self._stateRank
+
+    @stateRank.setter
+    def stateRank(self, stateRank):
+        with resultLock(self._owner):
+            oldKey = self.key
+            self._stateRank = stateRank
+            self._changed(oldKey)
+
+    @property
+    def resultRank(self):
+        """Rank of the result, see RESULT_NAMES"""
+        return self._resultRank
+
+    @resultRank.setter
+    def resultRank(self, resultRank):
+        with resultLock(self._owner):
+            oldKey = self.key
+            self._resultRank = resultRank
+            self._changed(oldKey)
+
+    @property
+    def final(self):
+        return self._final
+
+    @final.setter
+    def final(self, final):
+        with resultLock(self._owner):
+            oldKey = self.key
+            self._final = final
+            self._changed(oldKey)
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    @dirty.setter
+    def dirty(self, dirty):
+        with resultLock(self._owner):
+            oldKey = self.key
+            self._dirty = dirty
+            self._changed(oldKey)
+
+    @property
+    def state(self):
+        return STATE_NAMES[self._stateRank]
+
+    @state.setter
+    def state(self, state):
+        self.stateRank = rankOfState(state)
+
+    @property
+    def result(self):
+        return RESULT_NAMES[self._resultRank]
+
+    @result.setter
+    def result(self, result):
+        self.resultRank = rankOfResult(result)
+
+    @property
+    def extra_fields(self):
+        """
+        Additional information provided along with the result. If there are
+        no extra fields, read-only empty mapping is provided.
+        """
+        if self._extra_fields is None:
+            return EMPTY_MAPPING
+        return self._extra_fields
 
     def update(self, result):
-        if self.final:
+        if self._final:
             raise StateChangeError('Cannot update status of already ended instance.')
-        self.final = result.final
-        if list(STATES).index(result.state) < list(STATES).index(self.state):
-            raise StateChangeError(f'Cannot change state from "{self.state}" to "{result.state}".')
-        self.state = result.state
-        if list(RESULTS).index(result.result) > list(RESULTS).index(self.result):
-            self.result = result.result
-        self.extra_fields.update(result.extra_fields)
-        self.dirty = True
+        with resultLock(self._owner):
+            oldKey = self.key
+            try:
+                self._final = result._final
+                if result._stateRank < self._stateRank:
+                    raise StateChangeError(f'Cannot change state from "{self.state}" to "{result.state}".')
+                self._stateRank = result._stateRank
+                if result._resultRank > self._resultRank:
+                    self._resultRank = result._resultRank
+                if result._extra_fields:
+                    if self._extra_fields is None:
+                        self._extra_fields = {}
+                    self._extra_fields.update(result._extra_fields)
+                self._dirty = True
+            finally:
+                self._changed(oldKey)
 
     def copy(self):
-        return Result(
-            self.state, self.result, self.final, self.dirty, **self.extra_fields
-        )
+        result = Result.__new__(Result)
+        result._stateRank = self._stateRank
+        result._resultRank = self._resultRank
+        result._final = self._final
+        result._dirty = self._dirty
+        result._extra_fields = dict(self._extra_fields) if self._extra_fields else None
+        result._owner = None
+        return result
 
     def __eq__(self, other):
         if not isinstance(other, Result):
             raise NotImplementedError()
         return (
-            self.state == other.state and
-            self.result == other.result and
-            self.final == other.final
+            self._stateRank == other._stateRank and
+            self._resultRank == other._resultRank and
+            self._final == other._final
         )
 
     def __repr__(self):
         return f'<Result({self.state}, {self.result}, {self.final}>'
+
+class ResultSnapshot(Result):
+    """
+    Immutable and hashable copy of Result. Snapshots are meant to be shared by
+    multiple consumers, any attempt to change the snapshot raises
+    ReadOnlyChangeError. Use copy method to get mutable Result.
+
+    :param result: Result to be copied
+    :type result: Result
+    """
+    __slots__ = ()
+
+    def __init__(self, result):
+        self._stateRank = result._stateRank
+        self._resultRank = result._resultRank
+        self._final = result._final
+        self._dirty = result._dirty
+        self._extra_fields = MappingProxyType(dict(result._extra_fields)) if result._extra_fields else None
+        self._owner = None
+
+    def _readOnly(self, value=None):
+        raise ReadOnlyChangeError(f'Cannot change result snapshot: {self}')
+
+    stateRank = property(Result.stateRank.fget, _readOnly)
+    resultRank = property(Result.resultRank.fget, _readOnly)
+    final = property(Result.final.fget, _readOnly)
+    dirty = property(Result.dirty.fget, _readOnly)
+    state = property(Result.state.fget, _readOnly)
+    result = property(Result.result.fget, _readOnly)
+    update = _readOnly
+
+    def __hash__(self):
+        return hash((self._stateRank, self._resultRank, self._final))
@@ -0,0 +1,78 @@
+import unittest
+
+from . import Result, ResultSnapshot, STATES, RESULTS, STATE_NAMES, RESULT_NAMES
+from ..exceptions import StateChangeError, ReadOnlyChangeError
+
+
+class TestResult(unittest.TestCase):
+    def test_ranks(self):
+        for rank, state in enumerate(STATES):
+            result = Result(state)
+            self.assertEqual(result.stateRank, rank)
+            self.assertEqual(result.state, state)
+        for rank, result_name in enumerate(RESULTS):
+            result = Result('complete', result_name)
+            self.assertEqual(result.resultRank, rank)
+            self.assertEqual(result.result, result_name)
+        self.assertEqual(STATE_NAMES, tuple(STATES))
+        self.assertEqual(RESULT_NAMES, tuple(RESULTS))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            Result('foo')
+        with self.assertRaises(ValueError):
+            Result('running', 'foo')
+        result = Result('running')
+        with self.assertRaises(ValueError):
+            result.state = 'foo'
+        self.assertEqual(result.state, 'running')
+
+    def test_setters(self):
+        result = Result('running', 'PASS')
+        result.state = 'complete'
+        result.result = 'FAIL'
+        self.assertEqual(result.stateRank, STATE_NAMES.index('complete'))
+        self.assertEqual(result.resultRank, RESULT_NAMES.index('FAIL'))
+
+    def test_update(self):
+        result = Result('queued')
+        result.update(Result('running', 'FAIL'))
+        self.assertEqual(result, Result('running', 'FAIL'))
+        # the worse result is kept
+        result.update(Result('running', 'PASS'))
+        self.assertEqual(result, Result('running', 'FAIL'))
+        with self.assertRaises(StateChangeError):
+            result.update(Result('queued'))
+        result.update(Result('complete', 'ERROR', True))
+        self.assertEqual(result, Result('complete', 'ERROR', True))
+        with self.assertRaises(StateChangeError):
+            result.update(Result('complete', 'ERROR', True))
+
+    def test_copy(self):
+        result = Result('running', 'PASS', False, False, foo='bar')
+        result_copy = result.copy()
+        self.assertEqual(result_copy, result)
+        self.assertFalse(result_copy.dirty)
+        self.assertEqual(result_copy.extra_fields, {'foo': 'bar'})
+        self.assertIsNot(result_copy.extra_fields, result.extra_fields)
+
+    def test_snapshot(self):
+        result = Result('running', 'PASS', False, True, foo='bar')
+        snapshot = ResultSnapshot(result)
+        self.assertEqual(snapshot, result)
+        self.assertEqual(hash(snapshot), hash(ResultSnapshot(result)))
+        for attribute in ('state', 'result', 'final', 'dirty', 'stateRank'):
+            with self.assertRaises(ReadOnlyChangeError):
+                setattr(snapshot, attribute, getattr(result, attribute))
+        with self.assertRaises(ReadOnlyChangeError):
+            snapshot.update(Result('complete', 'PASS', True))
+        with self.assertRaises(TypeError):
+            snapshot.extra_fields['foo'] = 'baz'
+        # the snapshot is not affected by later changes of the result
+        result.update(Result('complete', 'FAIL', True, baz='qux'))
+        self.assertEqual(snapshot, Result('running', 'PASS', False))
+        self.assertEqual(snapshot.extra_fields, {'foo': 'bar'})
+        # copy provides mutable result
+        result_copy = snapshot.copy()
+        result_copy.state = 'complete'
+        self.assertEqual(result_copy.state, 'complete')
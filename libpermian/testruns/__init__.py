@@ -1,14 +1,29 @@
+import heapq
 import logging
+import queue
+import threading
+import time
 
-from ..exceptions import StateChangeError
+from ..exceptions import StateChangeError, NotReady
 from ..workflows.factory import WorkflowFactory
+from ..workflows.scheduler import WorkflowScheduler
+from ..workflows.executors import makeExecutor
 from ..reportsenders.factory import ReportSenderFactory
+from ..reportsenders.dispatcher import ReportSenderDispatcher
+from ..reportsenders.outbox import Outbox, resultFromData
 from ..issueanalyzer.proxy import IssueAnalyzerProxy
 from ..caserunconfiguration import CaseRunConfigurationsList
-from ..result import Result
+from ..result import Result, STATES
+from .columnar import ColumnarResultStore
 
 LOGGER = logging.getLogger(__name__)
 
+WAIT_POLL_INTERVAL = 5
+"""
+Seconds after which TestRuns.wait checks for ended workflows which didn't
+notify TestRuns about their end
+"""
+
 class TestRuns():
     """Collection of case-run-configurations based on the Test Plans, Requirements and Test Cases from tplib provided library.
 
@@ -19,12 +34,38 @@ class TestRuns():
         self.library = library
         self.event = event
         self.settings = settings
-        self.caseRunConfigurations = []
+        self.caseRunConfigurations = CaseRunConfigurationsList()
         self.issueAnalyzerProxy = IssueAnalyzerProxy(self.settings)
         """List of CaseRunConfigurations taking part in this execution"""
-        self.populateCaseRunConfigurations(library, event)
-        self.assignWorkflows(event, settings)
+        self._startedWorkflows = set()
+        self._earlyUpdates = None
+        self._earlyUpdatesLock = threading.Lock()
+        self._resultStore = None
+        self._finishedWorkflows = queue.Queue()
+        self._terminatedWorkflows = []
+        self._workflowsStartTimes = {}
+        self._newlyStartedWorkflows = queue.Queue()
+        self._startTime = None
+        self.scheduler = WorkflowScheduler(settings, self._runWorkflow)
+        """WorkflowScheduler starting the workflows within the configured limits"""
+        self.executor = None
+        """Executor running the workflows, see executor option in workflows section. It's created once the first workflow is started."""
+        self._executorLock = threading.Lock()
+        self.reportSenderDispatcher = ReportSenderDispatcher(settings.getint('reportSenders', 'dispatcher_workers'))
+        """Dispatcher driving the ReportSenders which are not rate limited"""
+        self.rateLimitedReportSenderDispatcher = ReportSenderDispatcher(settings.getint('reportSenders', 'rate_limited_dispatcher_workers'))
+        """Dispatcher driving the ReportSenders which may wait for rate limit, see BaseReportSender.rateLimited"""
+        self.outbox = None
+        """Outbox recording the reporting progress, see openOutbox"""
+        if settings.getboolean('library', 'streamCaseRunConfigurations'):
+            self.streamCaseRunConfigurations(library, event)
+        else:
+            self.populateCaseRunConfigurations(library, event)
+            self.assignWorkflows(event, settings)
         self.reportSenders = list(ReportSenderFactory.assign(self))
+        self._routes = self._routeReportSenders()
+        if self._earlyUpdates is not None:
+            self._resetReportSendersResults()
 
     def populateCaseRunConfigurations(self, library, event):
         """
@@ -42,8 +83,53 @@ class TestRuns():
         self.caseRunConfigurations = event.generate_caseRunConfigurations(library)
         for caserun in self.caseRunConfigurations:
             caserun.testrun = self
+            caserun.recordTransition()
             LOGGER.debug("Will run caseRunConfiguration %s: %s", caserun.id, caserun)
 
+    def streamCaseRunConfigurations(self, library, event):
+        """
+        Alternative to populateCaseRunConfigurations and assignWorkflows
+        which takes the caseRunConfigurations from event one testplan at a
+        time. Workflows which support incremental assignment (see
+        GroupedWorkflow.incrementalFactory) are assigned to the newly
+        generated caseRunConfigurations and started right away, other
+        workflows are assigned once all the caseRunConfigurations are
+        generated and they are started by the start method.
+
+        The same caseRunConfigurations generated for multiple testplans are
+        merged the same way as in populateCaseRunConfigurations.
+
+        Result updates provided by the already started workflows are
+        recorded and they're provided to ReportSenders once they're started.
+        """
+        LOGGER.debug("Streaming caseRunConfigurations from event")
+        self._earlyUpdates = []
+        for testplanCrcList in event.iter_caseRunConfigurations(library):
+            newCrcList = CaseRunConfigurationsList()
+            for caserun in testplanCrcList:
+                if caserun not in self.caseRunConfigurations:
+                    caserun.testrun = self
+                    caserun.recordTransition()
+                    newCrcList.append(caserun)
+                    LOGGER.debug("Will run caseRunConfiguration %s: %s", caserun.id, caserun)
+                self.caseRunConfigurations.append(caserun)
+            WorkflowFactory.assignIncrementally(self, newCrcList)
+            self._startWorkflows(crc for crc in newCrcList if crc.workflow is not None)
+        WorkflowFactory.assign(self, CaseRunConfigurationsList([
+            crc for crc in self.caseRunConfigurations if crc.workflow is None
+        ]))
+
+    def _resetReportSendersResults(self):
+        """
+        ReportSenders created when some workflows were already started have
+        copies of the caseRunConfigurations with results already updated.
+        Reset the results so that the ReportSenders start from the beginning
+        as the recorded updates are provided to them once they're started.
+        """
+        for reportSender in self.reportSenders:
+            for crc in reportSender.caseRunConfigurations:
+                crc.result = Result('not started')
+
     def assignWorkflows(self, event, settings):
         """
         Aggregate CaseRunConfiguration objects based on their workflows
@@ -75,13 +161,54 @@ class TestRuns():
         :return: None
         :rtype: None
         """
+        self._startTime = time.monotonic()
         for reportSender in self.reportSenders:
-            reportSender.start()
-        started_workflows = set()
-        for caserun in self.caseRunConfigurations:
-            if id(caserun.workflow) not in started_workflows:
-                caserun.workflow.start()
-                started_workflows.add(id(caserun.workflow))
+            self._startReportSender(reportSender)
+        if self._earlyUpdates is not None:
+            with self._earlyUpdatesLock:
+                for crcUpdate in self._earlyUpdates:
+                    if isinstance(crcUpdate, list):
+                        self._sendBatch(crcUpdate)
+                    else:
+                        self._sendUpdate(crcUpdate)
+                self._earlyUpdates = None
+        self._startWorkflows(self.caseRunConfigurations)
+
+    def _startWorkflows(self, caseRunConfigurations):
+        """
+        Submit workflows of the caseRunConfigurations which were not started
+        yet to the scheduler.
+        """
+        for caserun in caseRunConfigurations:
+            if id(caserun.workflow) not in self._startedWorkflows:
+                self._startedWorkflows.add(id(caserun.workflow))
+                self.scheduler.submit(caserun.workflow, caserun.testcase.execution.type)
+
+    def _workflowExecutor(self):
+        """
+        Provide the executor running the workflows creating it if needed so
+        that no executor resources (e.g. worker processes) are allocated when
+        no workflow is started (e.g. when only the reporting is resumed).
+        """
+        with self._executorLock:
+            if self.executor is None:
+                self.executor = makeExecutor(self)
+            return self.executor
+
+    def _shutdownExecutor(self):
+        with self._executorLock:
+            if self.executor is not None:
+                self.executor.shutdown()
+
+    def _runWorkflow(self, workflow):
+        """
+        Actually start the workflow, called by the scheduler.
+        """
+        self._workflowsStartTimes[id(workflow)] = time.monotonic()
+        workflow.start(self._workflowExecutor())
+        self._newlyStartedWorkflows.put(id(workflow))
+        # wake up wait so that the workflow timeout is considered
+        self._finishedWorkflows.put(None)
 
     def wait(self):
         """
@@ -89,50 +216,394 @@ class TestRuns():
         called after all workflows are finished, nothing should happen and no
         blocking should occur.
 
+        Workflows are handled in the order in which they finish (see
+        workflowFinished), caseRunConfigurations of a finished workflow
+        which don't have final result are immediately marked as DNF. When a
+        workflow reaches its timeout or the execution deadline is reached
+        (see the timeout and deadline options in the workflows section),
+        termination of the workflow is requested and its caseRunConfigurations
+        without final result are marked as DNF without waiting for the
+        workflow. Workflows which are still queued are bound only by the
+        execution deadline, they are removed from the queue once it's reached.
+        Once the reporting is done, the terminated workflows are given
+        termination_grace seconds to end, see _joinTerminatedWorkflows.
+
         :raises NotReady: When start method was not invoked yet.
         :return: True if all report senders finished without issue
         :rtype: bool
         """
+        pending = {}
         for caserun in self.caseRunConfigurations:
-            caserun.workflow.join()
-            if not caserun.result.final:
-                # copy is needed here, so that the final result is not stored
-                # in the crc before self.update is called.
-                self.update(caserun.copy().updateResult(Result('DNF', 'ERROR', True)))
+            if id(caserun.workflow) not in self._startedWorkflows:
+                raise NotReady('Workflows were not started yet')
+            pending.setdefault(id(caserun.workflow), (caserun.workflow, []))[1].append(caserun)
+        deadlines = [
+            (deadline, key)
+            for key, (workflow, caseruns) in pending.items()
+            for deadline in [self._workflowDeadline(key, caseruns)]
+            if deadline is not None
+        ]
+        heapq.heapify(deadlines)
+        for key, (workflow, caseruns) in list(pending.items()):
+            # workflows which have already ended
+            if workflow.started and not workflow.is_alive():
+                del pending[key]
+                self._finalizeCaseRuns(caseruns)
+        while pending:
+            # deadlines of workflows started by the scheduler in the meantime
+            while not self._newlyStartedWorkflows.empty():
+                key = self._newlyStartedWorkflows.get()
+                if key in pending:
+                    deadline = self._workflowDeadline(key, pending[key][1])
+                    if deadline is not None:
+                        heapq.heappush(deadlines, (deadline, key))
+            timeout = WAIT_POLL_INTERVAL
+            if deadlines:
+                timeout = max(min(timeout, deadlines[0][0] - time.monotonic()), 0)
+            try:
+                finished = [self._finishedWorkflows.get(timeout=timeout)]
+            except queue.Empty:
+                # fallback for workflows which didn't notify about their end
+                finished = [
+                    workflow
+                    for workflow, _ in pending.values()
+                    if workflow.started and not workflow.is_alive()
+                ]
+            for workflow in finished:
+                if workflow is None:
+                    continue
+                self.scheduler.workflowFinished(workflow)
+                try:
+                    _, caseruns = pending.pop(id(workflow))
+                except KeyError:
+                    continue
+                workflow.join()
+                self._finalizeCaseRuns(caseruns)
+            while deadlines and deadlines[0][0] <= time.monotonic():
+                _, key = heapq.heappop(deadlines)
+                try:
+                    workflow, caseruns = pending.pop(key)
+                except KeyError:
+                    continue
+                self._workflowTimedOut(workflow, caseruns)
+        all_ok = self._joinReportSenders(self.reportSenders)
+        self._joinTerminatedWorkflows()
+        self._shutdownExecutor()
+        return all_ok
+
+    def _startReportSender(self, reportSender):
+        if reportSender.rateLimited:
+            reportSender.start(self.rateLimitedReportSenderDispatcher)
+        else:
+            reportSender.start(self.reportSenderDispatcher)
+
+    def _joinReportSenders(self, reportSenders):
+        """
+        Wait for the ReportSenders to finish and release the reporting
+        resources.
+
+        :return: True if none of the ReportSenders failed
+        :rtype: bool
+        """
         all_ok = True
-        for reportSender in self.reportSenders:
-            reportSender.join()
+        for reportSender in reportSenders:
+            try:
+                reportSender.join()
+            except Exception:
+                # the failure was already logged and the exception dumped
+                all_ok = False
             if reportSender.exception:
                 all_ok = False
+        self.reportSenderDispatcher.shutdown()
+        self.rateLimitedReportSenderDispatcher.shutdown()
+        if self.outbox is not None:
+            self.outbox.close()
         return all_ok
 
+    def openOutbox(self, path, append=False):
+        """
+        Start recording the accepted updates and the results delivered by
+        ReportSenders to the outbox so that the reporting can be resumed
+        if the pipeline dies, see resumeReporting.
+
+        :param path: Path to the outbox file
+        :type path: str
+        :param append: Append to existing outbox instead of starting new one
+        :type append: bool
+        :return: The opened outbox
+        :rtype: libpermian.reportsenders.outbox.Outbox
+        """
+        self.outbox = Outbox(path, self.settings.getfloat('reportSenders', 'outbox_sync_interval'), append)
+        for index, reportSender in enumerate(self.reportSenders):
+            reportSender.outbox = self.outbox
+            reportSender.outboxKey = f'{index}:{reportSender.testplan.name}:{reportSender.reporting.type}'
+        return self.outbox
+
+    def resumeReporting(self, outboxState):
+        """
+        Resume reporting recorded in the outbox without executing any
+        workflow. The caseRunConfigurations get the latest results recorded
+        in the outbox, ReportSenders which already finished are not started
+        at all and the other ReportSenders get only the results they haven't
+        delivered yet (the delivered ones are restored without processing).
+        CaseRunConfigurations which didn't get final result are marked as
+        DNF as there's nothing which would provide the final result.
+
+        The outbox should be opened (in append mode) before calling this
+        method so that the resumed reporting is recorded as well.
+
+        :param outboxState: State of the reporting read from the outbox
+        :type outboxState: libpermian.reportsenders.outbox.OutboxState
+        :return: True if none of the ReportSenders failed
+        :rtype: bool
+        """
+        updates = {}
+        for crcId, record in outboxState.updates.items():
+            caserun = self.caseRunConfigurations.get(crcId)
+            if caserun is None:
+                LOGGER.warning("CaseRunConfiguration %s recorded in outbox doesn't exist", crcId)
+                continue
+            caserun.updateResult(resultFromData(record['result']))
+            for name, logPath in record['logs'].items():
+                if name not in caserun.logs:
+                    caserun.addLog(name, logPath)
+            updates[crcId] = caserun.snapshot()
+        resumed = []
+        for reportSender in self.reportSenders:
+            if reportSender.outboxKey in outboxState.finished:
+                LOGGER.debug("'%s' already finished the reporting", reportSender)
+                continue
+            for crc in reportSender.caseRunConfigurations:
+                crcUpdate = updates.get(crc.id)
+                if crcUpdate is None:
+                    continue
+                if outboxState.isDelivered(reportSender.outboxKey, crc.id):
+                    reportSender.restoreResult(crcUpdate)
+                else:
+                    reportSender.resultUpdate(crcUpdate)
+            self._startReportSender(reportSender)
+            resumed.append(reportSender)
+        LOGGER.info('Resuming reporting of %d (out of %d) ReportSenders', len(resumed), len(self.reportSenders))
+        self._routes = self._routeReportSenders(resumed)
+        self._finalizeCaseRuns(self.caseRunConfigurations)
+        all_ok = self._joinReportSenders(resumed)
+        self._shutdownExecutor()
+        return all_ok
+
+    def workflowFinished(self, workflow):
+        """
+        Notify TestRuns that the workflow has ended. This is called by the
+        workflow from its thread at the very end of its execution.
+        """
+        self.scheduler.workflowFinished(workflow)
+        self._finishedWorkflows.put(workflow)
+
+    def _workflowDeadline(self, workflowKey, caseruns):
+        """
+        Time (in time.monotonic terms) after which the workflow should not be
+        waited for anymore based on the timeouts of its workflow types and the
+        execution deadline.
+
+        :return: Deadline of the workflow or None if there's no deadline
+        :rtype: float or None
+        """
+        deadlines = []
+        startTime = self._workflowsStartTimes.get(workflowKey)
+        if startTime is not None:
+            for workflowType in {caserun.testcase.execution.type for caserun in caseruns}:
+                timeout = self.settings.getfloat([f'workflow-{workflowType}', 'workflows'], 'timeout')
+                if timeout:
+                    deadlines.append(startTime + timeout)
+        deadline = self.settings.getfloat('workflows', 'deadline')
+        if deadline and self._startTime is not None:
+            deadlines.append(self._startTime + deadline)
+        return min(deadlines, default=None)
+
+    def _workflowTimedOut(self, workflow, caseruns):
+        """
+        Request termination of the workflow which exceeded its deadline and
+        mark its caseRunConfigurations without final result as DNF.
+        """
+        if self.scheduler.cancel(workflow):
+            LOGGER.error("Workflow '%s' exceeded the deadline before it was started", workflow)
+        else:
+            LOGGER.error("Workflow '%s' exceeded its timeout, terminating it", workflow)
+            try:
+                workflow.requestTermination(workflow.crcList.ids)
+            except Exception as e:
+                LOGGER.error("Termination of workflow '%s' failed: %s", workflow, e)
+            # don't let the workflow block queued workflows
+            self.scheduler.workflowFinished(workflow)
+            self._terminatedWorkflows.append((workflow, time.monotonic()))
+        self._finalizeCaseRuns(caseruns)
+
+    def _joinTerminatedWorkflows(self):
+        """
+        Wait up to termination_grace seconds (since the termination was
+        requested) for the workflows terminated after exceeding their
+        deadline. Workflows still running after that are reported, note that
+        the pipeline process can't exit until they end as the workflow
+        threads can't be killed.
+
+        :return: Workflows which are still running
+        :rtype: list
+        """
+        grace = self.settings.getfloat('workflows', 'termination_grace')
+        stillRunning = []
+        for workflow, terminatedAt in self._terminatedWorkflows:
+            workflow.join(max(terminatedAt + grace - time.monotonic(), 0))
+            if workflow.is_alive():
+                LOGGER.error("Workflow '%s' is still running %.0f seconds after its termination was requested", workflow, grace)
+                stillRunning.append(workflow)
+        return stillRunning
+
+    def _finalizeCaseRuns(self, caseruns):
+        """
+        Mark caseruns which don't have final result as DNF.
+        """
+        for caserun in caseruns:
+            if not caserun.result.final:
+                # snapshot with the final result is provided, so that the
+                # final result is not stored in the crc before self.update
+                # is called.
+                self.update(caserun.snapshot(Result('DNF', 'ERROR', True)))
+
     def update(self, crc):
         """
         Register update in crc provided by workflow and if the update is valid,
-        provide it to ReportSenders.
+        provide it to ReportSenders. All the ReportSenders share the same
+        immutable snapshot of the updated caseRunConfiguration.
+
+        Change of the state is recorded in the caseRunConfiguration timeline.
+        """
+        crcUpdate = self._registerUpdate(crc)
+        if crcUpdate is None:
+            return
+        if not self._keepEarlyUpdate(crcUpdate):
+            self._sendUpdate(crcUpdate)
+
+    def updateBatch(self, crcs):
+        """
+        Batch variant of update, register updates of multiple crcs and
+        provide the valid ones to ReportSenders so that each ReportSender gets
+        only one batch containing the updates relevant to it (see
+        BaseReportSender.resultBatchUpdate).
+        """
+        crcUpdates = []
+        for crc in crcs:
+            crcUpdate = self._registerUpdate(crc)
+            if crcUpdate is not None:
+                crcUpdates.append(crcUpdate)
+        if crcUpdates and not self._keepEarlyUpdate(crcUpdates):
+            self._sendBatch(crcUpdates)
+
+    def _registerUpdate(self, crc):
+        """
+        Update result of the caseRunConfiguration based on the crc.
+
+        :return: Snapshot of the updated caseRunConfiguration or None if the update is not valid
+        :rtype: CaseRunConfigurationSnapshot or None
         """
+        caserun = self.caseRunConfigurations[crc.id]
+        stateRank = caserun.result.stateRank
         try:
-            crcUpdate = self.caseRunConfigurations[crc.id].updateResult(crc.result).readOnlyCopy()
+            caserun.updateResult(crc.result)
         except StateChangeError as e:
             LOGGER.error('Cannot change state of result: %s', e)
-            return
-        for reportSender in self.reportSenders:
+            return None
+        if caserun.result.stateRank != stateRank:
+            caserun.recordTransition()
+        crcUpdate = caserun.snapshot()
+        if self.outbox is not None:
+            self.outbox.recordUpdate(crcUpdate)
+        return crcUpdate
+
+    def _keepEarlyUpdate(self, crcUpdate):
+        """
+        Keep the update (snapshot or list of snapshots) for the ReportSenders
+        if they are not started yet.
+
+        :return: True if the update was kept and it should not be sent now
+        :rtype: bool
+        """
+        if self._earlyUpdates is not None:
+            with self._earlyUpdatesLock:
+                # ReportSenders are not started yet, keep the update for them
+                if self._earlyUpdates is not None:
+                    self._earlyUpdates.append(crcUpdate)
+                    return True
+        return False
+
+    def _routeReportSenders(self, reportSenders=None):
+        """
+        Build routing table mapping caseRunConfiguration ids to ReportSenders
+        which hold the caseRunConfiguration so that updates are provided
+        only to the ReportSenders interested in them.
+
+        :param reportSenders: ReportSenders to be routed to, all by default
+        :type reportSenders: list, optional
+        :return: Mapping of caseRunConfiguration ids to lists of ReportSenders
+        :rtype: dict
+        """
+        routes = {}
+        for reportSender in (self.reportSenders if reportSenders is None else reportSenders):
+            for crc in reportSender.caseRunConfigurations:
+                routes.setdefault(crc.id, []).append(reportSender)
+        return routes
+
+    def _sendUpdate(self, crcUpdate):
+        for reportSender in self._routes.get(crcUpdate.id, ()):
             reportSender.resultUpdate(crcUpdate)
 
-    # TODO: consider using functools.lru_cache or functools.cached_property
+    def _sendBatch(self, crcUpdates):
+        batches = {}
+        for crcUpdate in crcUpdates:
+            for reportSender in self._routes.get(crcUpdate.id, ()):
+                batches.setdefault(id(reportSender), (reportSender, []))[1].append(crcUpdate)
+        for reportSender, batch in batches.values():
+            reportSender.resultBatchUpdate(batch)
+
+    def timelineSummary(self):
+        """
+        Summary of time spent by caseRunConfigurations in individual states
+        based on their timelines.
+
+        :return: Mapping of states (in order of STATES) to (count, total seconds, max seconds) tuples
+        :rtype: dict
+        """
+        durations = {}
+        for caserun in self.caseRunConfigurations:
+            for state, duration in caserun.phaseDurations():
+                durations.setdefault(state, []).append(duration)
+        return {
+            state: (len(durations[state]), sum(durations[state]), max(durations[state]))
+            for state in STATES
+            if state in durations
+        }
+
+    @property
+    def resultStore(self):
+        """
+        ColumnarResultStore of the caseRunConfigurations providing aggregated
+        counts of states and results. The store is created once it's needed
+        and it's kept up to date with the results, it's expected to be used
+        once all the caseRunConfigurations are generated.
+        """
+        if self._resultStore is None:
+            self._resultStore = ColumnarResultStore(self.caseRunConfigurations)
+        return self._resultStore
+
     @property
     def testPlansMapping(self):
         """
         Mapping of testPlans to caseRunConfigurations. The keys are TestPlan
         ids and values are caseRunConfigurations which belong to the TestPlan.
+        The grouping is cached by the caseRunConfigurations list.
         """
         return self.caseRunConfigurations.by_testplan()
 
     def __getitem__(self, crcId):
-        for crc in self.caseRunConfigurations:
-            if crc.id == crcId:
-                return crc
-        raise KeyError(f'No caseRunConfiguration of id "{crcId}" found.')
+        return self.caseRunConfigurations[crcId]
 
     def __iter__(self):
         for crc in self.caseRunConfigurations:
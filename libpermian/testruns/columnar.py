@@ -0,0 +1,202 @@
+import threading
+from array import array
+from collections import Counter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from ..result import STATE_NAMES, RESULT_NAMES, resultLock
+
+COLUMNS = {
+    'state': STATE_NAMES,
+    'result': RESULT_NAMES,
+    'final': (False, True),
+}
+"""Names of the columns which can be counted mapped to names of their values"""
+
+class ColumnarResultStore():
+    """
+    Store keeping states, results and final flags of caseRunConfigurations in
+    contiguous arrays indexed by slot of the caseRunConfiguration (its
+    position in the store) so that aggregations over the whole run don't
+    have to iterate over the caseRunConfiguration objects.
+
+    The store observes the caseRunConfigurations and the arrays are updated
+    whenever result of some of the caseRunConfigurations changes (guarded by
+    lock of the store). Codes of
+    configuration values (for grouping by configuration key) and testplan
+    membership masks are computed once they're needed for the first time.
+
+    If numpy is available, the counting is done by numpy.bincount directly on
+    the arrays, otherwise plain python counting is used.
+
+    :param caseRunConfigurations: CaseRunConfigurations to be stored
+    :type caseRunConfigurations: iterable of CaseRunConfiguration
+    """
+    def __init__(self, caseRunConfigurations=()):
+        self._slots = {}
+        self._crcs = []
+        self._columns = {column: array('B') for column in COLUMNS}
+        self._configurationCodes = {}
+        self._testplanMasks = None
+        self._lock = threading.RLock()
+        for crc in caseRunConfigurations:
+            self.add(crc)
+
+    def add(self, crc):
+        """
+        Add caseRunConfiguration to the store and start observing it.
+        """
+        with resultLock(crc):
+            with self._lock:
+                if crc in self._slots:
+                    return
+                self._slots[crc] = len(self._crcs)
+                self._crcs.append(crc)
+                stateRank, resultRank, final, _ = crc.result.key
+                self._columns['state'].append(stateRank)
+                self._columns['result'].append(resultRank)
+                self._columns['final'].append(bool(final))
+                self._configurationCodes = {}
+                self._testplanMasks = None
+            crc._addObserver(self)
+
+    def __len__(self):
+        return len(self._crcs)
+
+    def _memberResultChanged(self, crc, oldKey, newKey):
+        """
+        Called by observed caseRunConfiguration when its result is changed.
+        """
+        with self._lock:
+            slot = self._slots[crc]
+            stateRank, resultRank, final, _ = newKey
+            self._columns['state'][slot] = stateRank
+            self._columns['result'][slot] = resultRank
+            self._columns['final'][slot] = bool(final)
+
+    def _memberRunningForChanged(self, crc):
+        """
+        Called by observed caseRunConfiguration when its running_for is changed.
+        """
+        self._testplanMasks = None
+
+    def _configurationGroups(self, key):
+        """
+        Codes of values of configuration key for each slot along with the
+        values corresponding to the codes.
+        """
+        try:
+            return self._configurationCodes[key]
+        except KeyError:
+            pass
+        values = []
+        valueCodes = {}
+        codes = array('I')
+        for crc in self._crcs:
+            value = crc.configuration.get(key)
+            try:
+                code = valueCodes[value]
+            except KeyError:
+                code = valueCodes[value] = len(values)
+                values.append(value)
+            codes.append(code)
+        self._configurationCodes[key] = codes, values
+        return codes, values
+
+    def _testplanGroups(self):
+        """
+        Mapping of testplan ids to masks (one byte per slot) of
+        caseRunConfigurations which are running for the testplan.
+        """
+        masks = self._testplanMasks
+        if masks is None:
+            masks = {}
+            for slot, crc in enumerate(self._crcs):
+                for testplan in crc.running_for:
+                    try:
+                        mask = masks[testplan]
+                    except KeyError:
+                        mask = masks[testplan] = bytearray(len(self._crcs))
+                    mask[slot] = 1
+            self._testplanMasks = masks
+        return masks
+
+    def _count(self, column, mask=None):
+        """
+        Count occurrences of the individual values in column (optionally only
+        in slots selected by mask).
+
+        :return: List of counts indexed by the value rank
+        :rtype: list
+        """
+        width = len(COLUMNS[column])
+        values = self._columns[column]
+        if numpy is not None:
+            values = numpy.frombuffer(values, dtype=numpy.uint8)
+            if mask is not None:
+                values = values[numpy.frombuffer(mask, dtype=numpy.bool_)]
+            return numpy.bincount(values, minlength=width).tolist()
+        if mask is not None:
+            values = [value for value, selected in zip(values, mask) if selected]
+        counter = Counter(values)
+        return [counter[rank] for rank in range(width)]
+
+    def _countGrouped(self, column, codes, groups):
+        """
+        Count occurrences of the individual values in column for each group
+        where codes are group indexes for each slot.
+
+        :return: List of counts lists (indexed by the value rank) for each group
+        :rtype: list
+        """
+        width = len(COLUMNS[column])
+        values = self._columns[column]
+        if numpy is not None:
+            combined = (
+                numpy.frombuffer(codes, dtype=numpy.uint32).astype(numpy.intp) * width
+                + numpy.frombuffer(values, dtype=numpy.uint8)
+            )
+            counts = numpy.bincount(combined, minlength=len(groups) * width)
+            return counts.reshape(len(groups), width).tolist()
+        counter = Counter(zip(codes, values))
+        return [
+            [counter[(code, rank)] for rank in range(width)]
+            for code in range(len(groups))
+        ]
+
+    def counts(self, column='result', groupBy=None):
+        """
+        Count caseRunConfigurations by value of column, optionally for each
+        group separately.
+
+        :param column: Which column to count, one of 'state', 'result' or 'final'
+        :type column: str
+        :param groupBy: None for no grouping, 'testplan' for grouping by testplans or configuration key
+        :type groupBy: str, optional
+        :return: Mapping of values to counts, if groupBy is used, mapping of groups to such mappings
+        :rtype: dict
+        """
+        names = COLUMNS[column]
+        with self._lock:
+            if groupBy is None:
+                return dict(zip(names, self._count(column)))
+            if groupBy == 'testplan':
+                return {
+                    testplan: dict(zip(names, self._count(column, mask)))
+                    for testplan, mask in self._testplanGroups().items()
+                }
+            codes, groups = self._configurationGroups(groupBy)
+            return {
+                group: dict(zip(names, groupCounts))
+                for group, groupCounts in zip(groups, self._countGrouped(column, codes, groups))
+            }
+
+    @property
+    def percentComplete(self):
+        """Percentage of caseRunConfigurations with final result"""
+        if not self._crcs:
+            return 100.0
+        return 100.0 * self.counts('final')[True] / len(self._crcs)
@@ -0,0 +1,97 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from libpermian.caserunconfiguration import CaseRunConfiguration
+from libpermian.result import Result
+from libpermian.testruns import columnar
+from libpermian.testruns.columnar import ColumnarResultStore
+
+
+class DummyTestCase():
+    def __init__(self, name):
+        self.name = name
+        self.id = name
+        self.execution = MagicMock()
+
+
+class DummyTestPlan():
+    def __init__(self, name):
+        self.name = name
+        self.id = name
+
+
+class TestColumnarResultStore(unittest.TestCase):
+    def setUp(self):
+        planA = DummyTestPlan('A')
+        planB = DummyTestPlan('B')
+        self.crcs = [
+            CaseRunConfiguration(DummyTestCase('testcase1'), {'arch': 'x86_64'}, [planA]),
+            CaseRunConfiguration(DummyTestCase('testcase1'), {'arch': 's390x'}, [planA, planB]),
+            CaseRunConfiguration(DummyTestCase('testcase2'), {'arch': 'x86_64'}, [planB]),
+            CaseRunConfiguration(DummyTestCase('testcase3'), {}, [planB]),
+        ]
+        self.crcs[0].updateResult(Result('complete', 'PASS', True))
+        self.crcs[1].updateResult(Result('running', 'FAIL'))
+        self.store = ColumnarResultStore(self.crcs)
+
+    def check_counts(self):
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(
+            self.store.counts(),
+            {None: 2, 'PASS': 1, 'FAIL': 1, 'ERROR': 0},
+        )
+        self.assertEqual(self.store.counts('state')['not started'], 2)
+        self.assertEqual(self.store.counts('final'), {False: 3, True: 1})
+        self.assertEqual(self.store.percentComplete, 25.0)
+        self.assertEqual(
+            self.store.counts('final', 'testplan'),
+            {'A': {False: 1, True: 1}, 'B': {False: 3, True: 0}},
+        )
+        self.assertEqual(
+            self.store.counts('result', 'arch'),
+            {
+                'x86_64': {None: 1, 'PASS': 1, 'FAIL': 0, 'ERROR': 0},
+                's390x': {None: 0, 'PASS': 0, 'FAIL': 1, 'ERROR': 0},
+                None: {None: 1, 'PASS': 0, 'FAIL': 0, 'ERROR': 0},
+            },
+        )
+
+    def test_counts(self):
+        self.check_counts()
+
+    @patch.object(columnar, 'numpy', None)
+    def test_counts_without_numpy(self):
+        self.check_counts()
+
+    @unittest.skipUnless(columnar.numpy, 'numpy is not available')
+    def test_counts_numpy_matches_fallback(self):
+        for crc in self.crcs:
+            crc.running_for = {**crc.running_for, 'C': True}
+        queries = [(column, groupBy)
+                   for column in columnar.COLUMNS
+                   for groupBy in (None, 'testplan', 'arch')]
+        expected = [self.store.counts(*query) for query in queries]
+        with patch.object(columnar, 'numpy', None):
+            self.assertEqual([self.store.counts(*query) for query in queries], expected)
+
+    def test_result_changes(self):
+        self.crcs[2].updateResult(Result('complete', 'ERROR', True))
+        self.crcs[1].result = Result('DNF', 'ERROR', True)
+        self.assertEqual(self.store.counts('final'), {False: 1, True: 3})
+        self.assertEqual(self.store.counts()['ERROR'], 2)
+        self.assertEqual(self.store.counts('state')['DNF'], 1)
+
+    def test_running_for_changes(self):
+        self.assertEqual(sum(self.store.counts('final', 'testplan')['A'].values()), 2)
+        self.crcs[3].running_for = {'A': True}
+        self.assertEqual(sum(self.store.counts('final', 'testplan')['A'].values()), 3)
+        self.assertEqual(sum(self.store.counts('final', 'testplan')['B'].values()), 2)
+
+    def test_add(self):
+        crc = CaseRunConfiguration(DummyTestCase('testcase4'), {'arch': 'aarch64'}, [DummyTestPlan('C')])
+        self.store.counts('result', 'arch')
+        self.store.add(crc)
+        self.store.add(crc)
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual(self.store.counts('result', 'arch')['aarch64'][None], 1)
+        self.assertIn('C', self.store.counts('result', 'testplan'))
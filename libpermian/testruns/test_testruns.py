@@ -1,4 +1,8 @@
+import os
+import tempfile
+import threading
 import unittest
+from unittest.mock import MagicMock
 from tplib import library
 from libpermian.settings import Settings
 from libpermian.events.base import Event
@@ -7,6 +11,7 @@ from libpermian.workflows.isolated import IsolatedWorkflow, GroupedWorkflow
 from libpermian.workflows.builtin import UnknownWorkflow, ManualWorkflow
 from libpermian.testruns import TestRuns
 from libpermian.result import Result
+from libpermian.reportsenders.outbox import Outbox, OutboxState
 
 
 class TestWorkflowIsolated(IsolatedWorkflow):
@@ -137,3 +142,230 @@ class TestAssignWorkflows2(unittest.TestCase):
         self.assertIsInstance(workflow3, TestWorkflowGrouped)
         self.assertEqual(workflow1, workflow2)
         self.assertNotEqual(workflow2, workflow3)
+
+
+class TestWorkflowSlow(TestWorkflowIsolated):
+    stop = threading.Event()
+
+    def execute(self):
+        self.stop.wait(10)
+
+    def terminate(self):
+        self.stop.set()
+        return True
+
+
+class TestWaitTimeout(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        WorkflowFactory.clear_workflow_classes()
+        WorkflowFactory.register('test_isolated')(TestWorkflowSlow)
+        WorkflowFactory.register('test_grouped')(TestWorkflowGroupedAll)
+
+    @classmethod
+    def tearDownClass(cls):
+        WorkflowFactory.restore_workflow_classes()
+
+    def test_timeout(self):
+        lib = library.Library('tests/test_library')
+        settings = Settings(cmdline_overrides={'library': {'defaultCaseConfigMergeMethod': 'extension'}, 'workflow-test_isolated': {'timeout': '0.1'}}, environment={}, settings_locations=[])
+        event = Event(settings, 'test', other={'tests': ['test_workflows']})
+        testruns = TestRuns(lib, event, settings)
+        for reportSender in testruns.reportSenders:
+            reportSender.start = MagicMock()
+            reportSender.join = MagicMock()
+            reportSender.exception = None
+        testruns.start()
+        self.assertTrue(testruns.wait())
+        self.assertTrue(TestWorkflowSlow.stop.is_set())
+        for caserun in testruns.caseRunConfigurations:
+            if caserun.testcase.name.startswith('test_isolated'):
+                self.assertEqual(caserun.result, Result('DNF', 'ERROR', True))
+
+
+class TestWorkflowStuck(TestWorkflowIsolated):
+    release = threading.Event()
+
+    def execute(self):
+        self.release.wait(10)
+
+    def terminate(self):
+        # ignore the termination request
+        return True
+
+
+class TestWaitDeadline(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        WorkflowFactory.clear_workflow_classes()
+        WorkflowFactory.register('test_isolated')(TestWorkflowStuck)
+        WorkflowFactory.register('test_grouped')(TestWorkflowGroupedAll)
+
+    @classmethod
+    def tearDownClass(cls):
+        TestWorkflowStuck.release.set()
+        WorkflowFactory.restore_workflow_classes()
+
+    def test_queued_deadline(self):
+        lib = library.Library('tests/test_library')
+        settings = Settings(cmdline_overrides={
+            'library': {'defaultCaseConfigMergeMethod': 'extension'},
+            'workflows': {'deadline': '0.2', 'termination_grace': '0.1'},
+            'workflow-test_isolated': {'max_running': '1'},
+        }, environment={}, settings_locations=[])
+        event = Event(settings, 'test', other={'tests': ['test_workflows']})
+        testruns = TestRuns(lib, event, settings)
+        for reportSender in testruns.reportSenders:
+            reportSender.start = MagicMock()
+            reportSender.join = MagicMock()
+            reportSender.exception = None
+        testruns.start()
+        with self.assertLogs('libpermian.testruns', 'ERROR') as logs:
+            self.assertTrue(testruns.wait())
+        workflows = {
+            id(caserun.workflow): caserun.workflow
+            for caserun in testruns.caseRunConfigurations
+            if caserun.testcase.name.startswith('test_isolated')
+        }.values()
+        # one workflow was running (and ignored the termination), the
+        # others were still queued when the deadline was reached
+        self.assertEqual(len([workflow for workflow in workflows if workflow.started]), 1)
+        self.assertTrue(any('before it was started' in message for message in logs.output))
+        self.assertTrue(any('is still running' in message for message in logs.output))
+        for caserun in testruns.caseRunConfigurations:
+            if caserun.testcase.name.startswith('test_isolated'):
+                self.assertEqual(caserun.result, Result('DNF', 'ERROR', True))
+
+
+class TestUpdateRouting(unittest.TestCase):
+    def setUp(self):
+        self.testruns = testruns_init()
+        self.crcs = list(self.testruns.caseRunConfigurations)
+        self.sender1 = MagicMock()
+        self.sender1.caseRunConfigurations = self.crcs[:2]
+        self.sender2 = MagicMock()
+        self.sender2.caseRunConfigurations = self.crcs[1:3]
+        self.testruns.reportSenders = [self.sender1, self.sender2]
+        self.testruns._routes = self.testruns._routeReportSenders()
+
+    def test_routes(self):
+        self.assertEqual(self.testruns._routes[self.crcs[0].id], [self.sender1])
+        self.assertEqual(self.testruns._routes[self.crcs[1].id], [self.sender1, self.sender2])
+        self.assertNotIn(self.crcs[3].id, self.testruns._routes)
+
+    def test_update_subscribers_only(self):
+        crc = self.crcs[2].snapshot(Result('started'))
+        self.testruns.update(crc)
+        self.sender1.resultUpdate.assert_not_called()
+        self.sender2.resultUpdate.assert_called_once()
+        self.assertEqual(self.sender2.resultUpdate.call_args.args[0].id, crc.id)
+
+    def test_update_batch(self):
+        self.testruns.updateBatch([crc.snapshot(Result('started')) for crc in self.crcs[1:4]])
+        self.sender1.resultBatchUpdate.assert_called_once()
+        self.sender2.resultBatchUpdate.assert_called_once()
+        self.assertEqual([crc.id for crc in self.sender1.resultBatchUpdate.call_args.args[0]], [self.crcs[1].id])
+        self.assertEqual([crc.id for crc in self.sender2.resultBatchUpdate.call_args.args[0]], [self.crcs[1].id, self.crcs[2].id])
+        self.sender1.resultUpdate.assert_not_called()
+
+
+class TestResumeReporting(unittest.TestCase):
+    def setUp(self):
+        self.testruns = testruns_init()
+        self.crcs = list(self.testruns.caseRunConfigurations)
+        self.sender1 = MagicMock(outboxKey='0:sender1', exception=None)
+        self.sender1.caseRunConfigurations = self.crcs[:3]
+        self.sender2 = MagicMock(outboxKey='1:sender2', exception=None)
+        self.sender2.caseRunConfigurations = self.crcs[1:3]
+        self.testruns.reportSenders = [self.sender1, self.sender2]
+        fd, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_resume(self):
+        outbox = Outbox(self.path)
+        outbox.recordHeader('{}', [], {})
+        outbox.recordUpdate(self.crcs[0].snapshot(Result('complete', 'PASS', True)))
+        outbox.recordUpdate(self.crcs[1].snapshot(Result('running')))
+        outbox.recordDelivered('0:sender1', self.crcs[0].snapshot(Result('complete', 'PASS', True)))
+        outbox.recordFinished('1:sender2')
+        outbox.close()
+
+        self.testruns.openOutbox(self.path, append=True)
+        self.assertTrue(self.testruns.resumeReporting(OutboxState(self.path)))
+        self.assertEqual(self.crcs[0].result, Result('complete', 'PASS', True))
+        self.assertTrue(all(crc.result.final for crc in self.crcs))
+        # already finished ReportSender is not started at all
+        self.sender2.start.assert_not_called()
+        self.sender2.resultUpdate.assert_not_called()
+        self.sender1.start.assert_called_once()
+        self.sender1.restoreResult.assert_called_once()
+        self.assertEqual(self.sender1.restoreResult.call_args.args[0].id, self.crcs[0].id)
+        updates = [(call.args[0].id, call.args[0].result) for call in self.sender1.resultUpdate.call_args_list]
+        self.assertEqual(updates, [
+            (self.crcs[1].id, Result('running')),
+            (self.crcs[1].id, Result('DNF', 'ERROR', True)),
+            (self.crcs[2].id, Result('DNF', 'ERROR', True)),
+        ])
+        # the resumed reporting is recorded as well
+        state = OutboxState(self.path)
+        self.assertEqual(state.updates[self.crcs[2].id]['result']['state'], 'DNF')
+        # no workflow was started so no executor was created
+        self.assertIsNone(self.testruns.executor)
+
+
+class TestStreamCaseRunConfigurations(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        WorkflowFactory.clear_workflow_classes()
+        WorkflowFactory.register('test_isolated')(TestWorkflowIsolated)
+        WorkflowFactory.register('test_grouped')(TestWorkflowGroupedAll)
+
+    @classmethod
+    def tearDownClass(cls):
+        WorkflowFactory.restore_workflow_classes()
+
+    def setUp(self):
+        lib = library.Library('tests/test_library')
+        settings = Settings(cmdline_overrides={'library': {'defaultCaseConfigMergeMethod': 'extension', 'streamCaseRunConfigurations': 'True'}}, environment={}, settings_locations=[])
+        event = Event(settings, 'test', other={'tests': ['test_workflows']})
+        self.testruns = TestRuns(lib, event, settings)
+        self.workflows = {
+            caserun.testcase.name: caserun.workflow
+            for caserun in self.testruns.caseRunConfigurations
+        }
+
+    def tearDown(self):
+        for workflow in self.workflows.values():
+            if workflow.started:
+                workflow.join()
+
+    def test_assignment(self):
+        self.assertIsInstance(self.workflows['test_isolated 1'], TestWorkflowIsolated)
+        self.assertIsInstance(self.workflows['testcase 1'], ManualWorkflow)
+        self.assertIsInstance(self.workflows['testcase 2'], UnknownWorkflow)
+        self.assertIsInstance(self.workflows['test_grouped 1'], TestWorkflowGroupedAll)
+        self.assertIs(self.workflows['test_grouped 1'], self.workflows['test_grouped 3'])
+
+    def test_isolated_started_early(self):
+        self.assertTrue(self.workflows['test_isolated 1'].started)
+        self.assertTrue(self.workflows['testcase 2'].started)
+        self.assertFalse(self.workflows['test_grouped 1'].started)
+
+    def test_early_updates(self):
+        unknown_workflow = self.workflows['testcase 2']
+        unknown_workflow.join()
+        crc = unknown_workflow.crc
+        self.assertEqual(self.testruns[crc.id].result, Result('DNF', 'ERROR', True))
+        for reportSender in self.testruns.reportSenders:
+            self.assertEqual(reportSender.caseRunConfigurations[crc.id].result, Result('not started'))
+            reportSender.start = MagicMock()
+            reportSender.resultUpdate = MagicMock()
+        self.testruns.start()
+        self.assertIsNone(self.testruns._earlyUpdates)
+        self.assertTrue(self.workflows['test_grouped 1'].started)
+        for reportSender in self.testruns.reportSenders:
+            reportSender.start.assert_called_once()
+            self.assertIn(crc.id, [call.args[0].id for call in reportSender.resultUpdate.call_args_list])
@@ -48,12 +48,38 @@ def pipeline_data():
                         'state' : caserun.result.state,
                         'logs' : list(caserun.logs.keys()),
                         'active' : not caserun.result.final,
+                        'timeline' : [ transition._asdict() for transition in caserun.timeline ],
                        }
 
         caseRuns.append(caserun_data)
 
     return jsonify(caseRuns)
 
+@main.route('/pipeline_summary')
+def pipeline_summary():
+    """ Aggregated counts of results and states of the whole pipeline, overall
+    and per testplan, computed by the result store of the testruns
+
+    :return: json data
+    :rtype: flask.Response
+    """
+    pipeline = currentPipeline()
+
+    if not pipeline.testRuns:
+        return jsonify({})
+
+    store = pipeline.testRuns.resultStore
+    return jsonify({'results': _jsonCounts(store.counts('result')),
+                    'states': _jsonCounts(store.counts('state')),
+                    'testplans': {tp_id: _jsonCounts(counts)
+                                  for tp_id, counts in store.counts('result', 'testplan').items()},
+                    'percent_complete': store.percentComplete,
+                   })
+
+def _jsonCounts(counts):
+    """ Convert keys of counts to strings so that they can be sorted by jsonify """
+    return {str(value): count for value, count in counts.items()}
+
 @main.route('/logs/<crcid>/<path:name>')
 def logs(crcid, name):
     pipeline = currentPipeline()
@@ -98,6 +124,28 @@ def cancel_filtered():
 
     return jsonify(True)
 
+@main.route('/scheduler')
+def scheduler():
+    """ Provides status of the workflow scheduler, the limits of running
+    workflows can be changed using max_running argument (and workflow_type
+    argument when the limit should be changed for specific workflow type).
+
+    :return: json data
+    :rtype: flask.Response
+    """
+    pipeline = currentPipeline()
+    if not pipeline.testRuns:
+        return jsonify(None)
+
+    max_running = request.args.get('max_running')
+    if max_running is not None:
+        try:
+            pipeline.testRuns.scheduler.setLimit(int(max_running), request.args.get('workflow_type'))
+        except ValueError as e:
+            return jsonify(str(e)), 400
+
+    return jsonify(pipeline.testRuns.scheduler.status())
+
 @main.route('/webUIuuid')
 def webUIuuid():
     return currentWebUI().uuid
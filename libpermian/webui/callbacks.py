@@ -7,6 +7,7 @@ import libxml2
 from os import path, mkdir, makedirs
 
 from ..hooks.builtin import pipeline_ended
+from .. import httpclient
 from ..hooks.register import run_on, run_threaded_on
 from . import hooks
 
@@ -65,6 +66,8 @@ def render_static(pipeline):
     LOGGER.info('Generating static WebUI')
 
     webui_url = pipeline.webUI.baseurl
+    # reuse the connection to WebUI for all the requests
+    http = httpclient.client()
     webui_path = pipeline.settings.get('WebUI', 'static_webui_dir')
     static_dir = path.join(webui_path, 'static')
     index_path = path.join(webui_path, 'index.html')
@@ -74,14 +77,14 @@ def render_static(pipeline):
         makedirs(webui_path)
 
     # Modify pipeline data
-    response = requests.get(webui_url + 'pipeline_data')
+    response = http.get(webui_url + 'pipeline_data')
     pipline_data = json.loads(response.text)
     for crc in pipline_data:
         # Handle local and external logs
         new_logs = dict()
         for log in crc['logs']:
             url = f'./logs/{crc["id"]}/{log}'
-            r = requests.get(webui_url + url.lstrip('./'), allow_redirects=False)
+            r = http.get(webui_url + url.lstrip('./'), allow_redirects=False)
             if r.status_code == 302:
                 url = r.next.url
             else:
@@ -98,12 +101,12 @@ def render_static(pipeline):
 
     def download_static(static_path):
         # Download static files
-        r = requests.get(webui_url + static_path.lstrip('/'))
+        r = http.get(webui_url + static_path.lstrip('/'))
         with open(path.join(static_dir, r.url.split('/')[-1]), 'w') as fo:
             fo.write(r.text)
 
     # Modify WebUI page
-    response = requests.get(webui_url)
+    response = http.get(webui_url)
     doc = libxml2.parseDoc(response.text)
     for elem in doc.xpathEval('/html/head/*[@href or @src]'):
         href = elem.prop('href')
@@ -67,6 +67,21 @@ class TestWebUIData(unittest.TestCase):
         with urllib.request.urlopen(self.webUI.baseurl + 'pipeline_data') as response:
             self.assertEqual(pipeline_data, json.loads(response.read()))
 
+    def test_webui_summary(self):
+        crc = self.testRuns.caseRunConfigurations[0]
+        with urllib.request.urlopen(self.webUI.baseurl + 'pipeline_summary') as response:
+            summary = json.loads(response.read())
+        self.assertEqual(summary['results']['None'], len(self.testRuns.caseRunConfigurations))
+        self.assertEqual(summary['percent_complete'], 0.0)
+
+        crc.updateResult(Result('complete', 'PASS', True))
+        with urllib.request.urlopen(self.webUI.baseurl + 'pipeline_summary') as response:
+            summary = json.loads(response.read())
+        self.assertEqual(summary['results']['PASS'], 1)
+        self.assertEqual(summary['states']['complete'], 1)
+        for tp_id in crc.running_for:
+            self.assertEqual(summary['testplans'][tp_id]['PASS'], 1)
+
     def test_webui_logs(self):
         message = 'Hello from webUI test!'
         external_url = 'http://some.server.example.com/foo/bar'
@@ -0,0 +1,203 @@
+import abc
+import asyncio
+import logging
+
+from .. import httpclient
+from ..exception_dump import dump_exception
+from ..result import Result
+from .grouped import GroupedWorkflow
+from .isolated import IsolatedWorkflow
+from .executors import EventLoopWorkflowExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+class AsyncGroupedWorkflow(GroupedWorkflow):
+    """
+    Variant of GroupedWorkflow where setup, execute, dry_execute and teardown
+    are coroutines. All the asynchronous workflows are executed in one event
+    loop (see EventLoopWorkflowExecutor) owned by the executor selected in
+    settings, so they should never block, use the async helpers provided
+    by this class (runCommand, httpRequest, sleep) or other asyncio means
+    for waiting.
+
+    Reporting results and logging is done the same way as in
+    GroupedWorkflow. The execution can be canceled using cancelExecution
+    which is also what the default groupTerminate does when all the
+    caseRunConfigurations of the workflow are being terminated.
+    """
+    def __init__(self, testRuns, crcList):
+        super().__init__(testRuns, crcList)
+        self._task = None
+        self._cancelRequested = False
+
+    def start(self, executor=None):
+        """
+        Start execution of the workflow in the event loop of the executor
+        (see BaseWorkflowExecutor.eventLoopExecutor). Without executor, the
+        workflow runs in its own event loop which is stopped once the
+        workflow ends.
+        """
+        if executor is None:
+            executor = EventLoopWorkflowExecutor(self.testRuns)
+            super().start(executor)
+            executor.shutdown()
+        else:
+            super().start(executor.eventLoopExecutor)
+
+    def run(self):
+        """
+        Run the workflow in newly created event loop in current thread. This
+        method is not used when the workflow is started using start method.
+        """
+        asyncio.run(self.runAsync())
+
+    async def runAsync(self):
+        """
+        Asynchronous counterpart of GroupedWorkflow.run calling setup,
+        execute (or dry_execute) and teardown coroutines in sequence.
+        """
+        self._task = asyncio.current_task()
+        try:
+            if self._cancelRequested:
+                raise asyncio.CancelledError()
+            await self.setup()
+            await (self.execute() if not self.dryRun else self.dry_execute())
+        except asyncio.CancelledError:
+            self.groupLog('Workflow execution was canceled')
+        except self.silent_exceptions as e:
+            self.groupLog(f'Workflow raised silent exception: {e}')
+            self.groupReportResult(self.crcList, Result('DNF', 'ERROR', True))
+        except Exception as e:
+            self.exceptions.append(dump_exception(e, self))
+            self.groupReportResult(self.crcList, Result('DNF', 'ERROR', True))
+            # reraise the exception so that it's exposed for unit tests
+            raise
+        finally:
+            self._task = None
+            try:
+                await self.teardown()
+            except Exception as e:
+                self.exceptions.append(dump_exception(e, self))
+                # reraise the exception so that it's exposed for unit tests
+                raise
+
+    async def setup(self):
+        """
+        Steps performed before actual execution started.
+        """
+
+    @abc.abstractmethod
+    async def execute(self):
+        """
+        Steps performed during the execution of the workflow. This coroutine
+        should never block the event loop.
+        """
+
+    async def dry_execute(self):
+        """
+        This coroutine is awaited instead of the execute when the
+        caseRunConfiguration should be executed in dry_run mode.
+        """
+
+    async def teardown(self):
+        """
+        Steps performed after the execution ended (even when it was
+        canceled).
+        """
+
+    def cancelExecution(self):
+        """
+        Cancel the running setup/execute/dry_execute coroutine (teardown is
+        still awaited). This method can be called from any thread.
+        """
+        self._cancelRequested = True
+        task = self._task
+        if task is not None:
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def groupTerminate(self, crcIds):
+        """
+        Cancel the execution if all the caseRunConfigurations of the workflow
+        are being terminated, termination of only some of them is not
+        supported by default.
+
+        :return: True if the workflow was terminated False otherwise
+        :rtype: bool
+        """
+        if set(crcIds) != set(self.crcList.ids):
+            return False
+        self.cancelExecution()
+        return True
+
+    async def runCommand(self, *args, logName=None, **kwargs):
+        """
+        Run command as subprocess without blocking the event loop. If logName
+        is provided, the output (stdout and stderr) of the command is written
+        to a log of such name, line by line as it's produced.
+
+        :param args: Command and its arguments, see asyncio.create_subprocess_exec
+        :param logName: Name of the log where output of the command should be written
+        :type logName: str, optional
+        :return: Return code of the command
+        :rtype: int
+        """
+        if logName is not None:
+            kwargs.update(stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        process = await asyncio.create_subprocess_exec(*args, **kwargs)
+        try:
+            if logName is not None:
+                async for line in process.stdout:
+                    self.groupLog(line.decode(errors='replace').rstrip('\n'), name=logName)
+            return await process.wait()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+    async def httpRequest(self, url, data=None, headers=None, method=None, timeout=None):
+        """
+        Make HTTP request without blocking the event loop, the request
+        itself is done using the pipeline-wide HTTP client (see
+        libpermian.httpclient) in thread pool of the event loop.
+
+        :param method: HTTP method, GET or POST (when data are provided) by default
+        :type method: str, optional
+        :param timeout: Timeout of the request, timeouts from http settings section are used by default
+        :type timeout: float, optional
+        :return: Status code and body of the response
+        :rtype: tuple
+        """
+        if method is None:
+            method = 'GET' if data is None else 'POST'
+        kwargs = {'data': data, 'headers': headers}
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        def request():
+            response = httpclient.client().request(method, url, **kwargs)
+            return response.status_code, response.content
+        return await asyncio.get_running_loop().run_in_executor(None, request)
+
+    async def sleep(self, seconds):
+        """
+        Sleep without blocking the event loop.
+        """
+        await asyncio.sleep(seconds)
+
+class AsyncIsolatedWorkflow(AsyncGroupedWorkflow, IsolatedWorkflow):
+    """
+    Variant of IsolatedWorkflow where setup, execute, dry_execute and teardown
+    are coroutines, see AsyncGroupedWorkflow. The terminate method cancels
+    the execution by default.
+    """
+    def groupTerminate(self, crcIds):
+        return IsolatedWorkflow.groupTerminate(self, crcIds)
+
+    def terminate(self):
+        """
+        Cancel the execution of this workflow.
+
+        :return: True as the execution is always canceled
+        :rtype: bool
+        """
+        self.cancelExecution()
+        return True
@@ -0,0 +1,392 @@
+import abc
+import asyncio
+import concurrent.futures
+import logging
+import multiprocessing
+import threading
+
+LOGGER = logging.getLogger(__name__)
+
+TERMINATE_TIMEOUT = 60
+"""Seconds to wait for workflow in worker process to respond to termination"""
+
+RELAY_SHUTDOWN_TIMEOUT = 600
+"""
+Seconds to keep relaying updates of workflows still running in worker
+processes after the executor was shut down
+"""
+
+class BaseWorkflowExecutor(metaclass=abc.ABCMeta):
+    """
+    Base class for executors running the workflows (their run method which
+    calls setup, execute and teardown). The workflow objects are not bound
+    to any thread, the executor decides where the workflow is executed.
+
+    :param testRuns: TestRuns instance the executed workflows belong to
+    :type testRuns: libpermian.testruns.TestRuns
+    :param maxWorkers: Maximal number of workers, 0 means default of the executor
+    :type maxWorkers: int
+    """
+    def __init__(self, testRuns=None, maxWorkers=0):
+        self.testRuns = testRuns
+        self.maxWorkers = maxWorkers or None
+        self._eventLoopExecutor = None
+        self._eventLoopExecutorLock = threading.Lock()
+
+    @property
+    def eventLoopExecutor(self):
+        """
+        Executor running asynchronous workflows (see
+        libpermian.workflows.asynchronous) submitted through this executor.
+        It's created on first use and shut down with this executor.
+
+        :rtype: EventLoopWorkflowExecutor
+        """
+        with self._eventLoopExecutorLock:
+            if self._eventLoopExecutor is None:
+                self._eventLoopExecutor = EventLoopWorkflowExecutor(self.testRuns)
+            return self._eventLoopExecutor
+
+    @abc.abstractmethod
+    def submit(self, workflow):
+        """
+        Start execution of the workflow.
+
+        :return: Future which is done once the workflow run has ended
+        :rtype: concurrent.futures.Future
+        """
+
+    def terminate(self, workflow, crcIds):
+        """
+        Terminate execution of the crcIds handled by the workflow, see
+        GroupedWorkflow.groupTerminate.
+        """
+        return workflow.groupTerminate(crcIds)
+
+    def shutdown(self):
+        """
+        Release resources of the executor once no more workflows are going
+        to be submitted. Running workflows are not affected.
+        """
+        if self._eventLoopExecutor is not None:
+            self._eventLoopExecutor.shutdown()
+
+class ThreadWorkflowExecutor(BaseWorkflowExecutor):
+    """
+    Run each workflow in its own thread.
+    """
+    def submit(self, workflow):
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        threading.Thread(
+            target=self._run,
+            args=(workflow, future),
+            name=f'workflow-{workflow.__class__.__name__}',
+        ).start()
+        return future
+
+    @staticmethod
+    def _run(workflow, future):
+        try:
+            workflow.run()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+
+class ThreadPoolWorkflowExecutor(BaseWorkflowExecutor):
+    """
+    Run the workflows in bounded pool of threads. Note that all the workflows
+    which are submitted are considered running (see WorkflowScheduler),
+    those which don't fit into the pool wait for a free thread.
+    """
+    def __init__(self, testRuns=None, maxWorkers=0):
+        super().__init__(testRuns, maxWorkers)
+        self._pool = concurrent.futures.ThreadPoolExecutor(self.maxWorkers, thread_name_prefix='workflow')
+
+    def submit(self, workflow):
+        return self._pool.submit(workflow.run)
+
+    def shutdown(self):
+        super().shutdown()
+        self._pool.shutdown(wait=False)
+
+class ProcessPoolWorkflowExecutor(BaseWorkflowExecutor):
+    """
+    Run the workflows in pool of worker processes so that the workflows can
+    do CPU intensive work. The workflow is pickled and sent to the worker
+    process, so the workflow has to be picklable (see
+    GroupedWorkflow.__getstate__).
+
+    Results and logs reported by the workflow in the worker process are
+    relayed back to the workflow (and its caseRunConfigurations) in this
+    process which then provides them to TestRuns. Termination requests are
+    relayed to the workflow in the worker process. The relaying continues
+    after shutdown until all the workflows have ended (at most
+    RELAY_SHUTDOWN_TIMEOUT seconds).
+    """
+    def __init__(self, testRuns=None, maxWorkers=0):
+        super().__init__(testRuns, maxWorkers)
+        self._manager = multiprocessing.Manager()
+        self._updates = self._manager.Queue()
+        self._terminations = {}
+        self._workflows = {}
+        self._pool = concurrent.futures.ProcessPoolExecutor(self.maxWorkers)
+        self._relay = threading.Thread(target=self._relayUpdates, name='workflow-relay', daemon=True)
+        self._relay.start()
+
+    def submit(self, workflow):
+        terminations = self._manager.Queue()
+        replies = self._manager.Queue()
+        done = concurrent.futures.Future()
+        done.set_running_or_notify_cancel()
+        self._terminations[id(workflow)] = (terminations, replies)
+        self._workflows[id(workflow)] = (workflow, done)
+        future = self._pool.submit(_runInWorker, workflow, id(workflow), self._updates, terminations, replies)
+        future.add_done_callback(lambda future: self._workerFinished(workflow, future))
+        return done
+
+    def _workerFinished(self, workflow, future):
+        """
+        Handle failure of the worker process itself (e.g. the workflow
+        couldn't be pickled), regular end of the workflow is handled once the
+        relay thread gets to it, see _relayUpdates.
+        """
+        if future.cancelled() or future.exception() is not None:
+            self._workflowEnded(id(workflow), exception=future.exception())
+
+    def _workflowEnded(self, workflowId, exceptions=(), exception=None):
+        try:
+            terminations, _ = self._terminations.pop(workflowId)
+        except KeyError:
+            return
+        # stop the termination watcher in the worker process
+        terminations.put(None)
+        workflow, done = self._workflows.pop(workflowId)
+        workflow.exceptions.extend(exceptions)
+        if exception is not None:
+            LOGGER.error("Workflow '%s' failed in worker process: %s", workflow, exception)
+            done.set_exception(exception)
+        else:
+            done.set_result(None)
+
+    def _relayUpdates(self):
+        """
+        Provide updates reported by workflows in worker processes to the
+        workflows in this process. The end of the workflow is relayed the
+        same way so that it's signaled only after all its updates.
+        """
+        while True:
+            message = self._updates.get()
+            if message is None:
+                return
+            if message[0] == 'finished':
+                _, workflowId, exceptions = message
+                self._workflowEnded(workflowId, exceptions)
+                continue
+            _, workflowId, crcId, result, logs = message
+            workflow, _ = self._workflows[workflowId]
+            try:
+                for crc in workflow.crcList:
+                    if crc.id == crcId:
+                        for name, logPath in logs.items():
+                            if name not in crc.logs:
+                                crc.addLog(name, logPath)
+                        if result is not None:
+                            crc.updateResult(result)
+                            workflow.testRuns.update(crc)
+            except Exception as e:
+                LOGGER.error("Relaying update of workflow '%s' failed: %s", workflow, e)
+
+    def terminate(self, workflow, crcIds):
+        try:
+            terminations, replies = self._terminations[id(workflow)]
+        except KeyError:
+            # the workflow has already ended
+            return False
+        terminations.put(list(crcIds))
+        try:
+            return replies.get(timeout=TERMINATE_TIMEOUT)
+        except Exception as e:
+            LOGGER.error("Workflow '%s' didn't respond to termination request: %s", workflow, e)
+            return False
+
+    def shutdown(self):
+        super().shutdown()
+        self._pool.shutdown(wait=False)
+        pending = [done for _, done in list(self._workflows.values())]
+        if not pending:
+            self._stopRelay(pending)
+            return
+        threading.Thread(
+            target=self._stopRelay,
+            args=(pending,),
+            name='workflow-relay-stop',
+            daemon=True,
+        ).start()
+
+    def _stopRelay(self, pending):
+        """
+        Stop the relay thread and the manager once the pending workflows have
+        ended or RELAY_SHUTDOWN_TIMEOUT has passed.
+        """
+        _, notDone = concurrent.futures.wait(pending, timeout=RELAY_SHUTDOWN_TIMEOUT)
+        if notDone:
+            LOGGER.error('%d workflows still running in worker processes, their updates are not relayed anymore', len(notDone))
+        self._updates.put(None)
+        self._relay.join()
+        self._manager.shutdown()
+
+class EventLoopWorkflowExecutor(BaseWorkflowExecutor):
+    """
+    Run asynchronous workflows (see AsyncGroupedWorkflow) as tasks in one
+    event loop running in separate (daemon) thread. The event loop is shared
+    by all the workflows using the same executor, the loop is stopped once
+    the executor is shut down and all its workflows have ended.
+    """
+    def __init__(self, testRuns=None, maxWorkers=0):
+        super().__init__(testRuns, maxWorkers)
+        self._loop = None
+        self._thread = None
+        self._running = set()
+        self._shutdown = False
+        self._lock = threading.Lock()
+
+    @property
+    def eventLoopExecutor(self):
+        return self
+
+    @property
+    def loop(self):
+        """Event loop running the workflows, the loop is started on first use"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._runLoop,
+                    args=(self._loop,),
+                    name='workflow-event-loop',
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    @staticmethod
+    def _runLoop(loop):
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+
+    def submit(self, workflow):
+        if self._shutdown:
+            raise RuntimeError('Cannot submit workflow after the executor was shut down')
+        future = asyncio.run_coroutine_threadsafe(workflow.runAsync(), self.loop)
+        with self._lock:
+            self._running.add(future)
+        future.add_done_callback(self._workflowEnded)
+        return future
+
+    def _workflowEnded(self, future):
+        with self._lock:
+            self._running.discard(future)
+            stop = self._shutdown and not self._running
+        if stop:
+            self._stop()
+
+    def _stop(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+
+    def shutdown(self):
+        """
+        Stop the event loop once the running workflows end.
+        """
+        with self._lock:
+            self._shutdown = True
+            stop = not self._running
+        if stop:
+            self._stop()
+
+class WorkerTestRuns():
+    """
+    Stand-in for TestRuns used by workflows running in worker process which
+    relays the updates to the main process.
+    """
+    def __init__(self, workflowId, settings, event, updates):
+        self.workflowId = workflowId
+        self.settings = settings
+        self.event = event
+        self.updates = updates
+
+    def update(self, crc):
+        self.updates.put(('update', self.workflowId, crc.id, crc.result.copy(), dict(crc.logs)))
+
+    def updateBatch(self, crcs):
+        for crc in crcs:
+            self.update(crc)
+
+    def relayLogs(self, crc):
+        self.updates.put(('update', self.workflowId, crc.id, None, dict(crc.logs)))
+
+    def finished(self, exceptions):
+        self.updates.put(('finished', self.workflowId, exceptions))
+
+def _runInWorker(workflow, workflowId, updates, terminations, replies):
+    """
+    Run the workflow in worker process.
+    """
+    testRuns = WorkerTestRuns(workflowId, workflow.settings, workflow.event, updates)
+    workflow.testRuns = testRuns
+    for crc in workflow.crcList:
+        crc.testrun = testRuns
+        crc.workflow = workflow
+
+    def watchTerminations():
+        while True:
+            crcIds = terminations.get()
+            if crcIds is None:
+                return
+            try:
+                replies.put(workflow.groupTerminate(crcIds))
+            except Exception as e:
+                LOGGER.error("Termination of workflow '%s' failed: %s", workflow, e)
+                replies.put(False)
+
+    threading.Thread(target=watchTerminations, daemon=True).start()
+    try:
+        workflow.run()
+    except Exception:
+        # the exception is already recorded in workflow.exceptions
+        pass
+    finally:
+        # logs may be added without any result reported
+        for crc in workflow.crcList:
+            testRuns.relayLogs(crc)
+        testRuns.finished(workflow.exceptions)
+
+EXECUTORS = {
+    'thread': ThreadWorkflowExecutor,
+    'threadpool': ThreadPoolWorkflowExecutor,
+    'processpool': ProcessPoolWorkflowExecutor,
+}
+"""Executors which can be selected using executor option in workflows section"""
+
+def makeExecutor(testRuns):
+    """
+    Create executor selected in settings of the testRuns.
+
+    :param testRuns: TestRuns instance which workflows will be executed
+    :type testRuns: libpermian.testruns.TestRuns
+    :raises ValueError: When unknown executor is selected
+    :rtype: BaseWorkflowExecutor
+    """
+    name = testRuns.settings.get('workflows', 'executor')
+    try:
+        executorClass = EXECUTORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown workflow executor '{name}', expected one of: {', '.join(EXECUTORS)}")
+    return executorClass(testRuns, testRuns.settings.getint('workflows', 'executor_workers'))
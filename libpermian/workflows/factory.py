@@ -35,7 +35,7 @@ class WorkflowFactory():
         return decorator
 
     @classmethod
-    def assign(cls, TestRuns):
+    def assign(cls, TestRuns, crcList=None):
         """
         Aggregate CaseRunConfiguration objects based on their workflows and
         call Workflows factory function which then takes care of creating
@@ -46,23 +46,53 @@ class WorkflowFactory():
 
         :param TestRuns:
         :type TestRuns:
+        :param crcList: CaseRunConfigurations to be assigned, defaults to all caseRunConfigurations of TestRuns
+        :type crcList: CaseRunConfigurationsList, optional
         """
-        groups_by_workflow = dict()
-        for workflow_name, crcList in TestRuns.caseRunConfigurations.by_workflowType().items():
-            cls._assignWorkflows(workflow_name, TestRuns, crcList)
+        if crcList is None:
+            crcList = TestRuns.caseRunConfigurations
+        for workflow_name, workflowCrcList in crcList.by_workflowType().items():
+            cls._assignWorkflows(workflow_name, TestRuns, workflowCrcList)
 
     @classmethod
-    def _assignWorkflows(cls, workflow_name, testRuns, crcList):
+    def assignIncrementally(cls, testRuns, crcList):
+        """
+        Assign workflows only to those caseRunConfigurations from crcList
+        which workflow supports incremental assignment (see
+        GroupedWorkflow.incrementalFactory). This is used when the
+        caseRunConfigurations are streamed and such workflows can be started
+        before all the caseRunConfigurations are known. The rest of the
+        caseRunConfigurations is left without workflow.
+
+        :param testRuns:
+        :type testRuns: libpermian.testruns.TestRuns
+        :param crcList: Newly generated caseRunConfigurations
+        :type crcList: CaseRunConfigurationsList
+        """
+        for workflow_name, workflowCrcList in crcList.by_workflowType().items():
+            workflow_class = cls._workflowClass(workflow_name)
+            if workflow_class.incrementalFactory:
+                workflow_class.factory(testRuns, workflowCrcList)
+
+    @classmethod
+    def _workflowClass(cls, workflow_name):
         """
-        Call factory method of workflow corresponding to workflow_name. If no
-        such corresponding workflow can be found, fallback to the default
-        workflow with workflow_name None. (This will be in most cases
-        UnknownWorkflow.)
+        Workflow class corresponding to workflow_name. If no such
+        corresponding workflow can be found, fallback to the default workflow
+        with workflow_name None. (This will be in most cases UnknownWorkflow.)
         """
         workflow_class = cls.workflow_classes.get(workflow_name)
         if workflow_class is None:
             workflow_class = cls.workflow_classes.get(None)
-        workflow_class.factory(testRuns, crcList)
+        return workflow_class
+
+    @classmethod
+    def _assignWorkflows(cls, workflow_name, testRuns, crcList):
+        """
+        Call factory method of workflow corresponding to workflow_name, see
+        _workflowClass.
+        """
+        cls._workflowClass(workflow_name).factory(testRuns, crcList)
 
     @classmethod
     def clear_workflow_classes(cls):
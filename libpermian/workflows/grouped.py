@@ -1,12 +1,13 @@
 import abc
-import threading
+import concurrent.futures
 import os
 import datetime
 
 from ..exception_dump import dump_exception
 from ..result import Result
+from .executors import ThreadWorkflowExecutor
 
-class GroupedWorkflow(threading.Thread, metaclass=abc.ABCMeta):
+class GroupedWorkflow(metaclass=abc.ABCMeta):
     """
     Abstract class for all workflows. Use this class as parent for you
     workflow if you want to handle multiple caseRunConfigurations by one
@@ -15,8 +16,20 @@ class GroupedWorkflow(threading.Thread, metaclass=abc.ABCMeta):
 
     Workflow instances should not be directly created, use the factory method
     which should handle creation of the workflow instances.
+
+    The workflow is not bound to any thread, it's executed by an executor
+    (see libpermian.workflows.executors) which may run it in its own thread,
+    in a pool of threads or in a worker process. The workflow provides
+    start, join and is_alive methods similar to threading.Thread.
     """
     silent_exceptions = tuple()
+    incrementalFactory = False
+    """
+    Set to True if the factory method can be called multiple times, each time
+    with newly generated caseRunConfigurations only, without affecting how
+    the workflow instances are created. Such workflows can be started before
+    all the caseRunConfigurations are generated.
+    """
 
     @classmethod
     @abc.abstractmethod
@@ -46,16 +59,63 @@ class GroupedWorkflow(threading.Thread, metaclass=abc.ABCMeta):
         for crc in crcList:
             crc.workflow = self
         self.crcList = crcList.copy()
-        super().__init__()
+        self.executor = None
+        """Executor running this workflow, set once the workflow is started"""
+        self._future = None
+
+    def __getstate__(self):
+        """
+        The workflow is pickled when it's sent to a worker process, see
+        ProcessPoolWorkflowExecutor. The testRuns and links of the
+        caseRunConfigurations to this process are replaced in the worker.
+        """
+        state = self.__dict__.copy()
+        state['testRuns'] = None
+        state['executor'] = None
+        state['_future'] = None
+        return state
+
+    def start(self, executor=None):
+        """
+        Start execution of the workflow (the run method) using the executor.
+        When the run ends, testRuns.workflowFinished is called.
+
+        :param executor: Executor running the workflow, workflow runs in its own thread if not provided
+        :type executor: libpermian.workflows.executors.BaseWorkflowExecutor, optional
+        :raises RuntimeError: When the workflow was already started
+        """
+        if self._future is not None:
+            raise RuntimeError('Workflow can be started only once')
+        self.executor = executor or ThreadWorkflowExecutor(self.testRuns)
+        self._future = self.executor.submit(self)
+        self._future.add_done_callback(lambda future: self.testRuns.workflowFinished(self))
+
+    @property
+    def started(self):
+        """True if the workflow was already started"""
+        return self._future is not None
+
+    def is_alive(self):
+        """True if the workflow is started and the run has not ended yet"""
+        return self._future is not None and not self._future.done()
+
+    def join(self, timeout=None):
+        """
+        Wait until the workflow run ends or until the timeout occurs.
+
+        :raises RuntimeError: When the workflow was not started yet
+        """
+        if self._future is None:
+            raise RuntimeError('Cannot join workflow before it is started')
+        concurrent.futures.wait([self._future], timeout)
 
     def run(self):
         """
         This is the main body of the workflow execution. This method calls
         setup, execute (or dry_execute) and teardown methods in sequence.
 
-        This method is not meant to be called directly as it's started in
-        separate thread once the workflow.start method is invoked. For more
-        information see Threading.Thread.start.
+        This method is not meant to be called directly as it's executed by
+        the executor once the workflow.start method is invoked.
 
         :return: None
         :rtype: None
@@ -95,8 +155,10 @@ class GroupedWorkflow(threading.Thread, metaclass=abc.ABCMeta):
         where the core code of the workflow should be happening.
 
         This method should NEVER EVER perform any computation intensive tasks
-        as it's executed in python thread. If needed, use separate processes
-        using subprocess, multiprocessing modules or fork function.
+        unless the workflows are executed in worker processes (see
+        ProcessPoolWorkflowExecutor) as it's executed in python thread. If
+        needed, use separate processes using subprocess, multiprocessing
+        modules or fork function.
 
         :return: None
         :rtype: None
@@ -129,11 +191,29 @@ class GroupedWorkflow(threading.Thread, metaclass=abc.ABCMeta):
         :rtype: TODO
         """
 
+    def requestTermination(self, crcIds):
+        """
+        Terminate execution of specific crcIds handled by the workflow
+        through the executor so that the request reaches the workflow even
+        if it runs in a worker process. Use this instead of calling
+        groupTerminate directly.
+
+        :return: True if the workflow was terminated False otherwise
+        :rtype: bool
+        """
+        if self.executor is None:
+            return self.groupTerminate(crcIds)
+        return self.executor.terminate(self, crcIds)
+
     def groupReportResult(self, crcList, result):
         """
         Provide partial or final result for the crcId. For more
         information see TODO:Result.
 
+        All the crcs are provided to TestRuns at once as one batch update.
+        The state change is logged only for crcs whose state, result or
+        final flag was actually changed by the update.
+
         :param crcIds: TODO
         :type crcIds: list
         :param result: TODO
@@ -141,10 +221,15 @@ class GroupedWorkflow(threading.Thread, metaclass=abc.ABCMeta):
         :return: None
         :rtype: None
         """
-        self.groupLog(f'Changing state to: "{result.state}" with result: "{result.result}"', crcList=crcList)
+        changedCrcs = []
         for crc in crcList:
+            oldKey = crc.result.key[:3]
             crc.updateResult(result)
-            self.testRuns.update(crc)
+            if crc.result.key[:3] != oldKey:
+                changedCrcs.append(crc)
+        if changedCrcs:
+            self.groupLog(f'Changing state to: "{result.state}" with result: "{result.result}"', crcList=changedCrcs)
+        self.testRuns.updateBatch(crcList)
 
     @abc.abstractmethod
     def groupDisplayStatus(self, crcId):
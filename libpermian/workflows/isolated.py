@@ -13,6 +13,8 @@ class IsolatedWorkflow(GroupedWorkflow):
     Workflow instances should not be directly created, use the factory method
     which should handle creation of the workflow instances.
     """
+    incrementalFactory = True
+
     @classmethod
     def factory(cls, testRuns, crcList):
         """
@@ -70,9 +72,13 @@ class IsolatedWorkflow(GroupedWorkflow):
     def reportResult(self, result):
         """
         Shortcut method for groupReportResult. The crcIds
-        is not needed when this method is used.
+        is not needed when this method is used. As there's only one crc, it's
+        provided to TestRuns as single update instead of batch.
         """
-        super().groupReportResult(self.crcList, result)
+        self.log(f'Changing state to: "{result.state}" with result: "{result.result}"')
+        crc = self.crcList[0]
+        crc.updateResult(result)
+        self.testRuns.update(crc)
 
     def groupDisplayStatus(self, crcId):
         """
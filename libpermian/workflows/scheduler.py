@@ -0,0 +1,188 @@
+import heapq
+import itertools
+import logging
+import threading
+from collections import Counter
+
+LOGGER = logging.getLogger(__name__)
+
+class WorkflowScheduler():
+    """
+    Scheduler starting workflows while keeping the number of concurrently
+    running workflows within limits. There's the global limit (max_running
+    option in workflows section) and limit for each workflow type
+    (max_running option in workflow-{type} section), 0 means no limit. The
+    limits can be changed at runtime using setLimit.
+
+    Workflows which can't be started right away are queued and started once
+    some of the running workflows finish. The queued workflows are started
+    in order of the priority of their workflow type (priority option in
+    workflow-{type} section falling back to workflows section, the higher
+    the sooner) and then in the order in which they were submitted.
+
+    :param settings: Pipeline settings object
+    :type settings: libpermian.settings.Settings
+    :param startWorkflow: Callable which actually starts the workflow, defaults to workflow.start
+    :type startWorkflow: callable, optional
+    """
+    def __init__(self, settings, startWorkflow=None):
+        self.settings = settings
+        self.startWorkflow = startWorkflow or (lambda workflow: workflow.start())
+        self.limit = settings.getint('workflows', 'max_running')
+        """Global limit of running workflows, 0 means no limit"""
+        self.typeLimits = {}
+        """Limits of running workflows for individual workflow types"""
+        self._priorities = {}
+        self._queues = {}
+        self._counter = itertools.count()
+        self._running = {}
+        self._runningByType = Counter()
+        self._lock = threading.RLock()
+
+    def typeLimit(self, workflowType):
+        """
+        Limit of running workflows of the workflow type, 0 means no limit.
+        """
+        with self._lock:
+            try:
+                return self.typeLimits[workflowType]
+            except KeyError:
+                pass
+            try:
+                limit = self.settings.getint(f'workflow-{workflowType}', 'max_running')
+            except KeyError:
+                limit = 0
+            self.typeLimits[workflowType] = limit
+            return limit
+
+    def priority(self, workflowType):
+        """
+        Priority of queued workflows of the workflow type.
+        """
+        try:
+            return self._priorities[workflowType]
+        except KeyError:
+            priority = self._priorities[workflowType] = self.settings.getint(
+                [f'workflow-{workflowType}', 'workflows'], 'priority'
+            )
+            return priority
+
+    def setLimit(self, limit, workflowType=None):
+        """
+        Change limit of running workflows and start queued workflows if the
+        new limit allows it. Lowering the limit doesn't affect workflows
+        which are already running.
+
+        :param limit: New limit, 0 means no limit
+        :type limit: int
+        :param workflowType: Workflow type for which the limit is changed, global limit is changed if not provided
+        :type workflowType: str, optional
+        """
+        if limit < 0:
+            raise ValueError(f'Invalid limit of running workflows: {limit}')
+        with self._lock:
+            if workflowType is None:
+                self.limit = limit
+            else:
+                self.typeLimits[workflowType] = limit
+        LOGGER.info('Limit of running workflows%s set to %d',
+                    '' if workflowType is None else f" of type '{workflowType}'", limit)
+        self._startQueued()
+
+    def submit(self, workflow, workflowType):
+        """
+        Start the workflow if the limits allow it, otherwise queue it.
+        """
+        with self._lock:
+            heapq.heappush(
+                self._queues.setdefault(workflowType, []),
+                (-self.priority(workflowType), next(self._counter), workflow),
+            )
+        self._startQueued()
+
+    def cancel(self, workflow):
+        """
+        Remove the workflow from queue if it wasn't started yet.
+
+        :return: True if the workflow was removed from queue, False if it's not queued
+        :rtype: bool
+        """
+        with self._lock:
+            for workflowQueue in self._queues.values():
+                for index, (_, _, queuedWorkflow) in enumerate(workflowQueue):
+                    if queuedWorkflow is workflow:
+                        workflowQueue.pop(index)
+                        heapq.heapify(workflowQueue)
+                        return True
+        return False
+
+    def workflowFinished(self, workflow):
+        """
+        Release place taken by the workflow and start queued workflows. It's
+        safe to call this method multiple times for the same workflow.
+        """
+        with self._lock:
+            workflowType = self._running.pop(id(workflow), None)
+            if workflowType is None:
+                return
+            self._runningByType[workflowType] -= 1
+        self._startQueued()
+
+    def _nextWorkflow(self):
+        """
+        Pick the queued workflow which should be started next and record it
+        as running.
+
+        :return: Workflow to be started or None if no workflow can be started
+        """
+        if self.limit and len(self._running) >= self.limit:
+            return None
+        candidates = [
+            (workflowQueue[0], workflowType)
+            for workflowType, workflowQueue in self._queues.items()
+            if workflowQueue and not (
+                self.typeLimit(workflowType)
+                and self._runningByType[workflowType] >= self.typeLimit(workflowType)
+            )
+        ]
+        if not candidates:
+            return None
+        (_, _, workflow), workflowType = min(candidates, key=lambda candidate: candidate[0][:2])
+        heapq.heappop(self._queues[workflowType])
+        self._running[id(workflow)] = workflowType
+        self._runningByType[workflowType] += 1
+        return workflow
+
+    def _startQueued(self):
+        """
+        Start as many queued workflows as the limits allow.
+        """
+        while True:
+            with self._lock:
+                workflow = self._nextWorkflow()
+            if workflow is None:
+                return
+            self.startWorkflow(workflow)
+
+    def status(self):
+        """
+        Limits and numbers of running and queued workflows.
+
+        :return: Mapping with global status and status of individual workflow types
+        :rtype: dict
+        """
+        with self._lock:
+            workflowTypes = set(self._queues) | set(self._runningByType)
+            return {
+                'max_running': self.limit,
+                'running': len(self._running),
+                'queued': sum(len(workflowQueue) for workflowQueue in self._queues.values()),
+                'types': {
+                    str(workflowType): {
+                        'max_running': self.typeLimit(workflowType),
+                        'running': self._runningByType[workflowType],
+                        'queued': len(self._queues.get(workflowType, ())),
+                    }
+                    for workflowType in workflowTypes
+                },
+            }
@@ -0,0 +1,87 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+import unittest.mock
+
+from ..caserunconfiguration import CaseRunConfiguration, CaseRunConfigurationsList
+from ..result import Result
+from .asynchronous import AsyncIsolatedWorkflow
+from .executors import ThreadWorkflowExecutor
+from .test_executors import DummyTestCase, DummyTestRuns
+
+
+class SleepingWorkflow(AsyncIsolatedWorkflow):
+    threads = set()
+
+    async def execute(self):
+        self.threads.add(threading.current_thread())
+        self.reportResult(Result('started'))
+        await self.sleep(0.1)
+        self.reportResult(Result('complete', 'PASS', True))
+
+    def displayStatus(self):
+        return 'Test'
+
+    def groupLog(self, *args, **kwargs):
+        pass
+
+
+class CommandWorkflow(SleepingWorkflow):
+    async def execute(self):
+        returncode = await self.runCommand(sys.executable, '-c', 'import time; time.sleep(10)')
+        self.reportResult(Result('complete', 'PASS' if returncode == 0 else 'FAIL', True))
+
+
+class TestAsyncWorkflows(unittest.TestCase):
+    def setUp(self):
+        self.testRuns = DummyTestRuns()
+
+    def makeWorkflow(self, workflowClass, name):
+        crc = CaseRunConfiguration(DummyTestCase(name), {}, [])
+        return workflowClass(self.testRuns, CaseRunConfigurationsList([crc]))
+
+    def test_shared_event_loop(self):
+        SleepingWorkflow.threads = set()
+        executor = ThreadWorkflowExecutor(self.testRuns)
+        workflows = [self.makeWorkflow(SleepingWorkflow, f'test {i}') for i in range(50)]
+        for workflow in workflows:
+            workflow.start(executor)
+        for workflow in workflows:
+            workflow.join()
+            self.assertIs(workflow.executor, executor.eventLoopExecutor)
+        self.assertEqual(len(SleepingWorkflow.threads), 1)
+        loopThread = executor.eventLoopExecutor._thread
+        executor.shutdown()
+        loopThread.join(5)
+        self.assertFalse(loopThread.is_alive())
+        self.assertEqual(len(self.testRuns.updates), 100)
+        self.assertEqual(
+            [result for _, result in self.testRuns.updates].count(Result('complete', 'PASS', True)),
+            50,
+        )
+
+    def test_cancel(self):
+        workflow = self.makeWorkflow(CommandWorkflow, 'test')
+        workflow.start()
+        time.sleep(0.3) # let the command start
+        self.assertTrue(workflow.requestTermination([workflow.crc.id]))
+        workflow.join(5)
+        self.assertFalse(workflow.is_alive())
+        self.assertEqual(self.testRuns.updates, [])
+
+    def test_run(self):
+        workflow = self.makeWorkflow(SleepingWorkflow, 'test')
+        workflow.run()
+        self.assertEqual(self.testRuns.updates[-1][1], Result('complete', 'PASS', True))
+
+    def test_http_request(self):
+        workflow = self.makeWorkflow(SleepingWorkflow, 'test')
+        with unittest.mock.patch('libpermian.httpclient.client') as client:
+            response = client.return_value.request.return_value
+            response.status_code = 200
+            response.content = b'ok'
+            result = asyncio.run(workflow.httpRequest('http://example.com/api', data=b'data'))
+        self.assertEqual(result, (200, b'ok'))
+        client.return_value.request.assert_called_once_with('POST', 'http://example.com/api', data=b'data', headers=None)
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+import unittest
+
+from ..settings import Settings
+from ..caserunconfiguration import CaseRunConfiguration, CaseRunConfigurationsList
+from ..result import Result
+from .isolated import IsolatedWorkflow
+from .executors import ThreadWorkflowExecutor, ThreadPoolWorkflowExecutor, ProcessPoolWorkflowExecutor
+
+class DummyTestCase():
+    def __init__(self, name):
+        self.name = name
+        self.id = name
+
+
+class DummyTestRuns():
+    def __init__(self):
+        self.settings = Settings({}, {}, [])
+        self.event = None
+        self.updates = []
+        self.finished = threading.Event()
+
+    def update(self, crc):
+        self.updates.append((crc.id, crc.result.copy()))
+
+    def workflowFinished(self, workflow):
+        self.finished.set()
+
+
+class PidWorkflow(IsolatedWorkflow):
+    def execute(self):
+        self.reportResult(Result('complete', 'PASS', True, pid=os.getpid()))
+
+    def terminate(self):
+        return False
+
+    def displayStatus(self):
+        return 'Test'
+
+    def groupLog(self, *args, **kwargs):
+        pass
+
+
+class SlowPidWorkflow(PidWorkflow):
+    def execute(self):
+        time.sleep(2)
+        super().execute()
+
+
+class TestExecutors(unittest.TestCase):
+    def setUp(self):
+        self.testRuns = DummyTestRuns()
+        self.crc = CaseRunConfiguration(DummyTestCase('test'), {}, [])
+        self.workflow = PidWorkflow(self.testRuns, CaseRunConfigurationsList([self.crc]))
+
+    def runWorkflow(self, executor):
+        self.workflow.start(executor)
+        self.workflow.join()
+        self.assertFalse(self.workflow.is_alive())
+        self.assertTrue(self.testRuns.finished.wait(5))
+        executor.shutdown()
+        self.assertEqual(len(self.testRuns.updates), 1)
+        crcId, result = self.testRuns.updates[0]
+        self.assertEqual(crcId, self.crc.id)
+        self.assertEqual(result, Result('complete', 'PASS', True))
+        return result.extra_fields['pid']
+
+    def test_default(self):
+        self.workflow.start()
+        self.workflow.join()
+        self.assertIsInstance(self.workflow.executor, ThreadWorkflowExecutor)
+        with self.assertRaises(RuntimeError):
+            self.workflow.start()
+
+    def test_join_not_started(self):
+        self.assertFalse(self.workflow.started)
+        with self.assertRaises(RuntimeError):
+            self.workflow.join()
+
+    def test_thread(self):
+        self.assertEqual(self.runWorkflow(ThreadWorkflowExecutor(self.testRuns)), os.getpid())
+
+    def test_threadpool(self):
+        self.assertEqual(self.runWorkflow(ThreadPoolWorkflowExecutor(self.testRuns, 1)), os.getpid())
+
+    def test_processpool(self):
+        self.assertNotEqual(self.runWorkflow(ProcessPoolWorkflowExecutor(self.testRuns, 1)), os.getpid())
+
+    def test_processpool_shutdown_running(self):
+        executor = ProcessPoolWorkflowExecutor(self.testRuns, 1)
+        workflow = SlowPidWorkflow(self.testRuns, CaseRunConfigurationsList([self.crc]))
+        workflow.start(executor)
+        start = time.monotonic()
+        executor.shutdown()
+        # shutdown doesn't wait for the running workflow
+        self.assertLess(time.monotonic() - start, 1)
+        workflow.join()
+        self.assertTrue(self.testRuns.finished.wait(5))
+        # updates of the workflow are still relayed
+        self.assertEqual(len(self.testRuns.updates), 1)
+        self.assertNotEqual(self.testRuns.updates[0][1].extra_fields['pid'], os.getpid())
@@ -0,0 +1,69 @@
+import unittest
+
+from ..settings import Settings
+from .scheduler import WorkflowScheduler
+
+
+class TestWorkflowScheduler(unittest.TestCase):
+    def setUp(self):
+        self.started = []
+        self.settings = Settings(
+            cmdline_overrides={
+                'workflows': {'max_running': '3'},
+                'workflow-slow': {'max_running': '1'},
+                'workflow-important': {'priority': '10'},
+            },
+            environment={},
+            settings_locations=[],
+        )
+        self.scheduler = WorkflowScheduler(self.settings, self.started.append)
+
+    def test_global_limit(self):
+        for workflow in range(5):
+            self.scheduler.submit(workflow, 'fast')
+        self.assertEqual(self.started, [0, 1, 2])
+        self.scheduler.workflowFinished(1)
+        self.assertEqual(self.started, [0, 1, 2, 3])
+        self.scheduler.workflowFinished(1) # already finished, no change
+        self.assertEqual(self.started, [0, 1, 2, 3])
+
+    def test_type_limit(self):
+        self.scheduler.submit('slow1', 'slow')
+        self.scheduler.submit('slow2', 'slow')
+        self.scheduler.submit('fast1', 'fast')
+        self.assertEqual(self.started, ['slow1', 'fast1'])
+        self.scheduler.workflowFinished('slow1')
+        self.assertEqual(self.started, ['slow1', 'fast1', 'slow2'])
+
+    def test_priority(self):
+        self.scheduler.setLimit(1)
+        self.scheduler.submit('first', 'fast')
+        self.scheduler.submit('fast', 'fast')
+        self.scheduler.submit('important', 'important')
+        self.scheduler.workflowFinished('first')
+        self.assertEqual(self.started, ['first', 'important'])
+
+    def test_set_limit(self):
+        for workflow in range(5):
+            self.scheduler.submit(workflow, 'slow')
+        self.assertEqual(self.started, [0])
+        self.scheduler.setLimit(0, 'slow')
+        self.assertEqual(self.started, [0, 1, 2])
+        self.scheduler.setLimit(0)
+        self.assertEqual(self.started, [0, 1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            self.scheduler.setLimit(-1)
+
+    def test_cancel_and_status(self):
+        for workflow in range(4):
+            self.scheduler.submit(workflow, 'fast')
+        self.assertTrue(self.scheduler.cancel(3))
+        self.assertFalse(self.scheduler.cancel(0))
+        self.scheduler.workflowFinished(0)
+        self.assertEqual(self.started, [0, 1, 2])
+        self.assertEqual(self.scheduler.status(), {
+            'max_running': 3,
+            'running': 2,
+            'queued': 0,
+            'types': {'fast': {'max_running': 0, 'running': 2, 'queued': 0}},
+        })
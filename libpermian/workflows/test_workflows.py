@@ -91,3 +91,35 @@ class TestWorkflowExceptions(unittest.TestCase):
         with self.assertRaises(ZeroDivisionError):
             workflow.run()
         self.assertEqual(workflow.crcList[0].result, Result('DNF', 'ERROR', True))
+
+class LoggingWorkflow(SilentlyFailingWorkflow):
+    def __init__(self, testRuns, crcList):
+        super().__init__(testRuns, crcList)
+        self.logged = []
+    def groupLog(self, text, **kwargs):
+        self.logged.append((text, kwargs.get('crcList')))
+
+class TestGroupReportResult(unittest.TestCase):
+    @unittest.mock.patch('libpermian.testruns.TestRuns', autospec=True)
+    def setUp(self, MockTestRuns):
+        self.crcs = [CaseRunConfiguration(DummyTestCase(), {'index': index}, []) for index in range(3)]
+        self.mock_testrun = MockTestRuns(None, None, None)
+        self.mock_testrun.caseRunConfigurations = CaseRunConfigurationsList(self.crcs)
+        self.mock_testrun.event = None
+        self.mock_testrun.settings = Settings({}, {}, [])
+        self.workflow = LoggingWorkflow(self.mock_testrun, self.crcs)
+
+    def test_log_changed_only(self):
+        self.crcs[0].updateResult(Result('started'))
+        self.workflow.groupReportResult(self.crcs, Result('started'))
+        self.assertEqual(
+            self.workflow.logged,
+            [('Changing state to: "started" with result: "None"', self.crcs[1:])],
+        )
+        self.mock_testrun.updateBatch.assert_called_once_with(self.crcs)
+
+    def test_no_change_not_logged(self):
+        self.workflow.groupReportResult(self.crcs, Result('started'))
+        self.workflow.groupReportResult(self.crcs, Result('started'))
+        self.assertEqual(len(self.workflow.logged), 1)
+        self.assertEqual(self.mock_testrun.updateBatch.call_count, 2)
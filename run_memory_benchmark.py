@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+"""
+Measure memory needed for CaseRunConfiguration objects (including their
+Result) and for their copies which are made for workflows and report senders.
+
+The testcases, testplans and configurations are created before the
+measurement starts as they are shared by all the copies and they are not
+owned by the CaseRunConfiguration objects.
+
+With --baseline the same measurement is done also for libpermian taken from
+given git ref (e.g. the commit before the memory optimizations) so the
+results can be compared.
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import tracemalloc
+
+from libpermian.caserunconfiguration import CaseRunConfiguration, CaseRunConfigurationsList
+
+class BenchmarkTestCase():
+    def __init__(self, name):
+        self.name = name
+        self.id = name
+
+class BenchmarkTestPlan():
+    def __init__(self, name):
+        self.name = name
+        self.id = name
+
+def measure(func):
+    """
+    Return number of bytes allocated (and still held) by calling func along
+    with the return value of func.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = func()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, value
+
+def run_benchmark(options):
+    """
+    Return number of created CaseRunConfigurations and list of (label,
+    bytes) pairs of the measured phases, the bytes are per
+    CaseRunConfiguration (per copy for the copies).
+
+    Besides creating the CaseRunConfigurations and their copies, the
+    benchmark accesses their ids, makes snapshot of each of them (read-only
+    copy if there are no snapshots) as done for report senders and groups
+    them by testcase and configuration computing result of each group.
+    """
+    testplans = [BenchmarkTestPlan('testplan')]
+    testcases = [BenchmarkTestCase(f'testcase {i}') for i in range(options.crcs // 10 + 1)]
+    configurations = [
+        {'architecture': arch, 'variant': f'variant{i % 10}'}
+        for i, arch in zip(range(options.crcs), ['x86_64', 'aarch64', 'ppc64le', 's390x'] * options.crcs)
+    ]
+
+    def make_crcs():
+        return CaseRunConfigurationsList([
+            CaseRunConfiguration(testcases[i // 10], configuration, testplans)
+            for i, configuration in enumerate(configurations)
+        ])
+
+    def access_ids(crcs):
+        for crc in crcs:
+            crc.id
+
+    def make_copies():
+        copies = [crcList.copy() for _ in range(options.copies)]
+        for copy in copies:
+            access_ids(copy)
+        return copies
+
+    def make_snapshots():
+        snapshots = [
+            crc.snapshot() if hasattr(crc, 'snapshot') else crc.readOnlyCopy()
+            for crc in crcList
+        ]
+        access_ids(snapshots)
+        return snapshots
+
+    def make_groupings():
+        groupings = [crcList.by_testcase(), crcList.by_configuration('architecture')]
+        for grouping in groupings:
+            for group in grouping.values():
+                group.result
+        return groupings
+
+    crcs_size, crcList = measure(make_crcs)
+    count = len(crcList)
+    ids_size, _ = measure(lambda: access_ids(crcList))
+    copies_size, copies = measure(make_copies)
+    snapshots_size, snapshots = measure(make_snapshots)
+    groupings_size, groupings = measure(make_groupings)
+    return count, [
+        ('Bytes per CaseRunConfiguration', crcs_size / count),
+        ('Bytes per CaseRunConfiguration id', ids_size / count),
+        ('Bytes per CaseRunConfiguration copy', copies_size / (count * options.copies)),
+        ('Bytes per CaseRunConfiguration snapshot', snapshots_size / count),
+        ('Bytes per CaseRunConfiguration in groupings', groupings_size / count),
+        ('Total bytes per CaseRunConfiguration',
+         (crcs_size + ids_size + copies_size + snapshots_size + groupings_size) / count),
+    ]
+
+def run_baseline(options):
+    """
+    Run this script in separate process with libpermian extracted from git
+    ref options.baseline and return its results (see run_benchmark).
+    """
+    repo = os.path.dirname(os.path.abspath(__file__))
+    archive = subprocess.run(
+        ['git', 'archive', options.baseline, 'libpermian'],
+        cwd=repo, check=True, capture_output=True,
+    ).stdout
+    with tempfile.TemporaryDirectory() as directory:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(directory)
+        # the script directory goes first in sys.path so the extracted libpermian is used
+        script = shutil.copy(os.path.abspath(__file__), directory)
+        output = subprocess.run(
+            [sys.executable, script, '--crcs', str(options.crcs), '--copies', str(options.copies), '--raw'],
+            check=True, capture_output=True, text=True,
+        ).stdout
+    count, measurements = json.loads(output)
+    return count, [tuple(measurement) for measurement in measurements]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--crcs', type=int, default=50000, help='Number of CaseRunConfigurations to create')
+    parser.add_argument('--copies', type=int, default=10, help='Number of copies made of each CaseRunConfiguration')
+    parser.add_argument('--baseline', metavar='GITREF', help='Compare with libpermian from given git ref')
+    parser.add_argument('--raw', action='store_true', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    count, measurements = run_benchmark(options)
+    if options.raw:
+        print(json.dumps([count, measurements]))
+        return
+
+    print(f'CaseRunConfigurations: {count}')
+    if not options.baseline:
+        for label, value in measurements:
+            print(f'{label}: {value:.1f}')
+        return
+
+    _, baseline_measurements = run_baseline(options)
+    for (label, current), (_, baseline) in zip(measurements, baseline_measurements):
+        change = f', {(current - baseline) / baseline * 100:+.1f}%' if baseline else ''
+        print(f'{label}: {current:.1f} (baseline {options.baseline}: {baseline:.1f}{change})')
+
+if __name__ == "__main__":
+    main()
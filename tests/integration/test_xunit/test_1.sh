@@ -8,6 +8,9 @@ test() {
                                                 -o "reportSenders.reporting_dir=$TEST_REPORT_DIR" \
                                                 --tp 'xunit grouped testplan'
 
+    # execution times differ between runs, don't compare them
+    sed -i -E 's/ time="[0-9.]+"/ time=""/' $TEST_REPORT_DIR/*.xml
+
     #cp -r $TEST_REPORT_DIR $(dirname ${BASH_SOURCE[0]})/test_1_result   # update expected result
     diff -Naur $(dirname ${BASH_SOURCE[0]})/test_1_result $TEST_REPORT_DIR
 }